@@ -4,123 +4,146 @@ Helper script to analyze SysEx (.syx) files from Elektron Transfer
 Usage: python analyze_sysex.py <file.syx>
 """
 
+import io
 import sys
 import mido
 
+# Lookup table for the ASCII column of the hex dump
+_ASCII_TABLE = bytes(i if 32 <= i < 127 else 0x2E for i in range(256))
+
+# Elektron's SysEx manufacturer ID
+_ELEKTRON_ID = b'\x00\x20\x3C'
+
 def analyze_sysex_file(filepath):
     """Analyze a SysEx file and display its contents"""
-    print(f"Analyzing: {filepath}")
-    print("=" * 80)
-
+    # Build the whole report and write it once; a print() per 16-byte row is
+    # a separate locked write to stdout
+    lines = []
     try:
-        # Read the MIDI file
-        mid = mido.MidiFile(filepath)
-
-        sysex_count = 0
-
-        for i, track in enumerate(mid.tracks):
-            print(f"\nTrack {i}: {track.name}")
-            print("-" * 80)
+        _analyze(filepath, lines.append)
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
 
-            for msg in track:
-                if msg.type == 'sysex':
-                    sysex_count += 1
-                    data = msg.data
+def _analyze(filepath, emit):
+    """Append the report lines for a SysEx file via emit()"""
+    emit(f"Analyzing: {filepath}")
+    emit("=" * 80)
 
-                    print(f"\nSysEx Message #{sysex_count}:")
-                    print(f"  Length: {len(data)} bytes")
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        emit(f"Error: {e}")
+        return
+
+    # Raw .syx dumps (F0 ...) never parse as a Standard MIDI File, so only
+    # hand files with an MThd header to mido
+    if data.startswith(b'MThd'):
+        try:
+            _analyze_midi(data, emit)
+            return
+        except Exception as e:
+            emit(f"Error reading file: {e}")
+            emit("\nTrying to read as raw SysEx file...")
 
-                    # Check if it's an Elektron message
-                    if len(data) >= 3 and data[0:3] == [0x00, 0x20, 0x3C]:
-                        print(f"  Manufacturer: Elektron (00 20 3C)")
+    _analyze_raw(data, emit)
 
-                        if len(data) >= 4:
-                            device_id = data[3]
-                            print(f"  Device ID: 0x{device_id:02X}")
+def _analyze_midi(data, emit):
+    """Report the SysEx messages found in a Standard MIDI File"""
+    # Parse the MIDI file from the bytes already read
+    mid = mido.MidiFile(file=io.BytesIO(data))
 
-                        if len(data) >= 5:
-                            command = data[4]
-                            print(f"  Command: 0x{command:02X}")
-                    else:
-                        print(f"  Manufacturer: {' '.join([f'{b:02X}' for b in data[0:3]])}")
+    sysex_count = 0
 
-                    # Display first 32 bytes in hex
-                    print(f"\n  Data (hex):")
-                    for i in range(0, min(len(data), 64), 16):
-                        chunk = data[i:i+16]
-                        hex_str = " ".join([f"{b:02X}" for b in chunk])
-                        ascii_str = "".join([chr(b) if 32 <= b < 127 else "." for b in chunk])
-                        print(f"    {i:04X}: {hex_str:<48}  {ascii_str}")
+    for i, track in enumerate(mid.tracks):
+        emit(f"\nTrack {i}: {track.name}")
+        emit("-" * 80)
 
-                    if len(data) > 64:
-                        print(f"    ... ({len(data) - 64} more bytes)")
+        for msg in track:
+            if msg.type == 'sysex':
+                sysex_count += 1
+                buf = bytes(msg.data)
 
-                    # Full hex dump
-                    print(f"\n  Full hex: F0 {' '.join([f'{b:02X}' for b in data])} F7")
+                emit(f"\nSysEx Message #{sysex_count}:")
+                emit(f"  Length: {len(buf)} bytes")
 
-        print(f"\n{'=' * 80}")
-        print(f"Total SysEx messages: {sysex_count}")
+                # Check if it's an Elektron message
+                if buf.startswith(_ELEKTRON_ID):
+                    emit("  Manufacturer: Elektron (00 20 3C)")
 
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        print("\nTrying to read as raw SysEx file...")
+                    if len(buf) >= 4:
+                        device_id = buf[3]
+                        emit(f"  Device ID: 0x{device_id:02X}")
 
-        # Try reading as raw .syx file
-        try:
-            with open(filepath, 'rb') as f:
-                data = f.read()
-
-            print(f"File size: {len(data)} bytes")
-
-            # Look for SysEx messages (F0 ... F7)
-            i = 0
-            msg_count = 0
-
-            while i < len(data):
-                if data[i] == 0xF0:  # SysEx start
-                    # Find end
-                    end = i + 1
-                    while end < len(data) and data[end] != 0xF7:
-                        end += 1
-
-                    if end < len(data):
-                        msg_count += 1
-                        sysex_data = data[i+1:end]  # Exclude F0 and F7
-
-                        print(f"\nSysEx Message #{msg_count}:")
-                        print(f"  Offset: 0x{i:04X}")
-                        print(f"  Length: {len(sysex_data)} bytes")
-
-                        # Check manufacturer
-                        if len(sysex_data) >= 3 and sysex_data[0:3] == bytes([0x00, 0x20, 0x3C]):
-                            print(f"  Manufacturer: Elektron (00 20 3C)")
-                            if len(sysex_data) >= 4:
-                                print(f"  Device ID: 0x{sysex_data[3]:02X}")
-                            if len(sysex_data) >= 5:
-                                print(f"  Command: 0x{sysex_data[4]:02X}")
-
-                        # Display first 64 bytes
-                        print(f"\n  Data (hex):")
-                        for j in range(0, min(len(sysex_data), 64), 16):
-                            chunk = sysex_data[j:j+16]
-                            hex_str = " ".join([f"{b:02X}" for b in chunk])
-                            ascii_str = "".join([chr(b) if 32 <= b < 127 else "." for b in chunk])
-                            print(f"    {j:04X}: {hex_str:<48}  {ascii_str}")
-
-                        if len(sysex_data) > 64:
-                            print(f"    ... ({len(sysex_data) - 64} more bytes)")
-
-                        i = end + 1
-                    else:
-                        i += 1
+                    if len(buf) >= 5:
+                        command = buf[4]
+                        emit(f"  Command: 0x{command:02X}")
                 else:
-                    i += 1
-
-            print(f"\n{'=' * 80}")
-            print(f"Total SysEx messages: {msg_count}")
+                    emit(f"  Manufacturer: {buf[0:3].hex(' ').upper()}")
+
+                # Display first 32 bytes in hex
+                emit("\n  Data (hex):")
+                for i in range(0, min(len(buf), 64), 16):
+                    chunk = buf[i:i+16]
+                    hex_str = chunk.hex(' ').upper()
+                    ascii_str = chunk.translate(_ASCII_TABLE).decode('ascii')
+                    emit(f"    {i:04X}: {hex_str:<48}  {ascii_str}")
+
+                if len(buf) > 64:
+                    emit(f"    ... ({len(buf) - 64} more bytes)")
+
+                # Full hex dump
+                emit(f"\n  Full hex: F0 {buf.hex(' ').upper()} F7")
+
+    emit(f"\n{'=' * 80}")
+    emit(f"Total SysEx messages: {sysex_count}")
+
+def _analyze_raw(data, emit):
+    """Report the F0 ... F7 messages found in a raw .syx dump"""
+    emit(f"File size: {len(data)} bytes")
+
+    # Look for SysEx messages (F0 ... F7)
+    msg_count = 0
+    view = memoryview(data)
+
+    i = data.find(0xF0)  # SysEx start
+    while i != -1:
+        # Find end
+        end = data.find(0xF7, i + 1)
+        if end == -1:
+            break
+
+        msg_count += 1
+        sysex_data = view[i+1:end]  # Exclude F0 and F7, without copying
+
+        emit(f"\nSysEx Message #{msg_count}:")
+        emit(f"  Offset: 0x{i:04X}")
+        emit(f"  Length: {len(sysex_data)} bytes")
+
+        # Check manufacturer
+        if data.startswith(_ELEKTRON_ID, i + 1, end):
+            emit("  Manufacturer: Elektron (00 20 3C)")
+            if len(sysex_data) >= 4:
+                emit(f"  Device ID: 0x{sysex_data[3]:02X}")
+            if len(sysex_data) >= 5:
+                emit(f"  Command: 0x{sysex_data[4]:02X}")
+
+        # Display first 64 bytes
+        emit("\n  Data (hex):")
+        for j in range(0, min(len(sysex_data), 64), 16):
+            chunk = bytes(sysex_data[j:j+16])
+            hex_str = chunk.hex(' ').upper()
+            ascii_str = chunk.translate(_ASCII_TABLE).decode('ascii')
+            emit(f"    {j:04X}: {hex_str:<48}  {ascii_str}")
+
+        if len(sysex_data) > 64:
+            emit(f"    ... ({len(sysex_data) - 64} more bytes)")
+
+        i = data.find(0xF0, end + 1)
+
+    emit(f"\n{'=' * 80}")
+    emit(f"Total SysEx messages: {msg_count}")
 
-        except Exception as e2:
-            print(f"Error: {e2}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
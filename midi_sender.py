@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Timed MIDI output on a dedicated thread
+
+Events are (deadline_ns, data) pairs on the time.perf_counter_ns() clock.
+A single daemon thread sleeps until shortly before each deadline and then
+spins the rest of the way, so MIDI timing is much less affected by how busy
+the asyncio event loop (MCP stdio, tool handlers) happens to be. It still
+shares the GIL with the loop, so a busy loop can delay a send by up to the
+interpreter's switch interval (sys.getswitchinterval(), 5 ms by default).
+"""
+
+import asyncio
+import ctypes
+import heapq
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("digitakt-midi-server")
+
+# Busy-wait this long before a deadline instead of trusting the OS timer
+SPIN_NS = 1_000_000
+
+# Events due within this window of each other go out in the same wakeup
+BATCH_NS = 200_000
+
+# Most events that may be waiting to be sent at once
+MAX_PENDING = 4096
+
+
+# Set DIGITAKT_REALTIME=1 to run the sender thread at realtime priority
+REALTIME = os.environ.get("DIGITAKT_REALTIME") == "1"
+
+
+class SenderOverrun(Exception):
+    """Raised when scheduling would overfill the sender's queue"""
+
+
+def now_ns() -> int:
+    """Current time on the sender's clock"""
+    return time.perf_counter_ns()
+
+
+class MidiSender:
+    """Single writer thread that sends raw MIDI bytes at absolute deadlines"""
+
+    def __init__(self, send, max_pending: int = MAX_PENDING):
+        # send(data) writes one complete MIDI message
+        self._send = send
+        self._max_pending = max_pending
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # First failed send of each owner, reported by its finishers
+        self._errors = {}
+        self._thread = threading.Thread(target=self._run, name="midi-sender", daemon=True)
+        self._thread.start()
+
+    def schedule(self, events, owner=None):
+        """
+        Queue (deadline_ns, data) events
+        data is either MIDI bytes or a callable to run at the deadline
+        owner tags the events so withdraw() can take them back
+        Nothing is queued if the events don't all fit (SenderOverrun)
+        """
+        events = list(events)
+        with self._cond:
+            if len(self._heap) + len(events) > self._max_pending:
+                raise SenderOverrun(
+                    f"MIDI send queue full ({len(self._heap)} events pending, "
+                    f"{len(events)} more requested)"
+                )
+            for deadline, data in events:
+                heapq.heappush(self._heap, (deadline, next(self._seq), data, owner))
+            self._cond.notify()
+
+    def withdraw(self, owner, unsent=()):
+        """
+        Drop the pending events queued for owner and send their note offs
+        and Stop (and those in unsent, events never queued) right away,
+        so an abandoned sequence leaves no notes hanging or clock running
+        """
+        with self._cond:
+            dropped = [entry[2] for entry in self._heap if entry[3] is owner]
+            # Keep the same list object; the sender thread holds a reference
+            self._heap[:] = [entry for entry in self._heap if entry[3] is not owner]
+            heapq.heapify(self._heap)
+            closing = dict.fromkeys(
+                data for data in itertools.chain(dropped, unsent) if _is_closing(data)
+            )
+            # Deadline 0 sorts ahead of everything else still queued
+            for data in closing:
+                heapq.heappush(self._heap, (0, next(self._seq), data, None))
+            self._cond.notify()
+
+    @property
+    def pending(self) -> int:
+        """Number of events waiting to be sent"""
+        return len(self._heap)
+
+    async def play(self, events, lead_ns: int = 0, batch: int = 512):
+        """
+        Queue events and wait until the last of them has been sent
+        Deadlines here are offsets from when play() starts queueing, plus
+        lead_ns, so building and sorting a long run doesn't make it late
+        Long runs (e.g. a clock) are fed in batches, keeping at most two
+        batches queued, so they need not fit in the queue all at once
+        If cancelled, a batch doesn't fit or a send fails, the rest is
+        withdrawn and the error raised here
+        """
+        # Stable sort keeps the given order for events sharing a deadline
+        events = sorted(events, key=lambda event: event[0])
+        if not events:
+            return
+        # Refuse up front if the queue can't take the most this play ever
+        # has queued at once (two batches and their finishers), rather than
+        # finding out partway through; only other schedulers filling the
+        # queue meanwhile can still cause an overrun, handled below
+        needed = min(len(events) + -(-len(events) // batch), 2 * (batch + 1))
+        with self._cond:
+            if len(self._heap) + needed > self._max_pending:
+                raise SenderOverrun(
+                    f"MIDI send queue full ({len(self._heap)} events pending, "
+                    f"{needed} more needed to start)"
+                )
+        loop = asyncio.get_running_loop()
+        owner = object()
+        queued = 0
+        previous = None
+        base = now_ns() + lead_ns
+        try:
+            for start in range(0, len(events), batch):
+                chunk = [(base + offset, data) for offset, data in events[start:start + batch]]
+                done = loop.create_future()
+                # Queued after the chunk, so it runs after any sharing its deadline
+                self.schedule(chunk + [(chunk[-1][0], _finisher(loop, done))], owner)
+                queued = start + len(chunk)
+                if previous is not None:
+                    _raise_error(await previous)
+                previous = done
+            _raise_error(await previous)
+        except BaseException:
+            self.withdraw(owner, [data for _, data in events[queued:]])
+            self._errors.pop(owner, None)
+            raise
+
+    def _fail(self, owner, error):
+        """Run owner's queued finishers now, so play() raises without waiting"""
+        with self._cond:
+            finishers = [entry[2] for entry in self._heap if entry[3] is owner and callable(entry[2])]
+        for finished in finishers:
+            finished(error)
+
+    def _run(self):
+        if REALTIME:
+            _enable_realtime()
+        heap = self._heap
+        cond = self._cond
+        while True:
+            with cond:
+                while True:
+                    if not heap:
+                        cond.wait()
+                        continue
+                    deadline = heap[0][0]
+                    wait = deadline - time.perf_counter_ns() - SPIN_NS
+                    if wait <= 0:
+                        break
+                    # Wake early if an earlier event is queued meanwhile
+                    cond.wait(wait / 1e9)
+
+            while time.perf_counter_ns() < deadline:
+                pass
+
+            # Take everything that is due in one go (e.g. a note off and
+            # the next note on sharing a deadline) and send it back to back
+            with cond:
+                horizon = time.perf_counter_ns() + BATCH_NS
+                due = []
+                while heap and heap[0][0] <= horizon:
+                    due.append(heapq.heappop(heap)[2:])
+
+            for data, owner in due:
+                if callable(data):
+                    data(self._errors.get(owner))
+                    continue
+                # Once a send of a sequence fails, skip the rest of it;
+                # play() withdraws it when the error reaches it
+                if owner is not None and owner in self._errors:
+                    continue
+                try:
+                    self._send(data)
+                except Exception as e:
+                    logger.error("MIDI sender error: %s", e)
+                    if owner is not None:
+                        self._errors[owner] = e
+                        self._fail(owner, e)
+
+
+def _enable_realtime():
+    """Raise the calling thread to realtime priority, as far as the OS allows"""
+    try:
+        if sys.platform.startswith("linux"):
+            # Policy 0 targets the calling thread on Linux
+            priority = os.sched_get_priority_max(os.SCHED_FIFO) // 2
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+            # Keep the pages mapped now resident so a page fault can't stall
+            # a send; not MCL_FUTURE, which would pin every later allocation
+            # of the whole interpreter
+            MCL_CURRENT = 1
+            if ctypes.CDLL(None, use_errno=True).mlockall(MCL_CURRENT) != 0:
+                logger.warning("mlockall failed: %s", os.strerror(ctypes.get_errno()))
+        elif sys.platform == "darwin":
+            QOS_CLASS_USER_INTERACTIVE = 0x21
+            ctypes.CDLL(None).pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0)
+        else:
+            return
+        logger.info("MIDI sender thread running at realtime priority")
+    except (OSError, AttributeError) as e:
+        logger.warning("Could not raise MIDI sender priority: %s", e)
+
+
+def _is_closing(data) -> bool:
+    """Whether data is a note off (or note on at velocity 0) or a Stop"""
+    if callable(data) or not data:
+        return False
+    kind = data[0] & 0xF0
+    return (kind == 0x80 or (kind == 0x90 and len(data) == 3 and data[2] == 0)
+            or data[0] == 0xFC)
+
+
+def _finisher(loop, future):
+    """
+    Callable for the sender thread that resolves future on loop, with the
+    error of a send that went wrong before it (or None) as its result
+    """
+    def finished(error=None):
+        loop.call_soon_threadsafe(_set_done, future, error)
+    return finished
+
+
+def _set_done(future, error=None):
+    # A result rather than set_exception(), so the futures play() never
+    # gets to await don't log "exception was never retrieved"
+    if not future.done():
+        future.set_result(error)
+
+
+def _raise_error(error):
+    if error is not None:
+        raise error
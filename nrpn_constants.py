@@ -14,6 +14,8 @@ Structure:
   Data Entry LSB (CC 38) = Fine value (usually 0)
 """
 
+import sys
+
 # ============================================================================
 # MIDI CC CONSTANTS
 # ============================================================================
@@ -210,12 +212,12 @@ NRPN_PARAMS = {
 
     (1, 0): "Source Tune",
     (1, 1): "Source Fine Tune",
-    (1, 2): "Sample Slot",
-    (1, 3): "Sample Start",
-    (1, 4): "Sample Length",
-    (1, 5): "Sample Loop",
-    (1, 6): "Sample Volume",
+    (1, 4): "Sample Start",
+    (1, 5): "Sample Length",
+    (1, 6): "Sample Loop",
     (1, 7): "Sample Level",
+    (1, 8): "Sample Slot",
+    (1, 9): "Sample Bank",
 
     (1, 16): "Filter Attack",
     (1, 17): "Filter Decay",
@@ -292,6 +294,19 @@ NRPN_PARAMS = {
     (2, 47): "Chorus Mix",
 }
 
+# Intern the names so the dict and the flat table share one object per name
+NRPN_PARAMS = {key: sys.intern(name) for key, name in NRPN_PARAMS.items()}
+
+# Flat lookup table indexed by msb * 128 + lsb (MSB categories are 1-3)
+_NRPN_FLAT = [None] * (4 * 128)
+for (_msb, _lsb), _name in NRPN_PARAMS.items():
+    _NRPN_FLAT[_msb * 128 + _lsb] = _name
+del _msb, _lsb, _name
+
 def get_param_name(msb: int, lsb: int) -> str:
     """Get the human-readable name for an NRPN parameter"""
-    return NRPN_PARAMS.get((msb, lsb), f"Unknown NRPN {msb}:{lsb}")
+    if 0 <= msb < 4 and 0 <= lsb < 128:
+        name = _NRPN_FLAT[msb * 128 + lsb]
+        if name is not None:
+            return name
+    return f"Unknown NRPN {msb}:{lsb}"
@@ -4,6 +4,8 @@ Digitakt II Parameter Mapping for Automation
 Maps human-readable parameter names to MIDI CC/NRPN messages
 """
 
+from typing import NamedTuple, Optional
+
 from nrpn_constants import (
     TrackCC, SourceCC, FilterCC, AmpCC, FXCC,
     TrackParams, TrigParams, SourceParams, FilterParams,
@@ -11,135 +13,156 @@ from nrpn_constants import (
     DelayParams, ReverbParams, ChorusParams
 )
 
-# Parameter mapping: name -> {type: "cc" or "nrpn", cc: X or msb: X, lsb: Y}
+
+class ParamEntry(NamedTuple):
+    """How a parameter is sent: a single CC, or an NRPN (MSB/LSB) quartet"""
+    type: str                # "cc" or "nrpn"
+    cc: Optional[int]        # CC number (CC parameters only)
+    msb: Optional[int]       # NRPN MSB (NRPN parameters only)
+    lsb: Optional[int]       # NRPN LSB (NRPN parameters only)
+    range: tuple[int, int]   # (min, max) accepted value
+
+
+def _cc(cc: int, value_range: tuple[int, int] = (0, 127)) -> ParamEntry:
+    return ParamEntry("cc", cc, None, None, value_range)
+
+
+def _nrpn(msb: int, lsb: int, value_range: tuple[int, int] = (0, 127)) -> ParamEntry:
+    return ParamEntry("nrpn", None, msb, lsb, value_range)
+
+
+# Parameter mapping: name -> ParamEntry
 PARAMETER_MAP = {
     # FILTER PARAMETERS
-    "filter_cutoff": {"type": "cc", "cc": FilterCC.FREQUENCY, "range": (0, 127)},
-    "filter_frequency": {"type": "cc", "cc": FilterCC.FREQUENCY, "range": (0, 127)},  # Alias
-    "filter_resonance": {"type": "nrpn", "msb": FilterParams.MSB, "lsb": FilterParams.RESONANCE, "range": (0, 127)},
-    "filter_type": {"type": "nrpn", "msb": FilterParams.MSB, "lsb": FilterParams.TYPE, "range": (0, 127)},
+    "filter_cutoff": _cc(FilterCC.FREQUENCY),
+    "filter_frequency": _cc(FilterCC.FREQUENCY),  # Alias
+    "filter_resonance": _nrpn(FilterParams.MSB, FilterParams.RESONANCE),
+    "filter_type": _nrpn(FilterParams.MSB, FilterParams.TYPE),
 
     # FILTER ENVELOPE
-    "filter_attack": {"type": "cc", "cc": FilterCC.ATTACK, "range": (0, 127)},
-    "filter_decay": {"type": "cc", "cc": FilterCC.DECAY, "range": (0, 127)},
-    "filter_sustain": {"type": "cc", "cc": FilterCC.SUSTAIN, "range": (0, 127)},
-    "filter_release": {"type": "cc", "cc": FilterCC.RELEASE, "range": (0, 127)},
-    "filter_env_depth": {"type": "cc", "cc": FilterCC.ENV_DEPTH, "range": (0, 127)},
-    "filter_envelope_depth": {"type": "cc", "cc": FilterCC.ENV_DEPTH, "range": (0, 127)},  # Alias
+    "filter_attack": _cc(FilterCC.ATTACK),
+    "filter_decay": _cc(FilterCC.DECAY),
+    "filter_sustain": _cc(FilterCC.SUSTAIN),
+    "filter_release": _cc(FilterCC.RELEASE),
+    "filter_env_depth": _cc(FilterCC.ENV_DEPTH),
+    "filter_envelope_depth": _cc(FilterCC.ENV_DEPTH),  # Alias
 
     # AMP PARAMETERS
-    "amp_volume": {"type": "cc", "cc": AmpCC.VOLUME, "range": (0, 127)},
-    "amp_pan": {"type": "cc", "cc": AmpCC.PAN, "range": (0, 127)},
-    "volume": {"type": "cc", "cc": AmpCC.VOLUME, "range": (0, 127)},  # Alias
-    "pan": {"type": "cc", "cc": AmpCC.PAN, "range": (0, 127)},  # Alias
+    "amp_volume": _cc(AmpCC.VOLUME),
+    "amp_pan": _cc(AmpCC.PAN),
+    "volume": _cc(AmpCC.VOLUME),  # Alias
+    "pan": _cc(AmpCC.PAN),  # Alias
 
     # AMP ENVELOPE
-    "amp_attack": {"type": "cc", "cc": AmpCC.ATTACK, "range": (0, 127)},
-    "amp_hold": {"type": "cc", "cc": AmpCC.HOLD, "range": (0, 127)},
-    "amp_decay": {"type": "cc", "cc": AmpCC.DECAY, "range": (0, 127)},
-    "amp_sustain": {"type": "cc", "cc": AmpCC.SUSTAIN, "range": (0, 127)},
-    "amp_release": {"type": "cc", "cc": AmpCC.RELEASE, "range": (0, 127)},
-    "amp_mode": {"type": "nrpn", "msb": AmpParams.MSB, "lsb": AmpParams.MODE, "range": (0, 127)},
-    "amp_env_reset": {"type": "nrpn", "msb": AmpParams.MSB, "lsb": AmpParams.ENV_RESET, "range": (0, 127)},
+    "amp_attack": _cc(AmpCC.ATTACK),
+    "amp_hold": _cc(AmpCC.HOLD),
+    "amp_decay": _cc(AmpCC.DECAY),
+    "amp_sustain": _cc(AmpCC.SUSTAIN),
+    "amp_release": _cc(AmpCC.RELEASE),
+    "amp_mode": _nrpn(AmpParams.MSB, AmpParams.MODE),
+    "amp_env_reset": _nrpn(AmpParams.MSB, AmpParams.ENV_RESET),
 
     # SOURCE/SAMPLE PARAMETERS
-    "tune": {"type": "cc", "cc": SourceCC.TUNE, "range": (0, 127)},
-    "pitch": {"type": "cc", "cc": SourceCC.TUNE, "range": (0, 127)},  # Alias
-    "play_mode": {"type": "cc", "cc": SourceCC.PLAY_MODE, "range": (0, 3)},  # 0=Reverse, 1=Reverse Loop, 2=Forward Loop, 3=Forward
-    "sample_slot": {"type": "cc", "cc": SourceCC.SAMPLE_SLOT, "range": (0, 127)},
-    "sample_start": {"type": "cc", "cc": SourceCC.SAMPLE_START, "range": (0, 127)},
-    "sample_length": {"type": "cc", "cc": SourceCC.SAMPLE_LENGTH, "range": (0, 127)},
-    "sample_loop": {"type": "cc", "cc": SourceCC.SAMPLE_LOOP, "range": (0, 127)},
-    "sample_level": {"type": "cc", "cc": SourceCC.SAMPLE_LEVEL, "range": (0, 127)},
-    "sample_bank": {"type": "cc", "cc": SourceCC.SAMPLE_BANK, "range": (0, 127)},
-    "fine_tune": {"type": "nrpn", "msb": SourceParams.MSB, "lsb": SourceParams.FINE_TUNE, "range": (0, 127)},
+    "tune": _cc(SourceCC.TUNE),
+    "pitch": _cc(SourceCC.TUNE),  # Alias
+    "play_mode": _cc(SourceCC.PLAY_MODE, (0, 3)),  # 0=Reverse, 1=Reverse Loop, 2=Forward Loop, 3=Forward
+    "sample_slot": _cc(SourceCC.SAMPLE_SLOT),
+    "sample_start": _cc(SourceCC.SAMPLE_START),
+    "sample_length": _cc(SourceCC.SAMPLE_LENGTH),
+    "sample_loop": _cc(SourceCC.SAMPLE_LOOP),
+    "sample_level": _cc(SourceCC.SAMPLE_LEVEL),
+    "sample_bank": _cc(SourceCC.SAMPLE_BANK),
+    "fine_tune": _nrpn(SourceParams.MSB, SourceParams.FINE_TUNE),
 
     # LFO 1 PARAMETERS
-    "lfo1_speed": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.SPEED, "range": (0, 127)},
-    "lfo1_multiplier": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.MULTIPLIER, "range": (0, 127)},
-    "lfo1_fade": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.FADE, "range": (0, 127)},
-    "lfo1_destination": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.DESTINATION, "range": (0, 127)},
-    "lfo1_waveform": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.WAVEFORM, "range": (0, 127)},
-    "lfo1_start_phase": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.START_PHASE, "range": (0, 127)},
-    "lfo1_trig_mode": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.TRIG_MODE, "range": (0, 127)},
-    "lfo1_depth": {"type": "nrpn", "msb": LFO1Params.MSB, "lsb": LFO1Params.DEPTH, "range": (0, 127)},
+    "lfo1_speed": _nrpn(LFO1Params.MSB, LFO1Params.SPEED),
+    "lfo1_multiplier": _nrpn(LFO1Params.MSB, LFO1Params.MULTIPLIER),
+    "lfo1_fade": _nrpn(LFO1Params.MSB, LFO1Params.FADE),
+    "lfo1_destination": _nrpn(LFO1Params.MSB, LFO1Params.DESTINATION),
+    "lfo1_waveform": _nrpn(LFO1Params.MSB, LFO1Params.WAVEFORM),
+    "lfo1_start_phase": _nrpn(LFO1Params.MSB, LFO1Params.START_PHASE),
+    "lfo1_trig_mode": _nrpn(LFO1Params.MSB, LFO1Params.TRIG_MODE),
+    "lfo1_depth": _nrpn(LFO1Params.MSB, LFO1Params.DEPTH),
 
     # LFO 2 PARAMETERS
-    "lfo2_speed": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.SPEED, "range": (0, 127)},
-    "lfo2_multiplier": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.MULTIPLIER, "range": (0, 127)},
-    "lfo2_fade": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.FADE, "range": (0, 127)},
-    "lfo2_destination": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.DESTINATION, "range": (0, 127)},
-    "lfo2_waveform": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.WAVEFORM, "range": (0, 127)},
-    "lfo2_start_phase": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.START_PHASE, "range": (0, 127)},
-    "lfo2_trig_mode": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.TRIG_MODE, "range": (0, 127)},
-    "lfo2_depth": {"type": "nrpn", "msb": LFO2Params.MSB, "lsb": LFO2Params.DEPTH, "range": (0, 127)},
+    "lfo2_speed": _nrpn(LFO2Params.MSB, LFO2Params.SPEED),
+    "lfo2_multiplier": _nrpn(LFO2Params.MSB, LFO2Params.MULTIPLIER),
+    "lfo2_fade": _nrpn(LFO2Params.MSB, LFO2Params.FADE),
+    "lfo2_destination": _nrpn(LFO2Params.MSB, LFO2Params.DESTINATION),
+    "lfo2_waveform": _nrpn(LFO2Params.MSB, LFO2Params.WAVEFORM),
+    "lfo2_start_phase": _nrpn(LFO2Params.MSB, LFO2Params.START_PHASE),
+    "lfo2_trig_mode": _nrpn(LFO2Params.MSB, LFO2Params.TRIG_MODE),
+    "lfo2_depth": _nrpn(LFO2Params.MSB, LFO2Params.DEPTH),
 
     # LFO 3 PARAMETERS
-    "lfo3_speed": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.SPEED, "range": (0, 127)},
-    "lfo3_multiplier": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.MULTIPLIER, "range": (0, 127)},
-    "lfo3_fade": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.FADE, "range": (0, 127)},
-    "lfo3_destination": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.DESTINATION, "range": (0, 127)},
-    "lfo3_waveform": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.WAVEFORM, "range": (0, 127)},
-    "lfo3_start_phase": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.START_PHASE, "range": (0, 127)},
-    "lfo3_trig_mode": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.TRIG_MODE, "range": (0, 127)},
-    "lfo3_depth": {"type": "nrpn", "msb": LFO3Params.MSB, "lsb": LFO3Params.DEPTH, "range": (0, 127)},
+    "lfo3_speed": _nrpn(LFO3Params.MSB, LFO3Params.SPEED),
+    "lfo3_multiplier": _nrpn(LFO3Params.MSB, LFO3Params.MULTIPLIER),
+    "lfo3_fade": _nrpn(LFO3Params.MSB, LFO3Params.FADE),
+    "lfo3_destination": _nrpn(LFO3Params.MSB, LFO3Params.DESTINATION),
+    "lfo3_waveform": _nrpn(LFO3Params.MSB, LFO3Params.WAVEFORM),
+    "lfo3_start_phase": _nrpn(LFO3Params.MSB, LFO3Params.START_PHASE),
+    "lfo3_trig_mode": _nrpn(LFO3Params.MSB, LFO3Params.TRIG_MODE),
+    "lfo3_depth": _nrpn(LFO3Params.MSB, LFO3Params.DEPTH),
 
     # FX SEND PARAMETERS
-    "chorus_send": {"type": "cc", "cc": FXCC.CHORUS_SEND, "range": (0, 127)},
-    "delay_send": {"type": "cc", "cc": FXCC.DELAY_SEND, "range": (0, 127)},
-    "reverb_send": {"type": "cc", "cc": FXCC.REVERB_SEND, "range": (0, 127)},
-    "overdrive": {"type": "cc", "cc": FXCC.OVERDRIVE, "range": (0, 127)},
+    "chorus_send": _cc(FXCC.CHORUS_SEND),
+    "delay_send": _cc(FXCC.DELAY_SEND),
+    "reverb_send": _cc(FXCC.REVERB_SEND),
+    "overdrive": _cc(FXCC.OVERDRIVE),
 
     # DELAY FX PARAMETERS
-    "delay_time": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.TIME, "range": (0, 127)},
-    "delay_pingpong": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.PINGPONG, "range": (0, 127)},
-    "delay_stereo_width": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.STEREO_WIDTH, "range": (0, 127)},
-    "delay_feedback": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.FEEDBACK, "range": (0, 127)},
-    "delay_hpf": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.HPF, "range": (0, 127)},
-    "delay_lpf": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.LPF, "range": (0, 127)},
-    "delay_reverb_send": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.REVERB_SEND, "range": (0, 127)},
-    "delay_mix": {"type": "nrpn", "msb": DelayParams.MSB, "lsb": DelayParams.MIX, "range": (0, 127)},
+    "delay_time": _nrpn(DelayParams.MSB, DelayParams.TIME),
+    "delay_pingpong": _nrpn(DelayParams.MSB, DelayParams.PINGPONG),
+    "delay_stereo_width": _nrpn(DelayParams.MSB, DelayParams.STEREO_WIDTH),
+    "delay_feedback": _nrpn(DelayParams.MSB, DelayParams.FEEDBACK),
+    "delay_hpf": _nrpn(DelayParams.MSB, DelayParams.HPF),
+    "delay_lpf": _nrpn(DelayParams.MSB, DelayParams.LPF),
+    "delay_reverb_send": _nrpn(DelayParams.MSB, DelayParams.REVERB_SEND),
+    "delay_mix": _nrpn(DelayParams.MSB, DelayParams.MIX),
 
     # REVERB FX PARAMETERS
-    "reverb_predelay": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.PREDELAY, "range": (0, 127)},
-    "reverb_decay": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.DECAY, "range": (0, 127)},
-    "reverb_shelving_freq": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.SHELVING_FREQ, "range": (0, 127)},
-    "reverb_shelving_gain": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.SHELVING_GAIN, "range": (0, 127)},
-    "reverb_hpf": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.HPF, "range": (0, 127)},
-    "reverb_lpf": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.LPF, "range": (0, 127)},
-    "reverb_mix": {"type": "nrpn", "msb": ReverbParams.MSB, "lsb": ReverbParams.MIX, "range": (0, 127)},
+    "reverb_predelay": _nrpn(ReverbParams.MSB, ReverbParams.PREDELAY),
+    "reverb_decay": _nrpn(ReverbParams.MSB, ReverbParams.DECAY),
+    "reverb_shelving_freq": _nrpn(ReverbParams.MSB, ReverbParams.SHELVING_FREQ),
+    "reverb_shelving_gain": _nrpn(ReverbParams.MSB, ReverbParams.SHELVING_GAIN),
+    "reverb_hpf": _nrpn(ReverbParams.MSB, ReverbParams.HPF),
+    "reverb_lpf": _nrpn(ReverbParams.MSB, ReverbParams.LPF),
+    "reverb_mix": _nrpn(ReverbParams.MSB, ReverbParams.MIX),
 
     # CHORUS FX PARAMETERS
-    "chorus_depth": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.DEPTH, "range": (0, 127)},
-    "chorus_speed": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.SPEED, "range": (0, 127)},
-    "chorus_hpf": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.HPF, "range": (0, 127)},
-    "chorus_width": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.WIDTH, "range": (0, 127)},
-    "chorus_delay_send": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.DELAY_SEND, "range": (0, 127)},
-    "chorus_reverb_send": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.REVERB_SEND, "range": (0, 127)},
-    "chorus_mix": {"type": "nrpn", "msb": ChorusParams.MSB, "lsb": ChorusParams.MIX, "range": (0, 127)},
+    "chorus_depth": _nrpn(ChorusParams.MSB, ChorusParams.DEPTH),
+    "chorus_speed": _nrpn(ChorusParams.MSB, ChorusParams.SPEED),
+    "chorus_hpf": _nrpn(ChorusParams.MSB, ChorusParams.HPF),
+    "chorus_width": _nrpn(ChorusParams.MSB, ChorusParams.WIDTH),
+    "chorus_delay_send": _nrpn(ChorusParams.MSB, ChorusParams.DELAY_SEND),
+    "chorus_reverb_send": _nrpn(ChorusParams.MSB, ChorusParams.REVERB_SEND),
+    "chorus_mix": _nrpn(ChorusParams.MSB, ChorusParams.MIX),
 
     # TRACK PARAMETERS
-    "track_level": {"type": "cc", "cc": TrackCC.LEVEL, "range": (0, 127)},
-    "track_mute": {"type": "cc", "cc": TrackCC.MUTE, "range": (0, 127)},
+    "track_level": _cc(TrackCC.LEVEL),
+    "track_mute": _cc(TrackCC.MUTE),
 
     # TRIG PARAMETERS (for currently selected trig)
-    "trig_note": {"type": "nrpn", "msb": TrigParams.MSB, "lsb": TrigParams.NOTE, "range": (0, 127)},
-    "trig_velocity": {"type": "nrpn", "msb": TrigParams.MSB, "lsb": TrigParams.VELOCITY, "range": (0, 127)},
-    "trig_length": {"type": "nrpn", "msb": TrigParams.MSB, "lsb": TrigParams.LENGTH, "range": (0, 127)},
+    "trig_note": _nrpn(TrigParams.MSB, TrigParams.NOTE),
+    "trig_velocity": _nrpn(TrigParams.MSB, TrigParams.VELOCITY),
+    "trig_length": _nrpn(TrigParams.MSB, TrigParams.LENGTH),
 }
 
+# Sorted names, used for listings and the unknown-parameter error message
+_SORTED_PARAM_NAMES = tuple(sorted(PARAMETER_MAP))
+_AVAILABLE_PARAMS_STR = ", ".join(_SORTED_PARAM_NAMES)
+
 
 def validate_parameter(param_name: str, value: int) -> tuple[bool, str]:
     """
     Validate a parameter name and value
     Returns: (is_valid, error_message)
     """
-    if param_name not in PARAMETER_MAP:
-        available = ", ".join(sorted(PARAMETER_MAP.keys()))
-        return False, f"Unknown parameter '{param_name}'. Available parameters: {available}"
+    info = PARAMETER_MAP.get(param_name)
+    if info is None:
+        return False, f"Unknown parameter '{param_name}'. Available parameters: {_AVAILABLE_PARAMS_STR}"
 
-    param_info = PARAMETER_MAP[param_name]
-    min_val, max_val = param_info["range"]
+    min_val, max_val = info.range
 
     if not (min_val <= value <= max_val):
         return False, f"Value {value} out of range for '{param_name}' (valid range: {min_val}-{max_val})"
@@ -147,66 +170,78 @@ def validate_parameter(param_name: str, value: int) -> tuple[bool, str]:
     return True, ""
 
 
-def get_parameter_info(param_name: str) -> dict:
+def get_parameter_info(param_name: str) -> Optional[ParamEntry]:
     """Get parameter mapping info"""
     return PARAMETER_MAP.get(param_name)
 
 
 def get_all_parameters() -> list[str]:
     """Get list of all available parameter names"""
-    return sorted(PARAMETER_MAP.keys())
+    return list(_SORTED_PARAM_NAMES)
 
 
-def get_parameters_by_category() -> dict:
-    """Get parameters organized by category"""
-    categories = {
-        "Filter": [],
-        "Filter Envelope": [],
-        "Amp": [],
-        "Amp Envelope": [],
-        "Source/Sample": [],
-        "LFO 1": [],
-        "LFO 2": [],
-        "LFO 3": [],
-        "FX Sends": [],
-        "Delay FX": [],
-        "Reverb FX": [],
-        "Chorus FX": [],
-        "Track": [],
-        "Trig": [],
-    }
-
-    for param_name in PARAMETER_MAP.keys():
-        if param_name.startswith("filter_") and not any(x in param_name for x in ["attack", "decay", "sustain", "release", "env"]):
-            categories["Filter"].append(param_name)
-        elif param_name.startswith("filter_") and any(x in param_name for x in ["attack", "decay", "sustain", "release", "env"]):
-            categories["Filter Envelope"].append(param_name)
-        elif param_name.startswith("amp_") and not any(x in param_name for x in ["attack", "hold", "decay", "sustain", "release", "env", "mode"]):
-            categories["Amp"].append(param_name)
-        elif param_name.startswith("amp_") and any(x in param_name for x in ["attack", "hold", "decay", "sustain", "release", "env", "mode"]):
-            categories["Amp Envelope"].append(param_name)
-        elif param_name.startswith("lfo1_"):
-            categories["LFO 1"].append(param_name)
-        elif param_name.startswith("lfo2_"):
-            categories["LFO 2"].append(param_name)
-        elif param_name.startswith("lfo3_"):
-            categories["LFO 3"].append(param_name)
-        elif param_name in ["chorus_send", "delay_send", "reverb_send", "overdrive"]:
-            categories["FX Sends"].append(param_name)
-        elif param_name.startswith("delay_"):
-            categories["Delay FX"].append(param_name)
-        elif param_name.startswith("reverb_"):
-            categories["Reverb FX"].append(param_name)
-        elif param_name.startswith("chorus_") and param_name not in ["chorus_send"]:
-            categories["Chorus FX"].append(param_name)
-        elif param_name.startswith("track_"):
-            categories["Track"].append(param_name)
-        elif param_name.startswith("trig_"):
-            categories["Trig"].append(param_name)
-        elif param_name in ["tune", "pitch", "fine_tune", "sample_slot", "sample_start", "sample_length", "sample_loop", "sample_volume", "sample_level"]:
-            categories["Source/Sample"].append(param_name)
-        elif param_name in ["volume", "pan"]:
-            categories["Amp"].append(param_name)
+# Category classification tables (see _categorize)
+_CATEGORY_ORDER = (
+    "Filter", "Filter Envelope", "Amp", "Amp Envelope", "Source/Sample",
+    "LFO 1", "LFO 2", "LFO 3", "FX Sends", "Delay FX", "Reverb FX",
+    "Chorus FX", "Track", "Trig",
+)
+_FILTER_ENV_TOKENS = ("attack", "decay", "sustain", "release", "env")
+_AMP_ENV_TOKENS = _FILTER_ENV_TOKENS + ("hold", "mode")
+_FX_SEND_PARAMS = frozenset(("chorus_send", "delay_send", "reverb_send", "overdrive"))
+_PREFIX_CATEGORIES = (
+    ("lfo1_", "LFO 1"),
+    ("lfo2_", "LFO 2"),
+    ("lfo3_", "LFO 3"),
+    ("delay_", "Delay FX"),
+    ("reverb_", "Reverb FX"),
+    ("chorus_", "Chorus FX"),
+    ("track_", "Track"),
+    ("trig_", "Trig"),
+)
+_SOURCE_PARAMS = frozenset((
+    "tune", "pitch", "fine_tune", "sample_slot", "sample_start", "sample_length",
+    "sample_loop", "sample_volume", "sample_level",
+))
+
+
+def _categorize(param_name: str) -> Optional[str]:
+    """Return the category a parameter is listed under, or None"""
+    if param_name.startswith("filter_"):
+        if any(tok in param_name for tok in _FILTER_ENV_TOKENS):
+            return "Filter Envelope"
+        return "Filter"
+    if param_name.startswith("amp_"):
+        if any(tok in param_name for tok in _AMP_ENV_TOKENS):
+            return "Amp Envelope"
+        return "Amp"
+    if param_name in _FX_SEND_PARAMS:
+        return "FX Sends"
+    for prefix, category in _PREFIX_CATEGORIES:
+        if param_name.startswith(prefix):
+            return category
+    if param_name in _SOURCE_PARAMS:
+        return "Source/Sample"
+    if param_name in ("volume", "pan"):
+        return "Amp"
+    return None
+
+
+def _build_categories() -> dict[str, tuple[str, ...]]:
+    categories = {name: [] for name in _CATEGORY_ORDER}
+    for param_name in PARAMETER_MAP:
+        category = _categorize(param_name)
+        if category:
+            categories[category].append(param_name)
 
     # Remove empty categories
-    return {k: sorted(v) for k, v in categories.items() if v}
+    return {k: tuple(sorted(v)) for k, v in categories.items() if v}
+
+
+# PARAMETER_MAP is static, so categories are computed once at import
+_CATEGORIES = _build_categories()
+
+
+def get_parameters_by_category() -> dict:
+    """Get parameters organized by category"""
+    return {k: list(v) for k, v in _CATEGORIES.items()}
@@ -5,6 +5,15 @@ Provides tools to send MIDI messages to the Elektron Digitakt II
 """
 
 import asyncio
+import os
+import sys
+
+# Use rtmidi on the platform's native MIDI API unless MIDO_BACKEND says
+# otherwise; the raw send path relies on rtmidi's send_message
+_RTMIDI_APIS = {"linux": "LINUX_ALSA", "darwin": "MACOSX_CORE", "win32": "WINDOWS_MM"}
+if sys.platform in _RTMIDI_APIS:
+    os.environ.setdefault("MIDO_BACKEND", f"mido.backends.rtmidi/{_RTMIDI_APIS[sys.platform]}")
+
 import mido
 from typing import Optional
 from mcp.server import Server
@@ -12,8 +21,13 @@ from mcp.types import Tool, TextContent, Resource
 import mcp.server.stdio
 import logging
 import json
-import os
+import math
+import re
+import struct
+import threading
+import time
 from pathlib import Path
+from midi_sender import MidiSender
 from nrpn_constants import (
     NRPN_MSB, TrackParams, TrigParams, SourceParams,
     FilterParams, AmpParams, LFO1Params, LFO2Params, LFO3Params,
@@ -25,8 +39,8 @@ from parameter_map import (
     get_all_parameters, get_parameters_by_category
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (set DIGITAKT_VERBOSE=1 for connection and backend info)
+logging.basicConfig(level=logging.INFO if os.environ.get("DIGITAKT_VERBOSE") == "1" else logging.WARNING)
 logger = logging.getLogger("digitakt-midi-server")
 
 # MIDI port name - will be auto-detected
@@ -40,6 +54,16 @@ PRESET_DIR.mkdir(parents=True, exist_ok=True)
 PATTERN_DIR = Path.home() / ".mcp-config" / "digitakt" / "patterns"
 PATTERN_DIR.mkdir(parents=True, exist_ok=True)
 
+# SysEx payloads above this size are sent off the event loop
+LARGE_SYSEX_BYTES = 256
+
+# Elektron manufacturer ID (00 20 3C) and Digitakt device ID (0x0E,
+# placeholder - may need verification) that start a dump request
+DUMP_REQUEST_PREFIX = b'\x00\x20\x3C\x0E'
+
+# A send_sysex hex_string once separators are stripped
+_HEX_RE = re.compile(r'[0-9A-Fa-f]*')
+
 # Create server instance
 server = Server("digitakt-midi-server")
 
@@ -47,723 +71,958 @@ server = Server("digitakt-midi-server")
 output_port: Optional[mido.ports.BaseOutput] = None
 input_port: Optional[mido.ports.BaseInput] = None
 
+# rtmidi send_message of the output port, when the backend exposes one
+_raw_send = None
+
+# MIDI channel voice status bytes (OR with the 0-indexed channel)
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+CONTROL_CHANGE = 0xB0
+PROGRAM_CHANGE = 0xC0
+
+# Pre-encoded system real-time messages
+MIDI_CLOCK = b'\xf8'
+MIDI_START = b'\xfa'
+MIDI_CONTINUE = b'\xfb'
+MIDI_STOP = b'\xfc'
+
+# Universal SysEx Identity Request, to any device
+DEVICE_INQUIRY = b'\xf0\x7e\x7f\x06\x01\xf7'
+
+# How far ahead of now play() puts the clocked tools' Start
+CLOCK_LEAD_NS = 10_000_000
+
+# How long the pattern tools hold track triggers and looped notes
+TRIGGER_LENGTH_NS = 50_000_000
+
 # Global history for last played melody/pattern
 last_melody = None  # Stores: {"bpm": int, "notes": [...], "channel": int}
 last_tracks = None  # Stores: {"bpm": int, "triggers": [...]}
 last_loop = None    # Stores: {"bpm": int, "loop_notes": [...], "loop_length": float, "channel": int}
 last_multi_channel_pattern = None  # Stores: {"bpm": int, "bars": int, "track_triggers": [...], "midi_channels": {...}}
 
+def set_output_port(port):
+    """Use port for MIDI output, caching its raw rtmidi send if available"""
+    global output_port, _raw_send
+    output_port = port
+    # mido's rtmidi backend keeps the rtmidi.MidiOut on the port as _rt
+    _raw_send = getattr(getattr(port, "_rt", None), "send_message", None)
+
+# The event loop and the sender thread both write to the port; RtMidi
+# output objects are not safe to call from two threads at once
+_write_lock = threading.Lock()
+
+# Name of the Digitakt output port found by connect_midi, for reconnects
+_output_port_name: Optional[str] = None
+# Taken before _write_lock, never while holding it
+_reconnect_lock = threading.Lock()
+
+# After a failed reopen, wait this long (doubling per failure, up to the
+# max) before trying again, so a clock loop on an unplugged device doesn't
+# attempt a port open for every message
+RECONNECT_BACKOFF = 0.1
+RECONNECT_BACKOFF_MAX = 5.0
+_reconnect_delay = RECONNECT_BACKOFF
+_reconnect_not_before = 0.0
+
+def reconnect_output() -> bool:
+    """Reopen the Digitakt output port by name, e.g. after it was unplugged and replugged"""
+    global _reconnect_delay, _reconnect_not_before
+    with _reconnect_lock:
+        if _output_port_name is None or time.monotonic() < _reconnect_not_before:
+            return False
+        try:
+            # Hold the write lock so the sender thread can't write to the
+            # port while it is half closed or being replaced
+            with _write_lock:
+                try:
+                    if output_port is not None:
+                        output_port.close()
+                except Exception:
+                    pass
+                set_output_port(mido.open_output(_output_port_name))
+        except Exception as e:
+            logger.error("Could not reopen MIDI output %s: %s", _output_port_name, e)
+            _reconnect_not_before = time.monotonic() + _reconnect_delay
+            _reconnect_delay = min(_reconnect_delay * 2, RECONNECT_BACKOFF_MAX)
+            return False
+        _reconnect_delay = RECONNECT_BACKOFF
+        _reconnect_not_before = 0.0
+        logger.info("Reconnected to MIDI output: %s", _output_port_name)
+        return True
+
+def _write(data: bytes):
+    with _write_lock:
+        if _raw_send is not None:
+            _raw_send(data)
+        else:
+            output_port.send(mido.Message.from_bytes(data))
+
+def send_bytes(data: bytes):
+    """Send one complete MIDI message given as raw bytes"""
+    try:
+        _write(data)
+    except Exception:
+        # Retry once on a reopened port before giving up
+        if not reconnect_output():
+            raise
+        _write(data)
+
+def _write_all(messages):
+    with _write_lock:
+        if _raw_send is not None:
+            for data in messages:
+                _raw_send(data)
+        else:
+            for data in messages:
+                output_port.send(mido.Message.from_bytes(data))
+
+def send_messages(messages):
+    """
+    Send several complete MIDI messages back to back, with no other
+    writes (e.g. clock pulses from the sender thread) in between
+    """
+    try:
+        _write_all(messages)
+    except Exception:
+        # Retry once on a reopened port before giving up
+        if not reconnect_output():
+            raise
+        _write_all(messages)
+
+# Precompiled packers for 2- and 3-byte channel messages
+_pack2 = struct.Struct("BB").pack
+_pack3 = struct.Struct("BBB").pack
+
+def _check_channel_data(channel: int, data1: int, data2: int = 0):
+    """Reject channels outside 0-15 and data bytes outside 0-127"""
+    if (channel >> 4) | ((data1 | data2) >> 7):
+        raise ValueError(f"MIDI value out of range (channel {channel + 1}, data {data1}, {data2})")
+
+def channel_message(status: int, channel: int, data1: int, data2: Optional[int] = None) -> bytes:
+    """
+    Build a channel voice message as raw bytes
+    status: NOTE_ON, NOTE_OFF, CONTROL_CHANGE or PROGRAM_CHANGE
+    channel: 0-indexed MIDI channel
+    data2: omit for two-byte messages (program change)
+    """
+    if data2 is None:
+        _check_channel_data(channel, data1)
+        return _pack2(status | channel, data1)
+    _check_channel_data(channel, data1, data2)
+    return _pack3(status | channel, data1, data2)
+
+def nrpn_messages(channel: int, msb: int, lsb: int, value: int) -> tuple:
+    """
+    The four CC messages of an NRPN as raw bytes:
+    CC 99 (NRPN MSB), CC 98 (NRPN LSB), CC 6 (Data Entry MSB), CC 38 (Data Entry LSB = 0)
+    """
+    _check_channel_data(channel, msb, lsb)
+    _check_channel_data(channel, value)
+    status = CONTROL_CHANGE | channel
+    return (
+        _pack3(status, 99, msb),
+        _pack3(status, 98, lsb),
+        _pack3(status, 6, value),
+        _pack3(status, 38, 0),
+    )
+
+def song_position_message(position: int) -> bytes:
+    """Build a Song Position Pointer (0xF2) for position in 16th notes"""
+    if not 0 <= position <= 16383:
+        raise ValueError(f"Song position {position} out of range (0-16383)")
+    return bytes((0xF2, position & 0x7F, position >> 7))
+
+def sysex_message(data) -> bytes:
+    """Frame SysEx data bytes (without F0/F7) as one complete message"""
+    # One copy of the payload, instead of mido checking it byte by byte
+    payload = bytes(data)
+    if payload and max(payload) > 0x7F:
+        raise ValueError("SysEx data bytes must be in range 0-127")
+    return b'\xF0' + payload + b'\xF7'
+
+# Most notes, triggers and parameter changes one tool call may schedule
+MAX_NOTES_PER_CALL = 4096
+
+def check_note_count(count: int, what: str = "notes"):
+    """Reject a tool call that would schedule more than MAX_NOTES_PER_CALL events"""
+    if count > MAX_NOTES_PER_CALL:
+        raise ValueError(f"Too many {what} ({count}); at most {MAX_NOTES_PER_CALL} per call")
+
+# Scratch buffers for immediate sends from the event loop thread. rtmidi
+# copies the message inside send_message, so they can be reused; messages
+# queued on the sender thread are always separate bytes objects.
+_scratch2 = bytearray(2)
+_scratch3 = bytearray(3)
+
+def send_channel_message(status: int, channel: int, data1: int, data2: Optional[int] = None):
+    """Send a channel voice message now, without allocating a message object"""
+    if data2 is None:
+        _check_channel_data(channel, data1)
+        buf = _scratch2
+    else:
+        _check_channel_data(channel, data1, data2)
+        buf = _scratch3
+        buf[2] = data2
+    buf[0] = status | channel
+    buf[1] = data1
+    send_bytes(buf)
+
+# Timed output runs on its own thread (see midi_sender.py)
+sender = MidiSender(send_bytes)
+
+# Port enumeration rescans the OS device list, so reuse it for a moment
+PORTS_CACHE_TTL = 2.0
+_ports_cache = {"t": 0.0, "v": None}
+
+# Long-lived rtmidi objects to list ports with; mido's name lookups each
+# create and delete a MidiIn and a MidiOut, which is slow on some drivers
+_port_probes = None
+
+def _scan_port_names() -> dict:
+    """List the MIDI input and output port names from the OS"""
+    global _port_probes
+    if mido.backend.name == "mido.backends.rtmidi":
+        if _port_probes is None:
+            import rtmidi
+            api = getattr(rtmidi, f"API_{mido.backend.api}", rtmidi.API_UNSPECIFIED)
+            _port_probes = (rtmidi.MidiIn(rtapi=api), rtmidi.MidiOut(rtapi=api))
+        probe_in, probe_out = _port_probes
+        return {"inputs": probe_in.get_ports(), "outputs": probe_out.get_ports()}
+    return {
+        "inputs": mido.get_input_names(),
+        "outputs": mido.get_output_names()
+    }
+
+def get_port_names(refresh: bool = False) -> dict:
+    """Return the MIDI input and output port names, rescanning at most every PORTS_CACHE_TTL seconds"""
+    now = time.monotonic()
+    if refresh or _ports_cache["v"] is None or now - _ports_cache["t"] > PORTS_CACHE_TTL:
+        _ports_cache.update(t=now, v=_scan_port_names())
+    return _ports_cache["v"]
+
 def connect_midi():
     """Connect to Digitakt MIDI ports"""
-    global output_port, input_port
+    global input_port, _output_port_name
     
     try:
+        logger.info("MIDI backend: %s (API: %s)", mido.backend.name, mido.backend.api or "default")
+        ports = get_port_names(refresh=True)
+
         # Find and connect to Digitakt output port
-        output_ports = mido.get_output_names()
-        for port_name in output_ports:
-            if DIGITAKT_PORT_NAME in port_name:
-                output_port = mido.open_output(port_name)
-                logger.info(f"Connected to MIDI output: {port_name}")
-                break
+        port_name = next((p for p in ports["outputs"] if DIGITAKT_PORT_NAME in p), None)
+        if port_name is not None:
+            set_output_port(mido.open_output(port_name))
+            _output_port_name = port_name
+            logger.info("Connected to MIDI output: %s", port_name)
 
         # Find and connect to Digitakt input port
-        input_ports = mido.get_input_names()
-        for port_name in input_ports:
-            if DIGITAKT_PORT_NAME in port_name:
-                input_port = mido.open_input(port_name)
-                logger.info(f"Connected to MIDI input: {port_name}")
-                break
+        port_name = next((p for p in ports["inputs"] if DIGITAKT_PORT_NAME in p), None)
+        if port_name is not None:
+            input_port = mido.open_input(port_name)
+            logger.info("Connected to MIDI input: %s", port_name)
 
         if not output_port:
-            logger.warning(f"Could not find MIDI output port for {DIGITAKT_PORT_NAME}")
+            logger.warning("Could not find MIDI output port for %s", DIGITAKT_PORT_NAME)
         if not input_port:
-            logger.warning(f"Could not find MIDI input port for {DIGITAKT_PORT_NAME}")
+            logger.warning("Could not find MIDI input port for %s", DIGITAKT_PORT_NAME)
 
     except Exception as e:
-        logger.error(f"Error connecting to MIDI: {e}")
+        logger.error("Error connecting to MIDI: %s", e)
 
-def send_parameter_change(param_name: str, value: int, channel: int = 0):
+    if output_port:
+        # Prime the driver so the first real note doesn't pay the port's
+        # cold-start cost. A device inquiry has no musical effect (unlike
+        # e.g. All Notes Off); the Digitakt's identity reply is ignored.
+        try:
+            send_bytes(DEVICE_INQUIRY)
+        except Exception as e:
+            logger.warning("Could not prime MIDI output: %s", e)
+
+def parameter_messages(param_name: str, value: int, channel: int = 0) -> tuple:
     """
-    Send a parameter change via CC or NRPN
+    The raw MIDI message(s) that set a parameter via CC or NRPN
     channel: 0-indexed MIDI channel
     """
     param_info = get_parameter_info(param_name)
     if not param_info:
         raise ValueError(f"Unknown parameter: {param_name}")
 
-    if param_info["type"] == "cc":
-        # Send CC message
-        msg = mido.Message('control_change', control=param_info["cc"], value=value, channel=channel)
-        output_port.send(msg)
-    elif param_info["type"] == "nrpn":
-        # Send NRPN message (4 CC messages)
-        output_port.send(mido.Message('control_change', control=99, value=param_info["msb"], channel=channel))
-        output_port.send(mido.Message('control_change', control=98, value=param_info["lsb"], channel=channel))
-        output_port.send(mido.Message('control_change', control=6, value=value, channel=channel))
-        output_port.send(mido.Message('control_change', control=38, value=0, channel=channel))
+    if param_info.type == "cc":
+        return (channel_message(CONTROL_CHANGE, channel, param_info.cc, value),)
+    elif param_info.type == "nrpn":
+        return nrpn_messages(channel, param_info.msb, param_info.lsb, value)
+    return ()
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """List available MIDI control tools"""
-    return [
-        Tool(
-            name="send_note",
-            description="Send a MIDI note on/off message to the Digitakt. To trigger one-shots on specific tracks, use notes 0-7 (Track 1-8). To play the active track chromatically, use notes 12-84.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "note": {
-                        "type": "integer",
-                        "description": "MIDI note number (0-127). Track triggers: 0-7 (Track 1-8). Chromatic: 12-84 (plays active track). Examples: 0=Track 1 kick, 1=Track 2 snare, 60=C3 on active track.",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Note velocity (1-127). 0 = note off. Default is 100.",
-                        "minimum": 0,
-                        "maximum": 127,
-                        "default": 100
-                    },
-                    "duration": {
-                        "type": "number",
-                        "description": "How long to hold the note in seconds. Default is 0.1 seconds.",
-                        "minimum": 0.001,
-                        "default": 0.1
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1 (auto channel on Digitakt).",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+def send_parameter_change(param_name: str, value: int, channel: int = 0):
+    """
+    Send a parameter change via CC or NRPN
+    channel: 0-indexed MIDI channel
+    """
+    # All messages are built, and so checked, before the first is sent,
+    # so a bad value can't leave a half-sent NRPN behind
+    send_messages(parameter_messages(param_name, value, channel))
+
+# Tool definitions are static, so build them once and hand out the same list
+TOOLS = [
+    Tool(
+        name="send_note",
+        description="Send a MIDI note on/off message to the Digitakt. To trigger one-shots on specific tracks, use notes 0-7 (Track 1-8). To play the active track chromatically, use notes 12-84.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "note": {
+                    "type": "integer",
+                    "description": "MIDI note number (0-127). Track triggers: 0-7 (Track 1-8). Chromatic: 12-84 (plays active track). Examples: 0=Track 1 kick, 1=Track 2 snare, 60=C3 on active track.",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["note"]
-            }
-        ),
-        Tool(
-            name="trigger_track",
-            description="Trigger a one-shot sample on a specific Digitakt II track (1-16). This is a convenience wrapper that sends the correct MIDI note (0-15) to trigger the track.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "track": {
-                        "type": "integer",
-                        "description": "Track number (1-16). Tracks 1-16 correspond to MIDI notes 0-15.",
-                        "minimum": 1,
-                        "maximum": 16
-                    },
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Note velocity (1-127). Default is 100.",
-                        "minimum": 1,
-                        "maximum": 127,
-                        "default": 100
-                    },
-                    "duration": {
-                        "type": "number",
-                        "description": "How long to hold the note in seconds. Default is 0.1 seconds.",
-                        "minimum": 0.001,
-                        "default": 0.1
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1 (AUTO CHANNEL).",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "velocity": {
+                    "type": "integer",
+                    "description": "Note velocity (1-127). 0 = note off. Default is 100.",
+                    "minimum": 0,
+                    "maximum": 127,
+                    "default": 100
                 },
-                "required": ["track"]
-            }
-        ),
-        Tool(
-            name="send_cc",
-            description="Send a MIDI Control Change (CC) message to control Digitakt parameters like filter, envelope, LFO, etc.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "cc_number": {
-                        "type": "integer",
-                        "description": "CC number (0-127). Common CCs: 74=Filter Freq, 71=Filter Res, 73=Attack, 75=Decay, etc.",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "value": {
-                        "type": "integer",
-                        "description": "CC value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "duration": {
+                    "type": "number",
+                    "description": "How long to hold the note in seconds. Default is 0.1 seconds.",
+                    "minimum": 0.001,
+                    "default": 0.1
                 },
-                "required": ["cc_number", "value"]
-            }
-        ),
-        Tool(
-            name="send_program_change",
-            description="Send a MIDI Program Change message to switch patterns on the Digitakt",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "program": {
-                        "type": "integer",
-                        "description": "Program number (0-127). Patterns are numbered 0-127 across banks.",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1 (auto channel on Digitakt).",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["note"]
+        }
+    ),
+    Tool(
+        name="trigger_track",
+        description="Trigger a one-shot sample on a specific Digitakt II track (1-16). This is a convenience wrapper that sends the correct MIDI note (0-15) to trigger the track.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "track": {
+                    "type": "integer",
+                    "description": "Track number (1-16). Tracks 1-16 correspond to MIDI notes 0-15.",
+                    "minimum": 1,
+                    "maximum": 16
                 },
-                "required": ["program"]
-            }
-        ),
-        Tool(
-            name="send_note_sequence",
-            description="Send a sequence of MIDI notes with timing. Useful for creating rhythms or melodies.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "notes": {
-                        "type": "array",
-                        "description": "Array of note events. Each event is [note, velocity, duration_sec]",
-                        "items": {
-                            "type": "array",
-                            "minItems": 3,
-                            "maxItems": 3,
-                            "items": {"type": "number"}
-                        }
-                    },
-                    "delay": {
-                        "type": "number",
-                        "description": "Delay between notes in seconds. Default is 0.25 (quarter note at 120 BPM)",
-                        "minimum": 0,
-                        "default": 0.25
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "velocity": {
+                    "type": "integer",
+                    "description": "Note velocity (1-127). Default is 100.",
+                    "minimum": 1,
+                    "maximum": 127,
+                    "default": 100
                 },
-                "required": ["notes"]
-            }
-        ),
-        Tool(
-            name="send_sysex",
-            description="Send a System Exclusive (SysEx) message to the Digitakt. SysEx messages can be used for advanced control, pattern programming, and device configuration. Elektron manufacturer ID is 0x00 0x20 0x3C.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "data": {
-                        "type": "array",
-                        "description": "Array of bytes to send as SysEx data (excluding F0 start and F7 end bytes, which are added automatically). Example: [0x00, 0x20, 0x3C, ...]. For Elektron devices, messages typically start with manufacturer ID [0x00, 0x20, 0x3C].",
-                        "items": {
-                            "type": "integer",
-                            "minimum": 0,
-                            "maximum": 127
-                        }
-                    },
-                    "hex_string": {
-                        "type": "string",
-                        "description": "Alternative to 'data': provide SysEx data as a hex string (e.g., '00203C...'). Spaces are ignored."
-                    }
+                "duration": {
+                    "type": "number",
+                    "description": "How long to hold the note in seconds. Default is 0.1 seconds.",
+                    "minimum": 0.001,
+                    "default": 0.1
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1 (AUTO CHANNEL).",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
                 }
-            }
-        ),
-        Tool(
-            name="request_sysex_dump",
-            description="Request a SysEx data dump from the Digitakt (pattern, sound, kit, or project data). Note: You'll need to capture the response separately.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dump_type": {
-                        "type": "string",
-                        "description": "Type of data to request: 'pattern', 'sound', 'kit', or 'project'",
-                        "enum": ["pattern", "sound", "kit", "project"]
-                    },
-                    "bank": {
-                        "type": "integer",
-                        "description": "Bank number (0-15 for patterns). Optional.",
-                        "minimum": 0,
-                        "maximum": 15
-                    },
-                    "pattern_number": {
-                        "type": "integer",
-                        "description": "Pattern number within bank (0-15). Optional.",
-                        "minimum": 0,
-                        "maximum": 15
-                    }
+            },
+            "required": ["track"]
+        }
+    ),
+    Tool(
+        name="send_cc",
+        description="Send a MIDI Control Change (CC) message to control Digitakt parameters like filter, envelope, LFO, etc.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "cc_number": {
+                    "type": "integer",
+                    "description": "CC number (0-127). Common CCs: 74=Filter Freq, 71=Filter Res, 73=Attack, 75=Decay, etc.",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["dump_type"]
-            }
-        ),
-        Tool(
-            name="send_nrpn",
-            description="Send an NRPN (Non-Registered Parameter Number) message to control Digitakt parameters. NRPNs provide access to more parameters than standard CCs, including per-trig control (note, velocity, length), filter, amp, LFO, and effects parameters.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "msb": {
-                        "type": "integer",
-                        "description": "NRPN MSB (Most Significant Byte). 1=Track/Trig/Source/Filter/Amp, 2=FX, 3=Trig Note/Velocity/Length",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "lsb": {
-                        "type": "integer",
-                        "description": "NRPN LSB (Least Significant Byte) - the specific parameter number",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "value": {
-                        "type": "integer",
-                        "description": "Parameter value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "value": {
+                    "type": "integer",
+                    "description": "CC value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["msb", "lsb", "value"]
-            }
-        ),
-        Tool(
-            name="set_trig_note",
-            description="Set the note/pitch for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=0.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "note": {
-                        "type": "integer",
-                        "description": "MIDI note number (0-127). For Digitakt: 60=C3",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["cc_number", "value"]
+        }
+    ),
+    Tool(
+        name="send_program_change",
+        description="Send a MIDI Program Change message to switch patterns on the Digitakt",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "program": {
+                    "type": "integer",
+                    "description": "Program number (0-127). Patterns are numbered 0-127 across banks.",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["note"]
-            }
-        ),
-        Tool(
-            name="set_trig_velocity",
-            description="Set the velocity for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=1.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Velocity (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["program"]
+        }
+    ),
+    Tool(
+        name="send_note_sequence",
+        description="Send a sequence of MIDI notes with timing. Useful for creating rhythms or melodies.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "notes": {
+                    "type": "array",
+                    "description": "Array of note events. Each event is [note, velocity, duration_sec]",
+                    "items": {
+                        "type": "array",
+                        "minItems": 3,
+                        "maxItems": 3,
+                        "items": {"type": "number"}
                     }
                 },
-                "required": ["velocity"]
-            }
-        ),
-        Tool(
-            name="set_trig_length",
-            description="Set the note length for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=2.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "length": {
+                "delay": {
+                    "type": "number",
+                    "description": "Delay between notes in seconds. Default is 0.25 (quarter note at 120 BPM)",
+                    "minimum": 0,
+                    "default": 0.25
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["notes"]
+        }
+    ),
+    Tool(
+        name="send_sysex",
+        description="Send a System Exclusive (SysEx) message to the Digitakt. SysEx messages can be used for advanced control, pattern programming, and device configuration. Elektron manufacturer ID is 0x00 0x20 0x3C.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "data": {
+                    "type": "array",
+                    "description": "Array of bytes to send as SysEx data (excluding F0 start and F7 end bytes, which are added automatically). Example: [0x00, 0x20, 0x3C, ...]. For Elektron devices, messages typically start with manufacturer ID [0x00, 0x20, 0x3C].",
+                    "items": {
                         "type": "integer",
-                        "description": "Note length (0-127)",
                         "minimum": 0,
                         "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
                     }
                 },
-                "required": ["length"]
+                "hex_string": {
+                    "type": "string",
+                    "description": "Alternative to 'data': provide SysEx data as a hex string (e.g., '00203C...'). Spaces are ignored."
+                }
             }
-        ),
-        Tool(
-            name="reset_velocities",
-            description="Reset trig velocity to a default value (120) on all 16 tracks. Useful after DAWs like Logic reset velocities to 0 when quitting.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Velocity value to set on all tracks (0-127). Default is 120.",
-                        "minimum": 0,
-                        "maximum": 127,
-                        "default": 120
-                    }
+        }
+    ),
+    Tool(
+        name="request_sysex_dump",
+        description="Request a SysEx data dump from the Digitakt (pattern, sound, kit, or project data). Note: You'll need to capture the response separately.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dump_type": {
+                    "type": "string",
+                    "description": "Type of data to request: 'pattern', 'sound', 'kit', or 'project'",
+                    "enum": ["pattern", "sound", "kit", "project"]
                 },
-                "required": []
-            }
-        ),
-        Tool(
-            name="send_midi_start",
-            description="Send MIDI Start message to start the Digitakt's sequencer from the beginning. This is a standard MIDI transport control message.",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="send_midi_stop",
-            description="Send MIDI Stop message to stop the Digitakt's sequencer. This is a standard MIDI transport control message.",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="send_midi_continue",
-            description="Send MIDI Continue message to resume the Digitakt's sequencer from its current position. This is a standard MIDI transport control message.",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="send_song_position",
-            description="Send MIDI Song Position Pointer to jump to a specific position in the sequence. Position is measured in MIDI beats (16th notes).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "position": {
-                        "type": "integer",
-                        "description": "Song position in MIDI beats (16th notes). 0 = start, 16 = 1 bar at 4/4 time.",
-                        "minimum": 0,
-                        "maximum": 16383
-                    }
+                "bank": {
+                    "type": "integer",
+                    "description": "Bank number (0-15 for patterns). Optional.",
+                    "minimum": 0,
+                    "maximum": 15
+                },
+                "pattern_number": {
+                    "type": "integer",
+                    "description": "Pattern number within bank (0-15). Optional.",
+                    "minimum": 0,
+                    "maximum": 15
+                }
+            },
+            "required": ["dump_type"]
+        }
+    ),
+    Tool(
+        name="send_nrpn",
+        description="Send an NRPN (Non-Registered Parameter Number) message to control Digitakt parameters. NRPNs provide access to more parameters than standard CCs, including per-trig control (note, velocity, length), filter, amp, LFO, and effects parameters.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "msb": {
+                    "type": "integer",
+                    "description": "NRPN MSB (Most Significant Byte). 1=Track/Trig/Source/Filter/Amp, 2=FX, 3=Trig Note/Velocity/Length",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["position"]
+                "lsb": {
+                    "type": "integer",
+                    "description": "NRPN LSB (Least Significant Byte) - the specific parameter number",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "value": {
+                    "type": "integer",
+                    "description": "Parameter value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["msb", "lsb", "value"]
+        }
+    ),
+    Tool(
+        name="set_trig_note",
+        description="Set the note/pitch for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=0.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "note": {
+                    "type": "integer",
+                    "description": "MIDI note number (0-127). For Digitakt: 60=C3",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["note"]
+        }
+    ),
+    Tool(
+        name="set_trig_velocity",
+        description="Set the velocity for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=1.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "velocity": {
+                    "type": "integer",
+                    "description": "Velocity (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["velocity"]
+        }
+    ),
+    Tool(
+        name="set_trig_length",
+        description="Set the note length for a trig (step). This is a convenience wrapper for NRPN MSB=3, LSB=2.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "length": {
+                    "type": "integer",
+                    "description": "Note length (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["length"]
+        }
+    ),
+    Tool(
+        name="reset_velocities",
+        description="Reset trig velocity to a default value (120) on all 16 tracks. Useful after DAWs like Logic reset velocities to 0 when quitting.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "velocity": {
+                    "type": "integer",
+                    "description": "Velocity value to set on all tracks (0-127). Default is 120.",
+                    "minimum": 0,
+                    "maximum": 127,
+                    "default": 120
+                }
+            },
+            "required": []
+        }
+    ),
+    Tool(
+        name="send_midi_start",
+        description="Send MIDI Start message to start the Digitakt's sequencer from the beginning. This is a standard MIDI transport control message.",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="send_midi_stop",
+        description="Send MIDI Stop message to stop the Digitakt's sequencer. This is a standard MIDI transport control message.",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="send_midi_continue",
+        description="Send MIDI Continue message to resume the Digitakt's sequencer from its current position. This is a standard MIDI transport control message.",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="send_song_position",
+        description="Send MIDI Song Position Pointer to jump to a specific position in the sequence. Position is measured in MIDI beats (16th notes).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "position": {
+                    "type": "integer",
+                    "description": "Song position in MIDI beats (16th notes). 0 = start, 16 = 1 bar at 4/4 time.",
+                    "minimum": 0,
+                    "maximum": 16383
+                }
+            },
+            "required": ["position"]
+        }
+    ),
+    Tool(
+        name="play_with_clock",
+        description="Start the Digitakt sequencer and send MIDI clock for a specified duration. The Digitakt requires receiving MIDI clock to play when externally controlled.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                }
             }
-        ),
-        Tool(
-            name="play_with_clock",
-            description="Start the Digitakt sequencer and send MIDI clock for a specified duration. The Digitakt requires receiving MIDI clock to play when externally controlled.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
+        }
+    ),
+    Tool(
+        name="play_pattern_with_tracks",
+        description="Start the Digitakt pattern and trigger specific tracks at specific times. Sends MIDI Start + Clock while also sending note triggers.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "triggers": {
+                    "type": "array",
+                    "description": "Array of [beat, track, velocity] where beat is 0-based quarter note (0=start, 1=beat 2, etc), track is 1-16, velocity is 1-127.",
+                    "items": {
+                        "type": "array",
+                        "minItems": 2,
+                        "maxItems": 3
                     }
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
                 }
-            }
-        ),
-        Tool(
-            name="play_pattern_with_tracks",
-            description="Start the Digitakt pattern and trigger specific tracks at specific times. Sends MIDI Start + Clock while also sending note triggers.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "triggers": {
+            },
+            "required": ["triggers"]
+        }
+    ),
+    Tool(
+        name="play_pattern_with_melody",
+        description="Start the Digitakt pattern and play a melodic sequence on the active track. Sends MIDI Start + Clock while also sending notes.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "notes": {
+                    "type": "array",
+                    "description": "Array of [beat, note, velocity, duration] where beat is 0-based quarter note, note is MIDI note 12-127, velocity is 1-127, duration is in seconds.",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat, track, velocity] where beat is 0-based quarter note (0=start, 1=beat 2, etc), track is 1-16, velocity is 1-127.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 3
-                        }
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
+                        "minItems": 2,
+                        "maxItems": 4
                     }
                 },
-                "required": ["triggers"]
-            }
-        ),
-        Tool(
-            name="play_pattern_with_melody",
-            description="Start the Digitakt pattern and play a melodic sequence on the active track. Sends MIDI Start + Clock while also sending notes.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "notes": {
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1 (auto channel).",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                }
+            },
+            "required": ["notes"]
+        }
+    ),
+    Tool(
+        name="play_pattern_with_loop",
+        description="Start the Digitakt pattern and continuously trigger notes on a loop. Sends MIDI Start + Clock while looping note triggers.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "loop_notes": {
+                    "type": "array",
+                    "description": "Array of [beat_offset, note_or_track, velocity] where beat_offset is relative to loop start (0-3.99 for 1 bar loop), note/track can be 0-15 for tracks or 12+ for melody, velocity is 1-127.",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat, note, velocity, duration] where beat is 0-based quarter note, note is MIDI note 12-127, velocity is 1-127, duration is in seconds.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 4
-                        }
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1 (auto channel).",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
+                        "minItems": 2,
+                        "maxItems": 3
                     }
                 },
-                "required": ["notes"]
-            }
-        ),
-        Tool(
-            name="play_pattern_with_loop",
-            description="Start the Digitakt pattern and continuously trigger notes on a loop. Sends MIDI Start + Clock while looping note triggers.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "loop_notes": {
+                "loop_length": {
+                    "type": "number",
+                    "description": "Length of the loop in bars (in 4/4 time). Default is 1 bar.",
+                    "minimum": 0.25,
+                    "default": 1
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1 (auto channel).",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                }
+            },
+            "required": ["loop_notes"]
+        }
+    ),
+    Tool(
+        name="play_pattern_with_tracks_and_melody",
+        description="Start the Digitakt pattern and play both track triggers and melody simultaneously. Combines MIDI transport control with both drum triggers and chromatic notes. Note: Track triggers are sent on per-track MIDI channels (Track 1→Ch1, Track 2→Ch2, etc). Configure Digitakt MIDI channels to match for simultaneous multi-track triggering.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] where beat is 0-based quarter note, track is 1-16, velocity is 1-127, and optional note is MIDI note 0-127 for chromatic triggering (if omitted, uses track number as note for standard triggering).",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat_offset, note_or_track, velocity] where beat_offset is relative to loop start (0-3.99 for 1 bar loop), note/track can be 0-15 for tracks or 12+ for melody, velocity is 1-127.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 3
-                        }
+                        "minItems": 2,
+                        "maxItems": 4
                     },
-                    "loop_length": {
-                        "type": "number",
-                        "description": "Length of the loop in bars (in 4/4 time). Default is 1 bar.",
-                        "minimum": 0.25,
-                        "default": 1
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1 (auto channel).",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
+                    "default": []
+                },
+                "melody_notes": {
+                    "type": "array",
+                    "description": "Array of [beat, note, velocity, duration] where beat is 0-based quarter note, note is MIDI note 12-127, velocity is 1-127, duration is in seconds.",
+                    "items": {
+                        "type": "array",
+                        "minItems": 2,
+                        "maxItems": 4
                     },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
-                    }
+                    "default": []
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel for melody notes (1-16). Track triggers always use channel 1. Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
                 },
-                "required": ["loop_notes"]
+                "midi_start_at_beat": {
+                    "type": "number",
+                    "description": "Beat number (0-based) to send MIDI Start and begin MIDI Clock. Before this beat, only note triggers are sent (no transport control). When starting mid-sequence (beat > 0), a MIDI Song Position Pointer message is sent before MIDI Start to ensure the Digitakt sequencer aligns with the correct beat position. Default is 0 (send MIDI Start immediately). Use this for count-in workflows where you want to arm recording during count-in, then start Digitakt sequencer at a specific beat.",
+                    "minimum": 0,
+                    "default": 0
+                },
+                "preroll_bars": {
+                    "type": "number",
+                    "description": "Number of bars to delay melody notes (not track triggers). Track triggers play immediately, melody notes start after preroll. Use for live recording: set preroll_bars to the loop length, arm recording during preroll, then melody notes get recorded. Default is 0 (no preroll).",
+                    "minimum": 0,
+                    "default": 0
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                }
             }
-        ),
-        Tool(
-            name="play_pattern_with_tracks_and_melody",
-            description="Start the Digitakt pattern and play both track triggers and melody simultaneously. Combines MIDI transport control with both drum triggers and chromatic notes. Note: Track triggers are sent on per-track MIDI channels (Track 1→Ch1, Track 2→Ch2, etc). Configure Digitakt MIDI channels to match for simultaneous multi-track triggering.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "track_triggers": {
+        }
+    ),
+    Tool(
+        name="play_pattern_with_multi_channel_midi",
+        description="Play patterns with MIDI notes on multiple channels simultaneously. Send drums to Digitakt tracks while also sending MIDI notes to multiple external instruments on different channels (e.g., chords on channel 9, pad melody on channel 12) all synchronized together. Note: Track triggers are sent on per-track MIDI channels (Track 1→Ch1, Track 2→Ch2, etc). Configure Digitakt MIDI channels to match for simultaneous multi-track triggering.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for Digitakt drum tracks where beat is 0-based quarter note, track is 1-16, velocity is 1-127, and optional note is MIDI note 0-127 for chromatic triggering (if omitted, uses track number as note for standard triggering).",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] where beat is 0-based quarter note, track is 1-16, velocity is 1-127, and optional note is MIDI note 0-127 for chromatic triggering (if omitted, uses track number as note for standard triggering).",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 4
-                        },
-                        "default": []
+                        "minItems": 2,
+                        "maxItems": 4
                     },
-                    "melody_notes": {
+                    "default": []
+                },
+                "midi_channels": {
+                    "type": "object",
+                    "description": "Dictionary mapping MIDI channel numbers (1-16) to arrays of [beat, note, velocity, duration]. Each channel can have independent note sequences. Example: {'9': [[0, 54, 75, 3.9], [0.01, 57, 75, 3.9]], '12': [[0, 69, 70, 1.9], [2, 73, 65, 1.9]]}",
+                    "additionalProperties": {
                         "type": "array",
-                        "description": "Array of [beat, note, velocity, duration] where beat is 0-based quarter note, note is MIDI note 12-127, velocity is 1-127, duration is in seconds.",
                         "items": {
                             "type": "array",
                             "minItems": 2,
                             "maxItems": 4
-                        },
-                        "default": []
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel for melody notes (1-16). Track triggers always use channel 1. Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    },
-                    "midi_start_at_beat": {
-                        "type": "number",
-                        "description": "Beat number (0-based) to send MIDI Start and begin MIDI Clock. Before this beat, only note triggers are sent (no transport control). When starting mid-sequence (beat > 0), a MIDI Song Position Pointer message is sent before MIDI Start to ensure the Digitakt sequencer aligns with the correct beat position. Default is 0 (send MIDI Start immediately). Use this for count-in workflows where you want to arm recording during count-in, then start Digitakt sequencer at a specific beat.",
-                        "minimum": 0,
-                        "default": 0
-                    },
-                    "preroll_bars": {
-                        "type": "number",
-                        "description": "Number of bars to delay melody notes (not track triggers). Track triggers play immediately, melody notes start after preroll. Use for live recording: set preroll_bars to the loop length, arm recording during preroll, then melody notes get recorded. Default is 0 (no preroll).",
-                        "minimum": 0,
-                        "default": 0
+                        }
                     },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="play_pattern_with_multi_channel_midi",
-            description="Play patterns with MIDI notes on multiple channels simultaneously. Send drums to Digitakt tracks while also sending MIDI notes to multiple external instruments on different channels (e.g., chords on channel 9, pad melody on channel 12) all synchronized together. Note: Track triggers are sent on per-track MIDI channels (Track 1→Ch1, Track 2→Ch2, etc). Configure Digitakt MIDI channels to match for simultaneous multi-track triggering.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "track_triggers": {
-                        "type": "array",
-                        "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for Digitakt drum tracks where beat is 0-based quarter note, track is 1-16, velocity is 1-127, and optional note is MIDI note 0-127 for chromatic triggering (if omitted, uses track number as note for standard triggering).",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 4
-                        },
-                        "default": []
-                    },
-                    "midi_channels": {
-                        "type": "object",
-                        "description": "Dictionary mapping MIDI channel numbers (1-16) to arrays of [beat, note, velocity, duration]. Each channel can have independent note sequences. Example: {'9': [[0, 54, 75, 3.9], [0.01, 57, 75, 3.9]], '12': [[0, 69, 70, 1.9], [2, 73, 65, 1.9]]}",
-                        "additionalProperties": {
-                            "type": "array",
-                            "items": {
-                                "type": "array",
-                                "minItems": 2,
-                                "maxItems": 4
-                            }
-                        },
-                        "default": {}
-                    },
-                    "send_clock": {
-                        "type": "boolean",
-                        "description": "Send MIDI Clock messages for transport sync. Default is true.",
-                        "default": True
-                    },
-                    "midi_start_at_beat": {
-                        "type": "number",
-                        "description": "Beat number (0-based) to send MIDI Start and begin MIDI Clock. Before this beat, only note triggers are sent (no transport control). When starting mid-sequence (beat > 0), a MIDI Song Position Pointer message is sent before MIDI Start to ensure the Digitakt sequencer aligns with the correct beat position. Default is 0 (send MIDI Start immediately).",
-                        "minimum": 0,
-                        "default": 0
-                    },
-                    "preroll_bars": {
-                        "type": "number",
-                        "description": "Number of bars to delay MIDI channel notes (not track triggers). Track triggers play immediately, MIDI notes start after preroll. Use for live recording: set preroll_bars to the loop length, arm recording during preroll, then MIDI notes get recorded. Default is 0 (no preroll).",
-                        "minimum": 0,
-                        "default": 0
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
-                    },
-                    "parameter_automation": {
-                        "type": "object",
-                        "description": """Optional parameter automation. Automate any Digitakt parameter over time with MIDI CC/NRPN messages.
+                    "default": {}
+                },
+                "send_clock": {
+                    "type": "boolean",
+                    "description": "Send MIDI Clock messages for transport sync. Default is true.",
+                    "default": True
+                },
+                "midi_start_at_beat": {
+                    "type": "number",
+                    "description": "Beat number (0-based) to send MIDI Start and begin MIDI Clock. Before this beat, only note triggers are sent (no transport control). When starting mid-sequence (beat > 0), a MIDI Song Position Pointer message is sent before MIDI Start to ensure the Digitakt sequencer aligns with the correct beat position. Default is 0 (send MIDI Start immediately).",
+                    "minimum": 0,
+                    "default": 0
+                },
+                "preroll_bars": {
+                    "type": "number",
+                    "description": "Number of bars to delay MIDI channel notes (not track triggers). Track triggers play immediately, MIDI notes start after preroll. Use for live recording: set preroll_bars to the loop length, arm recording during preroll, then MIDI notes get recorded. Default is 0 (no preroll).",
+                    "minimum": 0,
+                    "default": 0
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                },
+                "parameter_automation": {
+                    "type": "object",
+                    "description": """Optional parameter automation. Automate any Digitakt parameter over time with MIDI CC/NRPN messages.
 
 Two formats supported:
 
@@ -794,11 +1053,11 @@ Example - 4-bar filter sweep on track 11, LFO sweep on track 13:
 }
 
 Combine with automation_loop_bars to repeat patterns. Use list_parameters to see all available parameters.""",
-                        "default": {}
-                    },
-                    "automation_loop_bars": {
-                        "type": "number",
-                        "description": """Optional: Automatically repeat parameter automation every N bars.
+                    "default": {}
+                },
+                "automation_loop_bars": {
+                    "type": "number",
+                    "description": """Optional: Automatically repeat parameter automation every N bars.
 
 When set, automation events defined in the first N bars will be duplicated at each N-bar interval throughout the total duration.
 
@@ -820,3102 +1079,2861 @@ Complete example - 4-bar evolving filter sweep repeated over 16 bars:
 This creates smooth filter and LFO sweeps that repeat every 4 bars for the full 16-bar duration.
 
 Default is 0 (no looping - automation plays once).""",
-                        "minimum": 0,
-                        "default": 0
-                    }
+                    "minimum": 0,
+                    "default": 0
                 }
             }
-        ),
-        Tool(
-            name="save_last_melody",
-            description="Save the last played melody from play_pattern_with_melody to a MIDI file. The melody is saved with the original tempo and timing.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Filename for the MIDI file (e.g., 'my_melody.mid'). Will be saved in the current directory."
-                    }
+        }
+    ),
+    Tool(
+        name="save_last_melody",
+        description="Save the last played melody from play_pattern_with_melody to a MIDI file. The melody is saved with the original tempo and timing.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "Filename for the MIDI file (e.g., 'my_melody.mid'). Will be saved in the current directory."
+                }
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="save_last_pattern",
+        description="Save the last played pattern from play_pattern_with_multi_channel_midi to a standard MIDI file. Saves all track triggers and MIDI channel notes with proper tempo and multi-track format.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "Filename for the MIDI file (e.g., 'my_pattern.mid'). Will add .mid extension if not present."
+                }
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="send_filter_sweep",
+        description="Smoothly sweep the filter cutoff from one value to another over a specified duration. Useful for creating dynamic filter movements.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "start_value": {
+                    "type": "integer",
+                    "description": "Starting filter cutoff value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["filename"]
-            }
-        ),
-        Tool(
-            name="save_last_pattern",
-            description="Save the last played pattern from play_pattern_with_multi_channel_midi to a standard MIDI file. Saves all track triggers and MIDI channel notes with proper tempo and multi-track format.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Filename for the MIDI file (e.g., 'my_pattern.mid'). Will add .mid extension if not present."
-                    }
+                "end_value": {
+                    "type": "integer",
+                    "description": "Ending filter cutoff value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["filename"]
-            }
-        ),
-        Tool(
-            name="send_filter_sweep",
-            description="Smoothly sweep the filter cutoff from one value to another over a specified duration. Useful for creating dynamic filter movements.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "start_value": {
-                        "type": "integer",
-                        "description": "Starting filter cutoff value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "end_value": {
-                        "type": "integer",
-                        "description": "Ending filter cutoff value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "duration_sec": {
-                        "type": "number",
-                        "description": "Duration of the sweep in seconds",
-                        "minimum": 0.1
-                    },
-                    "curve": {
-                        "type": "string",
-                        "description": "Sweep curve shape: 'linear' (constant rate), 'exponential' (fast start, slow end), 'logarithmic' (slow start, fast end)",
-                        "enum": ["linear", "exponential", "logarithmic"],
-                        "default": "linear"
-                    },
-                    "steps": {
-                        "type": "integer",
-                        "description": "Number of CC messages to send (more = smoother). Default is 50.",
-                        "minimum": 2,
-                        "maximum": 200,
-                        "default": 50
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "duration_sec": {
+                    "type": "number",
+                    "description": "Duration of the sweep in seconds",
+                    "minimum": 0.1
                 },
-                "required": ["start_value", "end_value", "duration_sec"]
-            }
-        ),
-        Tool(
-            name="send_filter_envelope",
-            description="Apply an ADSR-style envelope to the filter cutoff. Creates organic filter movements with attack, decay, sustain, and release stages.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "attack_sec": {
-                        "type": "number",
-                        "description": "Attack time in seconds - time to reach peak (127)",
-                        "minimum": 0.01
-                    },
-                    "decay_sec": {
-                        "type": "number",
-                        "description": "Decay time in seconds - time to drop from peak to sustain level",
-                        "minimum": 0.01
-                    },
-                    "sustain_level": {
-                        "type": "integer",
-                        "description": "Sustain filter cutoff value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "release_sec": {
-                        "type": "number",
-                        "description": "Release time in seconds - time to return to 0",
-                        "minimum": 0.01
-                    },
-                    "steps_per_stage": {
-                        "type": "integer",
-                        "description": "Number of CC messages per stage (more = smoother). Default is 20.",
-                        "minimum": 2,
-                        "maximum": 100,
-                        "default": 20
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "curve": {
+                    "type": "string",
+                    "description": "Sweep curve shape: 'linear' (constant rate), 'exponential' (fast start, slow end), 'logarithmic' (slow start, fast end)",
+                    "enum": ["linear", "exponential", "logarithmic"],
+                    "default": "linear"
                 },
-                "required": ["attack_sec", "decay_sec", "sustain_level", "release_sec"]
-            }
-        ),
-        Tool(
-            name="play_with_filter_automation",
-            description="Play a pattern with automated filter cutoff changes at specific beats. Combines transport control, track triggers, and precise filter automation.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "track_triggers": {
-                        "type": "array",
-                        "description": "Optional array of [beat, track, velocity] where beat is 0-based quarter note, track is 1-16, velocity is 1-127.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 3
-                        },
-                        "default": []
-                    },
-                    "filter_events": {
-                        "type": "array",
-                        "description": "Array of [beat, cutoff_value] for timed filter cutoff changes. Beat is 0-based quarter note, cutoff is 0-127.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 2
-                        }
-                    },
-                    "send_clock": {
-                        "type": "boolean",
-                        "description": "Send MIDI Start and Clock messages. Default is true.",
-                        "default": True
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "steps": {
+                    "type": "integer",
+                    "description": "Number of CC messages to send (more = smoother). Default is 50.",
+                    "minimum": 2,
+                    "maximum": 200,
+                    "default": 50
                 },
-                "required": ["filter_events"]
-            }
-        ),
-        Tool(
-            name="set_parameter",
-            description="Set any parameter to a specific value instantly. Works with all parameters including filter, amp, LFO, sample, and FX parameters. Use this for immediate parameter changes without sweeping.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "parameter": {
-                        "type": "string",
-                        "description": "Parameter name to set. Examples: 'filter_cutoff', 'lfo1_depth', 'amp_volume', 'lfo1_destination'. Use list_parameters tool to see all available parameters."
-                    },
-                    "value": {
-                        "type": "integer",
-                        "description": "Parameter value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["start_value", "end_value", "duration_sec"]
+        }
+    ),
+    Tool(
+        name="send_filter_envelope",
+        description="Apply an ADSR-style envelope to the filter cutoff. Creates organic filter movements with attack, decay, sustain, and release stages.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "attack_sec": {
+                    "type": "number",
+                    "description": "Attack time in seconds - time to reach peak (127)",
+                    "minimum": 0.01
                 },
-                "required": ["parameter", "value"]
-            }
-        ),
-        Tool(
-            name="send_parameter_sweep",
-            description="Smoothly sweep any parameter from one value to another over a specified duration. Works with all parameters including filter, amp, LFO, sample, and FX parameters. Use this for creating dynamic parameter movements like filter sweeps, pitch bends, LFO depth fades, etc.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "parameter": {
-                        "type": "string",
-                        "description": "Parameter name to sweep. Examples: 'filter_cutoff', 'filter_resonance', 'amp_attack', 'lfo1_depth', 'sample_start', 'pitch'. Use list_parameters tool to see all available parameters."
-                    },
-                    "start_value": {
-                        "type": "integer",
-                        "description": "Starting parameter value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "end_value": {
-                        "type": "integer",
-                        "description": "Ending parameter value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "duration_sec": {
-                        "type": "number",
-                        "description": "Duration of the sweep in seconds",
-                        "minimum": 0.1
-                    },
-                    "curve": {
-                        "type": "string",
-                        "description": "Sweep curve shape: 'linear' (constant rate), 'exponential' (fast start, slow end), 'logarithmic' (slow start, fast end)",
-                        "enum": ["linear", "exponential", "logarithmic"],
-                        "default": "linear"
-                    },
-                    "steps": {
-                        "type": "integer",
-                        "description": "Number of messages to send (more = smoother). Default is 50.",
-                        "minimum": 2,
-                        "maximum": 200,
-                        "default": 50
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "decay_sec": {
+                    "type": "number",
+                    "description": "Decay time in seconds - time to drop from peak to sustain level",
+                    "minimum": 0.01
                 },
-                "required": ["parameter", "start_value", "end_value", "duration_sec"]
-            }
-        ),
-        Tool(
-            name="send_parameter_envelope",
-            description="Apply an ADSR-style envelope to any parameter. Creates organic parameter movements with attack, decay, sustain, and release stages. Great for filter envelopes, amp envelopes, LFO depth modulation, etc.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "parameter": {
-                        "type": "string",
-                        "description": "Parameter name to modulate. Examples: 'filter_cutoff', 'amp_volume', 'lfo1_depth', 'sample_start'."
-                    },
-                    "attack_sec": {
-                        "type": "number",
-                        "description": "Attack time in seconds - time to reach peak (127)",
-                        "minimum": 0.01
-                    },
-                    "decay_sec": {
-                        "type": "number",
-                        "description": "Decay time in seconds - time to drop from peak to sustain level",
-                        "minimum": 0.01
-                    },
-                    "sustain_level": {
-                        "type": "integer",
-                        "description": "Sustain parameter value (0-127)",
-                        "minimum": 0,
-                        "maximum": 127
-                    },
-                    "release_sec": {
-                        "type": "number",
-                        "description": "Release time in seconds - time to return to 0",
-                        "minimum": 0.01
-                    },
-                    "steps_per_stage": {
-                        "type": "integer",
-                        "description": "Number of messages per stage (more = smoother). Default is 20.",
-                        "minimum": 2,
-                        "maximum": 100,
-                        "default": 20
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "sustain_level": {
+                    "type": "integer",
+                    "description": "Sustain filter cutoff value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["parameter", "attack_sec", "decay_sec", "sustain_level", "release_sec"]
-            }
-        ),
-        Tool(
-            name="play_pattern_with_parameter_automation",
-            description="Play a pattern with automated parameter changes at specific beats. Supports multiple parameters simultaneously. This is the main tool for creating complex, evolving sounds with filter, amp, LFO, and FX automation. Note: automation is sent in real-time and not saved to Digitakt patterns.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "track_triggers": {
-                        "type": "array",
-                        "description": "Optional array of [beat, track, velocity] where beat is 0-based quarter note, track is 1-16, velocity is 1-127.",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 3
-                        },
-                        "default": []
-                    },
-                    "parameter_automation": {
-                        "type": "object",
-                        "description": "Object mapping parameter names to arrays of [beat, value] pairs. Example: {'filter_cutoff': [[0, 20], [4, 80]], 'filter_resonance': [[0, 40], [8, 100]], 'lfo1_depth': [[0, 0], [8, 127]]}"
-                    },
-                    "send_clock": {
-                        "type": "boolean",
-                        "description": "Send MIDI Start and Clock messages. Default is true.",
-                        "default": True
-                    },
-                    "send_stop": {
-                        "type": "boolean",
-                        "description": "Send MIDI Stop after duration. Default is true.",
-                        "default": True
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "release_sec": {
+                    "type": "number",
+                    "description": "Release time in seconds - time to return to 0",
+                    "minimum": 0.01
                 },
-                "required": ["parameter_automation"]
-            }
-        ),
-        Tool(
-            name="save_automation_preset",
-            description=f"Save parameter automation as a reusable JSON preset file. Presets are stored in {PRESET_DIR} and can be loaded later.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "preset_name": {
-                        "type": "string",
-                        "description": "Name for the preset (without .json extension). Example: 'wobble_bass', 'filter_build'"
-                    },
-                    "automation": {
-                        "type": "object",
-                        "description": "Automation data including parameter_automation, bars, bpm, etc."
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Optional description of what this preset does"
-                    }
+                "steps_per_stage": {
+                    "type": "integer",
+                    "description": "Number of CC messages per stage (more = smoother). Default is 20.",
+                    "minimum": 2,
+                    "maximum": 100,
+                    "default": 20
                 },
-                "required": ["preset_name", "automation"]
-            }
-        ),
-        Tool(
-            name="load_automation_preset",
-            description=f"Load and optionally play a saved automation preset from {PRESET_DIR}.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "preset_name": {
-                        "type": "string",
-                        "description": "Name of the preset to load (without .json extension)"
-                    },
-                    "play": {
-                        "type": "boolean",
-                        "description": "If true, immediately play the loaded preset. Default is false (just load and return the data).",
-                        "default": False
-                    }
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["attack_sec", "decay_sec", "sustain_level", "release_sec"]
+        }
+    ),
+    Tool(
+        name="play_with_filter_automation",
+        description="Play a pattern with automated filter cutoff changes at specific beats. Combines transport control, track triggers, and precise filter automation.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
                 },
-                "required": ["preset_name"]
-            }
-        ),
-        Tool(
-            name="list_automation_presets",
-            description=f"List all available automation presets stored in {PRESET_DIR}.",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="export_automation_to_midi",
-            description="Export parameter automation to a standard MIDI file that can be imported into any DAW.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Output MIDI filename (will add .mid extension if not present)"
-                    },
-                    "automation": {
-                        "type": "object",
-                        "description": "Automation data including parameter_automation, bars, bpm, etc."
-                    },
-                    "channel": {
-                        "type": "integer",
-                        "description": "MIDI channel (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
-                    }
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
                 },
-                "required": ["filename", "automation"]
-            }
-        ),
-        Tool(
-            name="export_pattern_to_midi",
-            description="Export a Digitakt pattern to a standard MIDI file (.mid). Creates a multi-track MIDI file with drums on channel 1 and melody on specified channel. Supports chromatic track triggers.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Output filename (will add .mid extension if not present)"
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute. Default is 120 BPM.",
-                        "minimum": 20,
-                        "maximum": 300,
-                        "default": 120
-                    },
-                    "bars": {
-                        "type": "number",
-                        "description": "Total length in bars (4/4 time). Default is 4 bars.",
-                        "minimum": 0.25,
-                        "default": 4
-                    },
-                    "track_triggers": {
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Optional array of [beat, track, velocity] where beat is 0-based quarter note, track is 1-16, velocity is 1-127.",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for drum/sample triggers",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 4
-                        },
-                        "default": []
+                        "minItems": 2,
+                        "maxItems": 3
                     },
-                    "melody_notes": {
+                    "default": []
+                },
+                "filter_events": {
+                    "type": "array",
+                    "description": "Array of [beat, cutoff_value] for timed filter cutoff changes. Beat is 0-based quarter note, cutoff is 0-127.",
+                    "items": {
                         "type": "array",
-                        "description": "Array of [beat, note, velocity, duration] for melody notes",
-                        "items": {
-                            "type": "array",
-                            "minItems": 2,
-                            "maxItems": 4
-                        },
-                        "default": []
-                    },
-                    "melody_channel": {
-                        "type": "integer",
-                        "description": "MIDI channel for melody notes (1-16). Default is 1.",
-                        "minimum": 1,
-                        "maximum": 16,
-                        "default": 1
+                        "minItems": 2,
+                        "maxItems": 2
                     }
                 },
-                "required": ["filename"]
-            }
-        ),
-        Tool(
-            name="list_parameters",
-            description="List all available parameters that can be automated, organized by category (Filter, Amp, LFO, etc.).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "category": {
-                        "type": "string",
-                        "description": "Optional: filter by category name. If not specified, shows all categories."
-                    }
+                "send_clock": {
+                    "type": "boolean",
+                    "description": "Send MIDI Start and Clock messages. Default is true.",
+                    "default": True
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
                 }
-            }
-        ),
-        # Pattern save/load tools
-        Tool(
-            name="save_pattern",
-            description=f"Save a full pattern (track_triggers + midi_channels + bpm + bars) to a reusable JSON file. Patterns are stored in {PATTERN_DIR}.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name for the pattern (without extension). Example: 'PP-C1', 'funk_beat_01'"
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "Tempo in beats per minute.",
-                        "minimum": 20,
-                        "maximum": 300
-                    },
-                    "bars": {
-                        "type": "number",
-                        "description": "Number of bars in the pattern (4/4 time).",
-                        "minimum": 0.25
-                    },
-                    "track_triggers": {
-                        "type": "array",
-                        "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for drum/sample triggers.",
-                        "items": {"type": "array"}
-                    },
-                    "midi_channels": {
-                        "type": "object",
-                        "description": "Dict mapping MIDI channel numbers to arrays of [beat, note, velocity, duration]."
-                    },
-                    "parameter_automation": {
-                        "type": "object",
-                        "description": "Optional parameter automation data.",
-                        "default": {}
-                    },
-                    "automation_loop_bars": {
-                        "type": "number",
-                        "description": "Optional: repeat automation every N bars.",
-                        "default": 0
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Optional description of the pattern."
-                    }
+            },
+            "required": ["filter_events"]
+        }
+    ),
+    Tool(
+        name="set_parameter",
+        description="Set any parameter to a specific value instantly. Works with all parameters including filter, amp, LFO, sample, and FX parameters. Use this for immediate parameter changes without sweeping.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "parameter": {
+                    "type": "string",
+                    "description": "Parameter name to set. Examples: 'filter_cutoff', 'lfo1_depth', 'amp_volume', 'lfo1_destination'. Use list_parameters tool to see all available parameters."
                 },
-                "required": ["pattern_name", "bpm", "bars", "track_triggers", "midi_channels"]
-            }
-        ),
-        Tool(
-            name="load_pattern",
-            description=f"Load a saved pattern from {PATTERN_DIR}. Optionally play it immediately.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name of the pattern to load (without .pattern.json extension)"
-                    },
-                    "play": {
-                        "type": "boolean",
-                        "description": "If true, immediately play the pattern. Default is false.",
-                        "default": False
-                    },
-                    "repeat": {
-                        "type": "integer",
-                        "description": "Number of times to repeat the pattern when playing. Default is 1.",
-                        "minimum": 1,
-                        "default": 1
-                    }
+                "value": {
+                    "type": "integer",
+                    "description": "Parameter value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["pattern_name"]
-            }
-        ),
-        Tool(
-            name="list_patterns",
-            description=f"List all saved patterns in {PATTERN_DIR}.",
-            inputSchema={
-                "type": "object",
-                "properties": {}
-            }
-        ),
-        Tool(
-            name="delete_pattern",
-            description=f"Delete a saved pattern from {PATTERN_DIR}.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name of the pattern to delete (without .pattern.json extension)"
-                    }
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["parameter", "value"]
+        }
+    ),
+    Tool(
+        name="send_parameter_sweep",
+        description="Smoothly sweep any parameter from one value to another over a specified duration. Works with all parameters including filter, amp, LFO, sample, and FX parameters. Use this for creating dynamic parameter movements like filter sweeps, pitch bends, LFO depth fades, etc.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "parameter": {
+                    "type": "string",
+                    "description": "Parameter name to sweep. Examples: 'filter_cutoff', 'filter_resonance', 'amp_attack', 'lfo1_depth', 'sample_start', 'pitch'. Use list_parameters tool to see all available parameters."
                 },
-                "required": ["pattern_name"]
-            }
-        ),
-        Tool(
-            name="update_pattern",
-            description="Update specific fields of an existing pattern without rewriting everything. Loads the pattern, merges in provided fields, and saves back.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name of the pattern to update"
-                    },
-                    "bpm": {
-                        "type": "number",
-                        "description": "New tempo (optional)",
-                        "minimum": 20,
-                        "maximum": 300
-                    },
-                    "bars": {
-                        "type": "number",
-                        "description": "New bar count (optional)",
-                        "minimum": 0.25
-                    },
-                    "track_triggers": {
-                        "type": "array",
-                        "description": "New track triggers (optional - replaces all triggers)",
-                        "items": {"type": "array"}
-                    },
-                    "midi_channels": {
-                        "type": "object",
-                        "description": "New MIDI channel data (optional - replaces all channels)"
-                    },
-                    "parameter_automation": {
-                        "type": "object",
-                        "description": "New parameter automation (optional)"
-                    },
-                    "automation_loop_bars": {
-                        "type": "number",
-                        "description": "New automation loop setting (optional)"
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "New description (optional)"
-                    }
+                "start_value": {
+                    "type": "integer",
+                    "description": "Starting parameter value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
                 },
-                "required": ["pattern_name"]
-            }
-        ),
-        Tool(
-            name="edit_pattern_chords",
-            description="Edit chord notes at a specific bar position in a pattern. Updates pad notes across specified MIDI channels and recalculates durations to the next chord change.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name of the pattern to edit"
-                    },
-                    "bar": {
-                        "type": "number",
-                        "description": "Bar position (0-based) where the chord starts"
-                    },
-                    "chord_notes": {
+                "end_value": {
+                    "type": "integer",
+                    "description": "Ending parameter value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "duration_sec": {
+                    "type": "number",
+                    "description": "Duration of the sweep in seconds",
+                    "minimum": 0.1
+                },
+                "curve": {
+                    "type": "string",
+                    "description": "Sweep curve shape: 'linear' (constant rate), 'exponential' (fast start, slow end), 'logarithmic' (slow start, fast end)",
+                    "enum": ["linear", "exponential", "logarithmic"],
+                    "default": "linear"
+                },
+                "steps": {
+                    "type": "integer",
+                    "description": "Number of messages to send (more = smoother). Default is 50.",
+                    "minimum": 2,
+                    "maximum": 200,
+                    "default": 50
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["parameter", "start_value", "end_value", "duration_sec"]
+        }
+    ),
+    Tool(
+        name="send_parameter_envelope",
+        description="Apply an ADSR-style envelope to any parameter. Creates organic parameter movements with attack, decay, sustain, and release stages. Great for filter envelopes, amp envelopes, LFO depth modulation, etc.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "parameter": {
+                    "type": "string",
+                    "description": "Parameter name to modulate. Examples: 'filter_cutoff', 'amp_volume', 'lfo1_depth', 'sample_start'."
+                },
+                "attack_sec": {
+                    "type": "number",
+                    "description": "Attack time in seconds - time to reach peak (127)",
+                    "minimum": 0.01
+                },
+                "decay_sec": {
+                    "type": "number",
+                    "description": "Decay time in seconds - time to drop from peak to sustain level",
+                    "minimum": 0.01
+                },
+                "sustain_level": {
+                    "type": "integer",
+                    "description": "Sustain parameter value (0-127)",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "release_sec": {
+                    "type": "number",
+                    "description": "Release time in seconds - time to return to 0",
+                    "minimum": 0.01
+                },
+                "steps_per_stage": {
+                    "type": "integer",
+                    "description": "Number of messages per stage (more = smoother). Default is 20.",
+                    "minimum": 2,
+                    "maximum": 100,
+                    "default": 20
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["parameter", "attack_sec", "decay_sec", "sustain_level", "release_sec"]
+        }
+    ),
+    Tool(
+        name="play_pattern_with_parameter_automation",
+        description="Play a pattern with automated parameter changes at specific beats. Supports multiple parameters simultaneously. This is the main tool for creating complex, evolving sounds with filter, amp, LFO, and FX automation. Note: automation is sent in real-time and not saved to Digitakt patterns.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars to play (in 4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Optional array of [beat, track, velocity] where beat is 0-based quarter note, track is 1-16, velocity is 1-127.",
+                    "items": {
                         "type": "array",
-                        "description": "Array of MIDI note numbers for the chord (e.g., [48, 52, 55, 60] for C major)",
-                        "items": {"type": "integer", "minimum": 0, "maximum": 127}
+                        "minItems": 2,
+                        "maxItems": 3
                     },
-                    "channels": {
+                    "default": []
+                },
+                "parameter_automation": {
+                    "type": "object",
+                    "description": "Object mapping parameter names to arrays of [beat, value] pairs. Example: {'filter_cutoff': [[0, 20], [4, 80]], 'filter_resonance': [[0, 40], [8, 100]], 'lfo1_depth': [[0, 0], [8, 127]]}"
+                },
+                "send_clock": {
+                    "type": "boolean",
+                    "description": "Send MIDI Start and Clock messages. Default is true.",
+                    "default": True
+                },
+                "send_stop": {
+                    "type": "boolean",
+                    "description": "Send MIDI Stop after duration. Default is true.",
+                    "default": True
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). IMPORTANT: On Digitakt II, each track has its own MIDI channel. Set this to match the track number you want to control (Track 1 = channel 1, Track 12 = channel 12, etc). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["parameter_automation"]
+        }
+    ),
+    Tool(
+        name="save_automation_preset",
+        description=f"Save parameter automation as a reusable JSON preset file. Presets are stored in {PRESET_DIR} and can be loaded later.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "preset_name": {
+                    "type": "string",
+                    "description": "Name for the preset (without .json extension). Example: 'wobble_bass', 'filter_build'"
+                },
+                "automation": {
+                    "type": "object",
+                    "description": "Automation data including parameter_automation, bars, bpm, etc."
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Optional description of what this preset does"
+                }
+            },
+            "required": ["preset_name", "automation"]
+        }
+    ),
+    Tool(
+        name="load_automation_preset",
+        description=f"Load and optionally play a saved automation preset from {PRESET_DIR}.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "preset_name": {
+                    "type": "string",
+                    "description": "Name of the preset to load (without .json extension)"
+                },
+                "play": {
+                    "type": "boolean",
+                    "description": "If true, immediately play the loaded preset. Default is false (just load and return the data).",
+                    "default": False
+                }
+            },
+            "required": ["preset_name"]
+        }
+    ),
+    Tool(
+        name="list_automation_presets",
+        description=f"List all available automation presets stored in {PRESET_DIR}.",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="export_automation_to_midi",
+        description="Export parameter automation to a standard MIDI file that can be imported into any DAW.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "Output MIDI filename (will add .mid extension if not present)"
+                },
+                "automation": {
+                    "type": "object",
+                    "description": "Automation data including parameter_automation, bars, bpm, etc."
+                },
+                "channel": {
+                    "type": "integer",
+                    "description": "MIDI channel (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["filename", "automation"]
+        }
+    ),
+    Tool(
+        name="export_pattern_to_midi",
+        description="Export a Digitakt pattern to a standard MIDI file (.mid). Creates a multi-track MIDI file with drums on channel 1 and melody on specified channel. Supports chromatic track triggers.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "filename": {
+                    "type": "string",
+                    "description": "Output filename (will add .mid extension if not present)"
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute. Default is 120 BPM.",
+                    "minimum": 20,
+                    "maximum": 300,
+                    "default": 120
+                },
+                "bars": {
+                    "type": "number",
+                    "description": "Total length in bars (4/4 time). Default is 4 bars.",
+                    "minimum": 0.25,
+                    "default": 4
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for drum/sample triggers",
+                    "items": {
                         "type": "array",
-                        "description": "MIDI channels to update. Default is [9, 10, 11, 12].",
-                        "items": {"type": "integer", "minimum": 1, "maximum": 16},
-                        "default": [9, 10, 11, 12]
+                        "minItems": 2,
+                        "maxItems": 4
                     },
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Velocity for all chord notes. Default is 75.",
-                        "minimum": 1,
-                        "maximum": 127,
-                        "default": 75
-                    }
+                    "default": []
                 },
-                "required": ["pattern_name", "bar", "chord_notes"]
-            }
-        ),
-        Tool(
-            name="edit_pattern_triggers",
-            description="Add, remove, or replace triggers for a specific track in a pattern. Allows quick edits like 'make the kick half-time' without rewriting the whole pattern.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern_name": {
-                        "type": "string",
-                        "description": "Name of the pattern to edit"
-                    },
-                    "track": {
-                        "type": "integer",
-                        "description": "Track number (1-16) to modify",
-                        "minimum": 1,
-                        "maximum": 16
-                    },
-                    "beats": {
+                "melody_notes": {
+                    "type": "array",
+                    "description": "Array of [beat, note, velocity, duration] for melody notes",
+                    "items": {
                         "type": "array",
-                        "description": "Array of beat positions to add/remove/replace",
-                        "items": {"type": "number"}
-                    },
-                    "velocity": {
-                        "type": "integer",
-                        "description": "Velocity for added triggers. Default is 100.",
-                        "minimum": 1,
-                        "maximum": 127,
-                        "default": 100
-                    },
-                    "note": {
-                        "type": "integer",
-                        "description": "Optional MIDI note for chromatic mode (0-127). If omitted, uses standard track triggering.",
-                        "minimum": 0,
-                        "maximum": 127
+                        "minItems": 2,
+                        "maxItems": 4
                     },
-                    "mode": {
-                        "type": "string",
-                        "enum": ["add", "remove", "replace"],
-                        "description": "'add' inserts new triggers, 'remove' deletes triggers at these beats, 'replace' clears track and adds new triggers. Default is 'add'.",
-                        "default": "add"
-                    }
+                    "default": []
                 },
-                "required": ["pattern_name", "track", "beats"]
+                "melody_channel": {
+                    "type": "integer",
+                    "description": "MIDI channel for melody notes (1-16). Default is 1.",
+                    "minimum": 1,
+                    "maximum": 16,
+                    "default": 1
+                }
+            },
+            "required": ["filename"]
+        }
+    ),
+    Tool(
+        name="list_parameters",
+        description="List all available parameters that can be automated, organized by category (Filter, Amp, LFO, etc.).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "category": {
+                    "type": "string",
+                    "description": "Optional: filter by category name. If not specified, shows all categories."
+                }
             }
-        )
-    ]
-
-# Helper function for delayed note off
-async def _delayed_note_off(note: int, duration: float, channel: int = 0):
-    """Send note off after a delay"""
-    await asyncio.sleep(duration)
-    if output_port:
-        output_port.send(mido.Message('note_off', note=note, velocity=0, channel=channel))
+        }
+    ),
+    # Pattern save/load tools
+    Tool(
+        name="save_pattern",
+        description=f"Save a full pattern (track_triggers + midi_channels + bpm + bars) to a reusable JSON file. Patterns are stored in {PATTERN_DIR}.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name for the pattern (without extension). Example: 'PP-C1', 'funk_beat_01'"
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "Tempo in beats per minute.",
+                    "minimum": 20,
+                    "maximum": 300
+                },
+                "bars": {
+                    "type": "number",
+                    "description": "Number of bars in the pattern (4/4 time).",
+                    "minimum": 0.25
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "Array of [beat, track, velocity] or [beat, track, velocity, note] for drum/sample triggers.",
+                    "items": {"type": "array"}
+                },
+                "midi_channels": {
+                    "type": "object",
+                    "description": "Dict mapping MIDI channel numbers to arrays of [beat, note, velocity, duration]."
+                },
+                "parameter_automation": {
+                    "type": "object",
+                    "description": "Optional parameter automation data.",
+                    "default": {}
+                },
+                "automation_loop_bars": {
+                    "type": "number",
+                    "description": "Optional: repeat automation every N bars.",
+                    "default": 0
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Optional description of the pattern."
+                }
+            },
+            "required": ["pattern_name", "bpm", "bars", "track_triggers", "midi_channels"]
+        }
+    ),
+    Tool(
+        name="load_pattern",
+        description=f"Load a saved pattern from {PATTERN_DIR}. Optionally play it immediately.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name of the pattern to load (without .pattern.json extension)"
+                },
+                "play": {
+                    "type": "boolean",
+                    "description": "If true, immediately play the pattern. Default is false.",
+                    "default": False
+                },
+                "repeat": {
+                    "type": "integer",
+                    "description": "Number of times to repeat the pattern when playing. Default is 1.",
+                    "minimum": 1,
+                    "default": 1
+                }
+            },
+            "required": ["pattern_name"]
+        }
+    ),
+    Tool(
+        name="list_patterns",
+        description=f"List all saved patterns in {PATTERN_DIR}.",
+        inputSchema={
+            "type": "object",
+            "properties": {}
+        }
+    ),
+    Tool(
+        name="delete_pattern",
+        description=f"Delete a saved pattern from {PATTERN_DIR}.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name of the pattern to delete (without .pattern.json extension)"
+                }
+            },
+            "required": ["pattern_name"]
+        }
+    ),
+    Tool(
+        name="update_pattern",
+        description="Update specific fields of an existing pattern without rewriting everything. Loads the pattern, merges in provided fields, and saves back.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name of the pattern to update"
+                },
+                "bpm": {
+                    "type": "number",
+                    "description": "New tempo (optional)",
+                    "minimum": 20,
+                    "maximum": 300
+                },
+                "bars": {
+                    "type": "number",
+                    "description": "New bar count (optional)",
+                    "minimum": 0.25
+                },
+                "track_triggers": {
+                    "type": "array",
+                    "description": "New track triggers (optional - replaces all triggers)",
+                    "items": {"type": "array"}
+                },
+                "midi_channels": {
+                    "type": "object",
+                    "description": "New MIDI channel data (optional - replaces all channels)"
+                },
+                "parameter_automation": {
+                    "type": "object",
+                    "description": "New parameter automation (optional)"
+                },
+                "automation_loop_bars": {
+                    "type": "number",
+                    "description": "New automation loop setting (optional)"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "New description (optional)"
+                }
+            },
+            "required": ["pattern_name"]
+        }
+    ),
+    Tool(
+        name="edit_pattern_chords",
+        description="Edit chord notes at a specific bar position in a pattern. Updates pad notes across specified MIDI channels and recalculates durations to the next chord change.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name of the pattern to edit"
+                },
+                "bar": {
+                    "type": "number",
+                    "description": "Bar position (0-based) where the chord starts"
+                },
+                "chord_notes": {
+                    "type": "array",
+                    "description": "Array of MIDI note numbers for the chord (e.g., [48, 52, 55, 60] for C major)",
+                    "items": {"type": "integer", "minimum": 0, "maximum": 127}
+                },
+                "channels": {
+                    "type": "array",
+                    "description": "MIDI channels to update. Default is [9, 10, 11, 12].",
+                    "items": {"type": "integer", "minimum": 1, "maximum": 16},
+                    "default": [9, 10, 11, 12]
+                },
+                "velocity": {
+                    "type": "integer",
+                    "description": "Velocity for all chord notes. Default is 75.",
+                    "minimum": 1,
+                    "maximum": 127,
+                    "default": 75
+                }
+            },
+            "required": ["pattern_name", "bar", "chord_notes"]
+        }
+    ),
+    Tool(
+        name="edit_pattern_triggers",
+        description="Add, remove, or replace triggers for a specific track in a pattern. Allows quick edits like 'make the kick half-time' without rewriting the whole pattern.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern_name": {
+                    "type": "string",
+                    "description": "Name of the pattern to edit"
+                },
+                "track": {
+                    "type": "integer",
+                    "description": "Track number (1-16) to modify",
+                    "minimum": 1,
+                    "maximum": 16
+                },
+                "beats": {
+                    "type": "array",
+                    "description": "Array of beat positions to add/remove/replace",
+                    "items": {"type": "number"}
+                },
+                "velocity": {
+                    "type": "integer",
+                    "description": "Velocity for added triggers. Default is 100.",
+                    "minimum": 1,
+                    "maximum": 127,
+                    "default": 100
+                },
+                "note": {
+                    "type": "integer",
+                    "description": "Optional MIDI note for chromatic mode (0-127). If omitted, uses standard track triggering.",
+                    "minimum": 0,
+                    "maximum": 127
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["add", "remove", "replace"],
+                    "description": "'add' inserts new triggers, 'remove' deletes triggers at these beats, 'replace' clears track and adds new triggers. Default is 'add'.",
+                    "default": "add"
+                }
+            },
+            "required": ["pattern_name", "track", "beats"]
+        }
+    )
+]
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Execute a MIDI tool"""
-    if not output_port:
-        return [TextContent(
-            type="text",
-            text="Error: Not connected to Digitakt MIDI output port"
-        )]
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """List available MIDI control tools"""
+    return TOOLS
 
-    try:
-        if name == "send_note":
-            note = arguments["note"]
-            velocity = arguments.get("velocity", 100)
-            duration = arguments.get("duration", 0.1)
-            channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
-
-            # Send note on
-            msg_on = mido.Message('note_on', note=note, velocity=velocity, channel=channel)
-            output_port.send(msg_on)
-
-            # Wait for duration
-            await asyncio.sleep(duration)
-
-            # Send note off
-            msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-            output_port.send(msg_off)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent note {note} (velocity {velocity}) on channel {channel+1} for {duration}s"
-            )]
-
-        elif name == "trigger_track":
-            track = arguments["track"]
-            velocity = arguments.get("velocity", 100)
-            duration = arguments.get("duration", 0.1)
-            channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
-
-            # Convert track number (1-8) to MIDI note (0-7)
-            note = track - 1
-
-            # Send note on
-            msg_on = mido.Message('note_on', note=note, velocity=velocity, channel=channel)
-            output_port.send(msg_on)
-
-            # Wait for duration
-            await asyncio.sleep(duration)
-
-            # Send note off
-            msg_off = mido.Message('note_off', note=note, velocity=0, channel=channel)
-            output_port.send(msg_off)
-
-            return [TextContent(
-                type="text",
-                text=f"Triggered Track {track} (note {note}, velocity {velocity}) on channel {channel+1} for {duration}s"
-            )]
-
-        elif name == "send_cc":
-            cc_number = arguments["cc_number"]
-            value = arguments["value"]
-            channel = arguments.get("channel", 1) - 1
-
-            msg = mido.Message('control_change', control=cc_number, value=value, channel=channel)
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent CC {cc_number} = {value} on channel {channel+1}"
-            )]
-
-        elif name == "send_program_change":
-            program = arguments["program"]
-            channel = arguments.get("channel", 1) - 1
-
-            msg = mido.Message('program_change', program=program, channel=channel)
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent Program Change to {program} on channel {channel+1}"
-            )]
-
-        elif name == "send_note_sequence":
-            notes = arguments["notes"]
-            delay = arguments.get("delay", 0.25)
-            channel = arguments.get("channel", 1) - 1
-
-            for i, (note, velocity, duration) in enumerate(notes):
-                # Send note on
-                msg_on = mido.Message('note_on', note=int(note), velocity=int(velocity), channel=channel)
-                output_port.send(msg_on)
-
-                # Wait for note duration
-                await asyncio.sleep(duration)
-
-                # Send note off
-                msg_off = mido.Message('note_off', note=int(note), velocity=0, channel=channel)
-                output_port.send(msg_off)
-
-                # Wait before next note (if not the last note)
-                if i < len(notes) - 1:
-                    await asyncio.sleep(delay)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent sequence of {len(notes)} notes on channel {channel+1}"
-            )]
-
-        elif name == "send_sysex":
-            # Get SysEx data from either data array or hex string
-            sysex_data = None
-
-            if "data" in arguments and arguments["data"]:
-                sysex_data = arguments["data"]
-            elif "hex_string" in arguments and arguments["hex_string"]:
-                hex_str = arguments["hex_string"].replace(" ", "").replace("0x", "")
-                # Convert hex string to byte array
-                sysex_data = [int(hex_str[i:i+2], 16) for i in range(0, len(hex_str), 2)]
-
-            if not sysex_data:
-                return [TextContent(
-                    type="text",
-                    text="Error: Must provide either 'data' array or 'hex_string'"
-                )]
-
-            # Send SysEx message
-            msg = mido.Message('sysex', data=sysex_data)
-            output_port.send(msg)
-
-            # Format output
-            hex_display = " ".join([f"{b:02X}" for b in sysex_data[:16]])
-            if len(sysex_data) > 16:
-                hex_display += f"... ({len(sysex_data)} bytes total)"
-
-            return [TextContent(
-                type="text",
-                text=f"Sent SysEx message: F0 {hex_display} F7"
-            )]
-
-        elif name == "request_sysex_dump":
-            dump_type = arguments["dump_type"]
-
-            # Elektron manufacturer ID: 0x00 0x20 0x3C
-            # Note: The exact format for dump requests is not publicly documented
-            # This is a placeholder that sends a basic dump request structure
-            # You may need to adjust based on actual Digitakt protocol
-
-            # Basic structure (this may need adjustment based on actual protocol):
-            # F0 00 20 3C [device_id] [command] [parameters...] F7
-
-            ELEKTRON_MFG_ID = [0x00, 0x20, 0x3C]
-            DIGITAKT_DEVICE_ID = 0x0E  # Placeholder - may need verification
-
-            sysex_data = ELEKTRON_MFG_ID + [DIGITAKT_DEVICE_ID]
-
-            # Add dump request command (placeholder - needs verification)
-            if dump_type == "pattern":
-                bank = arguments.get("bank", 0)
-                pattern_num = arguments.get("pattern_number", 0)
-                # Command 0x67 might be pattern dump request (unverified)
-                sysex_data.extend([0x67, bank, pattern_num])
-            elif dump_type == "sound":
-                sysex_data.extend([0x68, 0x00])  # Placeholder
-            elif dump_type == "kit":
-                sysex_data.extend([0x69, 0x00])  # Placeholder
-            elif dump_type == "project":
-                sysex_data.extend([0x6A, 0x00])  # Placeholder
-
-            msg = mido.Message('sysex', data=sysex_data)
-            output_port.send(msg)
-
-            hex_display = " ".join([f"{b:02X}" for b in sysex_data])
-
-            return [TextContent(
-                type="text",
-                text=f"Sent SysEx dump request for {dump_type}: F0 {hex_display} F7\n\nNote: The exact SysEx format for Digitakt dump requests is not publicly documented. This sends a basic request structure that may need adjustment. You may need to use Elektron Transfer software or capture actual dump requests to determine the correct format."
-            )]
-
-        elif name == "send_nrpn":
-            msb = arguments["msb"]
-            lsb = arguments["lsb"]
-            value = arguments["value"]
-            channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
-
-            # Send NRPN message (requires 4 CC messages)
-            # 1. CC 99 (NRPN MSB)
-            msg1 = mido.Message('control_change', control=99, value=msb, channel=channel)
-            output_port.send(msg1)
-
-            # 2. CC 98 (NRPN LSB)
-            msg2 = mido.Message('control_change', control=98, value=lsb, channel=channel)
-            output_port.send(msg2)
-
-            # 3. CC 6 (Data Entry MSB)
-            msg3 = mido.Message('control_change', control=6, value=value, channel=channel)
-            output_port.send(msg3)
-
-            # 4. CC 38 (Data Entry LSB) - typically 0
-            msg4 = mido.Message('control_change', control=38, value=0, channel=channel)
-            output_port.send(msg4)
-
-            param_name = get_param_name(msb, lsb)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent NRPN: {param_name} (MSB={msb}, LSB={lsb}) = {value} on channel {channel+1}"
-            )]
-
-        elif name == "set_trig_note":
-            note = arguments["note"]
-            channel = arguments.get("channel", 1) - 1
-
-            # NRPN MSB=3, LSB=0 for trig note
-            output_port.send(mido.Message('control_change', control=99, value=3, channel=channel))
-            output_port.send(mido.Message('control_change', control=98, value=0, channel=channel))
-            output_port.send(mido.Message('control_change', control=6, value=note, channel=channel))
-            output_port.send(mido.Message('control_change', control=38, value=0, channel=channel))
-
-            return [TextContent(
-                type="text",
-                text=f"Set trig note to {note} on channel {channel+1}"
-            )]
-
-        elif name == "set_trig_velocity":
-            velocity = arguments["velocity"]
-            channel = arguments.get("channel", 1) - 1
-
-            # NRPN MSB=3, LSB=1 for trig velocity
-            output_port.send(mido.Message('control_change', control=99, value=3, channel=channel))
-            output_port.send(mido.Message('control_change', control=98, value=1, channel=channel))
-            output_port.send(mido.Message('control_change', control=6, value=velocity, channel=channel))
-            output_port.send(mido.Message('control_change', control=38, value=0, channel=channel))
-
-            return [TextContent(
-                type="text",
-                text=f"Set trig velocity to {velocity} on channel {channel+1}"
-            )]
-
-        elif name == "set_trig_length":
-            length = arguments["length"]
-            channel = arguments.get("channel", 1) - 1
-
-            # NRPN MSB=3, LSB=2 for trig length
-            output_port.send(mido.Message('control_change', control=99, value=3, channel=channel))
-            output_port.send(mido.Message('control_change', control=98, value=2, channel=channel))
-            output_port.send(mido.Message('control_change', control=6, value=length, channel=channel))
-            output_port.send(mido.Message('control_change', control=38, value=0, channel=channel))
-
-            return [TextContent(
-                type="text",
-                text=f"Set trig length to {length} on channel {channel+1}"
-            )]
-
-        elif name == "reset_velocities":
-            velocity = arguments.get("velocity", 120)
-
-            # Set trig velocity on all 16 tracks using NRPN
-            for track in range(1, 17):
-                channel = track - 1  # Track 1 = channel 0, etc.
-
-                # NRPN MSB=3, LSB=1 for trig velocity
-                output_port.send(mido.Message('control_change', control=99, value=3, channel=channel))
-                output_port.send(mido.Message('control_change', control=98, value=1, channel=channel))
-                output_port.send(mido.Message('control_change', control=6, value=velocity, channel=channel))
-                output_port.send(mido.Message('control_change', control=38, value=0, channel=channel))
-
-            return [TextContent(
-                type="text",
-                text=f"Reset velocity to {velocity} on all 16 tracks"
-            )]
-
-        elif name == "send_midi_start":
-            # Send MIDI Start message (0xFA)
-            msg = mido.Message('start')
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text="Sent MIDI Start - sequencer should start from beginning"
-            )]
-
-        elif name == "send_midi_stop":
-            # Send MIDI Stop message (0xFC)
-            msg = mido.Message('stop')
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text="Sent MIDI Stop - sequencer should stop"
-            )]
-
-        elif name == "send_midi_continue":
-            # Send MIDI Continue message (0xFB)
-            msg = mido.Message('continue')
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text="Sent MIDI Continue - sequencer should resume from current position"
-            )]
-
-        elif name == "send_song_position":
-            position = arguments["position"]
-
-            # Send MIDI Song Position Pointer (0xF2)
-            # Position is in MIDI beats (16th notes)
-            msg = mido.Message('songpos', pos=position)
-            output_port.send(msg)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent Song Position Pointer to position {position} (16th note: {position}, bar: {position/16:.2f})"
-            )]
-
-        elif name == "play_with_clock":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            send_stop = arguments.get("send_stop", True)
-
-            # Calculate timing
-            # MIDI clock: 24 pulses per quarter note
-            # At 4/4 time: 96 pulses per bar
-            # Time between pulses = 60 / (bpm * 24)
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)  # 96 pulses per bar in 4/4
-
-            # Send Start message
-            output_port.send(mido.Message('start'))
-
-            # Use absolute timing to prevent drift
-            import time
-            start_time = time.time()
-
-            # Send clock pulses with precise timing
-            for i in range(total_pulses):
-                output_port.send(mido.Message('clock'))
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Optionally send Stop
-            if send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            else:
-                status = "(still running)"
-
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM {status}"
-            )]
-
-        elif name == "play_pattern_with_tracks":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            triggers = arguments["triggers"]
-            send_stop = arguments.get("send_stop", True)
-
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)
-            beat_duration = 60.0 / bpm  # Duration of one quarter note
-
-            # Prepare trigger schedule: convert beats to pulse indices
-            trigger_schedule = []
-            for trigger in triggers:
-                beat = trigger[0]
-                track = trigger[1]
-                velocity = trigger[2] if len(trigger) > 2 else 100
-                pulse_index = int(beat * 24)  # 24 pulses per quarter note
-                trigger_schedule.append((pulse_index, track, velocity))
-
-            # Sort by pulse index
-            trigger_schedule.sort(key=lambda x: x[0])
-
-            # Send Start message
-            output_port.send(mido.Message('start'))
-
-            import time
-            start_time = time.time()
-            trigger_idx = 0
-
-            # Send clock pulses and triggers
-            for i in range(total_pulses):
-                output_port.send(mido.Message('clock'))
-
-                # Check if we need to send any triggers at this pulse
-                while trigger_idx < len(trigger_schedule) and trigger_schedule[trigger_idx][0] == i:
-                    pulse, track, velocity = trigger_schedule[trigger_idx]
-                    note = track - 1  # Track 1-16 = note 0-15
-                    output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=0))
-                    # Schedule note off after short duration
-                    asyncio.create_task(_delayed_note_off(note, 0.05, 0))
-                    trigger_idx += 1
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Optionally send Stop
-            if send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            else:
-                status = "(still running)"
-
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(triggers)} track triggers {status}"
-            )]
-
-        elif name == "play_pattern_with_melody":
-            global last_melody
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            notes = arguments["notes"]
-            channel = arguments.get("channel", 1) - 1
-            send_stop = arguments.get("send_stop", True)
-
-            # Save to history for later export
-            last_melody = {
-                "bpm": bpm,
-                "notes": notes,
-                "channel": channel + 1  # Store as 1-based
-            }
+def clock_schedule(clock_interval: float, total_pulses: int, send_stop: bool,
+                   start_pulse: Optional[int] = 0, send_clock: bool = True,
+                   song_position: Optional[int] = None):
+    """
+    Transport events for a pattern of total_pulses pulses: Start at
+    start_pulse (after a Song Position Pointer if song_position is given),
+    a clock on every pulse from there if send_clock, and Stop one pulse
+    after the last if send_stop. start_pulse=None sends no transport at all.
+    Returns (events, pulse_time) where pulse_time(i) is the offset of pulse
+    i; play the events with lead_ns=CLOCK_LEAD_NS
+    """
+    interval_ns = clock_interval * 1e9
+
+    def pulse_time(i: int) -> int:
+        return int(i * interval_ns)
+
+    events = []
+    if start_pulse is not None:
+        t = pulse_time(start_pulse)
+        if song_position is not None:
+            events.append((t, song_position_message(song_position)))
+        events.append((t, MIDI_START))
+        if send_clock:
+            events += [(int(i * interval_ns), MIDI_CLOCK) for i in range(start_pulse, total_pulses)]
+        if send_stop:
+            events.append((pulse_time(total_pulses), MIDI_STOP))
+    return events, pulse_time
+
+def _text(text: str) -> list[TextContent]:
+    """A tool result holding a single text item"""
+    return [TextContent(type="text", text=text)]
+
+# Tool handlers, looked up by name in TOOL_HANDLERS
+async def _handle_send_note(arguments: dict) -> list[TextContent]:
+    """Handle the send_note tool"""
+    note = arguments["note"]
+    velocity = arguments.get("velocity", 100)
+    duration = arguments.get("duration", 0.1)
+    channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
+
+    # Note on now, note off after duration, both sent by the MIDI thread
+    # (a negative duration counts as 0, so the note off can't come first)
+    await sender.play([
+        (0, channel_message(NOTE_ON, channel, note, velocity)),
+        (max(0, int(duration * 1e9)), channel_message(NOTE_OFF, channel, note, 0)),
+    ])
+
+    return _text(f"Sent note {note} (velocity {velocity}) on channel {channel+1} for {duration}s")
+
+async def _handle_trigger_track(arguments: dict) -> list[TextContent]:
+    """Handle the trigger_track tool"""
+    track = arguments["track"]
+    velocity = arguments.get("velocity", 100)
+    duration = arguments.get("duration", 0.1)
+    channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
+
+    # Convert track number (1-8) to MIDI note (0-7)
+    note = track - 1
+
+    # Note on now, note off after duration, both sent by the MIDI thread
+    # (a negative duration counts as 0, so the note off can't come first)
+    await sender.play([
+        (0, channel_message(NOTE_ON, channel, note, velocity)),
+        (max(0, int(duration * 1e9)), channel_message(NOTE_OFF, channel, note, 0)),
+    ])
+
+    return _text(f"Triggered Track {track} (note {note}, velocity {velocity}) on channel {channel+1} for {duration}s")
+
+async def _handle_send_cc(arguments: dict) -> list[TextContent]:
+    """Handle the send_cc tool"""
+    cc_number = arguments["cc_number"]
+    value = arguments["value"]
+    channel = arguments.get("channel", 1) - 1
+
+    send_channel_message(CONTROL_CHANGE, channel, cc_number, value)
+
+    return _text(f"Sent CC {cc_number} = {value} on channel {channel+1}")
+
+async def _handle_send_program_change(arguments: dict) -> list[TextContent]:
+    """Handle the send_program_change tool"""
+    program = arguments["program"]
+    channel = arguments.get("channel", 1) - 1
+
+    send_channel_message(PROGRAM_CHANGE, channel, program)
+
+    return _text(f"Sent Program Change to {program} on channel {channel+1}")
+
+async def _handle_send_note_sequence(arguments: dict) -> list[TextContent]:
+    """Handle the send_note_sequence tool"""
+    notes = arguments["notes"]
+    delay = arguments.get("delay", 0.25)
+    channel = arguments.get("channel", 1) - 1
+    check_note_count(len(notes))
+
+    # Build the whole sequence as offsets from the first note up front and
+    # hand it to the MIDI thread, so timing can't drift note by note
+    # Negative durations and delays count as 0, so nothing plays out of order
+    delay_ns = max(0, int(delay * 1e9))
+    events = []
+    append = events.append
+    t = 0
+
+    for note, velocity, duration in notes:
+        note = int(note)
+
+        # Note on
+        append((t, channel_message(NOTE_ON, channel, note, int(velocity))))
+
+        # Note off after the note duration
+        t += max(0, int(duration * 1e9))
+        append((t, channel_message(NOTE_OFF, channel, note, 0)))
+
+        # Wait before the next note (nothing is scheduled after the last
+        # note off, so the trailing delay is harmless)
+        t += delay_ns
+
+    await sender.play(events)
+
+    return _text(f"Sent sequence of {len(notes)} notes on channel {channel+1}")
+
+async def _handle_send_sysex(arguments: dict) -> list[TextContent]:
+    """Handle the send_sysex tool"""
+    # Get SysEx data from either data array or hex string
+    sysex_data = None
+
+    if "data" in arguments and arguments["data"]:
+        sysex_data = arguments["data"]
+    elif "hex_string" in arguments and arguments["hex_string"]:
+        hex_str = arguments["hex_string"].replace(" ", "").replace("0x", "").replace(",", "")
+        if not _HEX_RE.fullmatch(hex_str):
+            return _text("Error: hex_string may only contain hex digits, spaces, commas and 0x prefixes")
+        if len(hex_str) % 2:
+            return _text(f"Error: hex_string has an odd number of hex digits ({len(hex_str)})")
+        # Convert hex string to bytes
+        sysex_data = bytes.fromhex(hex_str)
+
+    if not sysex_data:
+        return _text("Error: Must provide either 'data' array or 'hex_string'")
+
+    # Send SysEx message; a multi-KB dump takes a while on the wire,
+    # so push large ones from a worker thread to keep MCP responsive
+    data = sysex_message(sysex_data)
+    if len(sysex_data) > LARGE_SYSEX_BYTES:
+        await asyncio.to_thread(send_bytes, data)
+    else:
+        send_bytes(data)
 
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)
+    # Format output
+    hex_display = bytes(sysex_data[:16]).hex(' ').upper()
+    if len(sysex_data) > 16:
+        hex_display += f"... ({len(sysex_data)} bytes total)"
 
-            # Prepare note schedule: convert beats to pulse indices
-            note_schedule = []
-            for note_data in notes:
-                beat = note_data[0]
-                note = note_data[1]
-                velocity = note_data[2] if len(note_data) > 2 else 100
-                duration = note_data[3] if len(note_data) > 3 else 0.1
-                pulse_index = int(beat * 24)
-                note_schedule.append((pulse_index, note, velocity, duration))
+    return _text(f"Sent SysEx message: F0 {hex_display} F7")
 
-            # Sort by pulse index
-            note_schedule.sort(key=lambda x: x[0])
+async def _handle_request_sysex_dump(arguments: dict) -> list[TextContent]:
+    """Handle the request_sysex_dump tool"""
+    dump_type = arguments["dump_type"]
 
-            # Send Start message
-            output_port.send(mido.Message('start'))
+    # Elektron manufacturer ID: 0x00 0x20 0x3C
+    # Note: The exact format for dump requests is not publicly documented
+    # This is a placeholder that sends a basic dump request structure
+    # You may need to adjust based on actual Digitakt protocol
 
-            import time
-            start_time = time.time()
-            note_idx = 0
+    # Basic structure (this may need adjustment based on actual protocol):
+    # F0 00 20 3C [device_id] [command] [parameters...] F7
 
-            # Send clock pulses and notes
-            for i in range(total_pulses):
-                output_port.send(mido.Message('clock'))
+    sysex_data = bytearray(DUMP_REQUEST_PREFIX)
 
-                # Check if we need to send any notes at this pulse
-                while note_idx < len(note_schedule) and note_schedule[note_idx][0] == i:
-                    pulse, note, velocity, duration = note_schedule[note_idx]
-                    output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=channel))
-                    # Schedule note off after duration
-                    asyncio.create_task(_delayed_note_off(note, duration, channel))
-                    note_idx += 1
+    # Add dump request command (placeholder - needs verification)
+    if dump_type == "pattern":
+        bank = arguments.get("bank", 0)
+        pattern_num = arguments.get("pattern_number", 0)
+        # Command 0x67 might be pattern dump request (unverified)
+        sysex_data.extend([0x67, bank, pattern_num])
+    elif dump_type == "sound":
+        sysex_data.extend([0x68, 0x00])  # Placeholder
+    elif dump_type == "kit":
+        sysex_data.extend([0x69, 0x00])  # Placeholder
+    elif dump_type == "project":
+        sysex_data.extend([0x6A, 0x00])  # Placeholder
 
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
+    send_bytes(sysex_message(sysex_data))
 
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
+    hex_display = sysex_data.hex(' ').upper()
 
-            # Optionally send Stop
-            if send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            else:
-                status = "(still running)"
-
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(notes)} melody notes {status}"
-            )]
-
-        elif name == "play_pattern_with_loop":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            loop_notes = arguments["loop_notes"]
-            loop_length = arguments.get("loop_length", 1)
-            channel = arguments.get("channel", 1) - 1
-            send_stop = arguments.get("send_stop", True)
-
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)
-            loop_pulses = int(loop_length * 96)
-
-            # Prepare loop schedule
-            loop_schedule = []
-            for note_data in loop_notes:
-                beat_offset = note_data[0]
-                note = note_data[1]
-                velocity = note_data[2] if len(note_data) > 2 else 100
-                pulse_offset = int(beat_offset * 24)
-                loop_schedule.append((pulse_offset, note, velocity))
+    return _text(f"Sent SysEx dump request for {dump_type}: F0 {hex_display} F7\n\nNote: The exact SysEx format for Digitakt dump requests is not publicly documented. This sends a basic request structure that may need adjustment. You may need to use Elektron Transfer software or capture actual dump requests to determine the correct format.")
 
-            # Sort by pulse offset
-            loop_schedule.sort(key=lambda x: x[0])
+async def _handle_send_nrpn(arguments: dict) -> list[TextContent]:
+    """Handle the send_nrpn tool"""
+    msb = arguments["msb"]
+    lsb = arguments["lsb"]
+    value = arguments["value"]
+    channel = arguments.get("channel", 1) - 1  # Convert to 0-indexed
 
-            # Send Start message
-            output_port.send(mido.Message('start'))
+    # Send NRPN message (requires 4 CC messages)
+    send_messages(nrpn_messages(channel, msb, lsb, value))
 
-            import time
-            start_time = time.time()
+    param_name = get_param_name(msb, lsb)
 
-            # Send clock pulses and looped notes
-            for i in range(total_pulses):
-                output_port.send(mido.Message('clock'))
+    return _text(f"Sent NRPN: {param_name} (MSB={msb}, LSB={lsb}) = {value} on channel {channel+1}")
 
-                # Calculate position within loop
-                loop_position = i % loop_pulses
+async def _handle_set_trig_note(arguments: dict) -> list[TextContent]:
+    """Handle the set_trig_note tool"""
+    note = arguments["note"]
+    channel = arguments.get("channel", 1) - 1
 
-                # Check if we need to send any notes at this position in the loop
-                for pulse_offset, note, velocity in loop_schedule:
-                    if pulse_offset == loop_position:
-                        output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=channel))
-                        # Schedule note off after short duration
-                        asyncio.create_task(_delayed_note_off(note, 0.05, channel))
+    # NRPN MSB=3, LSB=0 for trig note
+    send_messages(nrpn_messages(channel, 3, 0, note))
 
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
+    return _text(f"Set trig note to {note} on channel {channel+1}")
 
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
+async def _handle_set_trig_velocity(arguments: dict) -> list[TextContent]:
+    """Handle the set_trig_velocity tool"""
+    velocity = arguments["velocity"]
+    channel = arguments.get("channel", 1) - 1
 
-            # Optionally send Stop
-            if send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            else:
-                status = "(still running)"
-
-            num_loops = bars / loop_length
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(loop_notes)} notes looping every {loop_length} bar(s) ({num_loops:.1f} loops) {status}"
-            )]
-
-        elif name == "play_pattern_with_tracks_and_melody":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            track_triggers = arguments.get("track_triggers", [])
-            melody_notes = arguments.get("melody_notes", [])
-            channel = arguments.get("channel", 1) - 1
-            midi_start_at_beat = arguments.get("midi_start_at_beat", 0)
-            preroll_bars = arguments.get("preroll_bars", 0)
-            send_stop = arguments.get("send_stop", True)
-
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            beat_duration = 60.0 / bpm
-            total_pulses = int(bars * 96)
-            start_pulse = int(midi_start_at_beat * 24)  # Pulse index for MIDI Start
-            preroll_beats = preroll_bars * 4  # Convert bars to beats (4/4 time)
-
-            # Prepare combined event schedule with all notes
-            event_schedule = []
-
-            # Add track triggers to schedule
-            # Track triggers are NOT affected by preroll
-            for trigger_data in track_triggers:
-                beat = trigger_data[0]
-                track = trigger_data[1]
-                velocity = trigger_data[2] if len(trigger_data) > 2 else 100
-                # Check if chromatic note is specified (4th parameter)
-                if len(trigger_data) > 3:
-                    note = trigger_data[3]  # Use chromatic note
-                else:
-                    note = track - 1  # Standard: Track 1-16 = note 0-15
-                pulse_index = int(beat * 24)
-                # Track triggers use per-track MIDI channel (Track 1 = Channel 1, etc.)
-                # This allows simultaneous triggering of multiple tracks
-                track_channel = track - 1  # Track 1-16 → Channel 0-15 (MIDI channels 1-16)
-                event_schedule.append(("track", pulse_index, note, velocity, 0.05, track_channel))
-
-            # Add melody notes to schedule
-            # Melody notes ARE delayed by preroll
-            for note_data in melody_notes:
-                beat = note_data[0] + preroll_beats  # Add preroll offset
-                note = note_data[1]
-                velocity = note_data[2] if len(note_data) > 2 else 100
-                duration = note_data[3] if len(note_data) > 3 else 0.1
-                pulse_index = int(beat * 24)
-                # Melody notes use specified channel
-                event_schedule.append(("melody", pulse_index, note, velocity, duration, channel))
-
-            # Sort all events by pulse index
-            event_schedule.sort(key=lambda x: x[1])
-
-            import time
-            start_time = time.time()
-            event_idx = 0
-            midi_started = False
-
-            # Process all pulses/beats
-            for i in range(total_pulses):
-                # Check if we should send MIDI Start at this pulse
-                if i == start_pulse and not midi_started:
-                    # Send Song Position Pointer if starting mid-sequence
-                    if midi_start_at_beat > 0:
-                        # SPP is in "MIDI beats" (16th notes), so 1 quarter note = 4 MIDI beats
-                        spp_position = int(midi_start_at_beat * 4)
-                        output_port.send(mido.Message('songpos', pos=spp_position))
-                    output_port.send(mido.Message('start'))
-                    midi_started = True
-
-                # Send MIDI Clock only if we've started
-                if midi_started:
-                    output_port.send(mido.Message('clock'))
-
-                # Check if we need to send any events at this pulse
-                while event_idx < len(event_schedule) and event_schedule[event_idx][1] == i:
-                    event_type, pulse, note, velocity, duration, ch = event_schedule[event_idx]
-                    output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=ch))
-                    # Schedule note off after duration
-                    asyncio.create_task(_delayed_note_off(note, duration, ch))
-                    event_idx += 1
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Optionally send Stop (only if we actually started)
-            if send_stop and midi_started:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            elif midi_started:
-                status = "(still running)"
-            else:
-                status = "(no MIDI Start sent - all notes before midi_start_at_beat)"
-
-            count_in_info = f" (MIDI Start at beat {midi_start_at_beat})" if midi_start_at_beat > 0 else ""
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {len(melody_notes)} melody notes{count_in_info} {status}"
-            )]
-
-        elif name == "play_pattern_with_multi_channel_midi":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            track_triggers = arguments.get("track_triggers", [])
-            midi_channels = arguments.get("midi_channels", {})
-            parameter_automation = arguments.get("parameter_automation", {})
-            automation_loop_bars = arguments.get("automation_loop_bars", 0)
-            send_clock = arguments.get("send_clock", True)
-            midi_start_at_beat = arguments.get("midi_start_at_beat", 0)
-            preroll_bars = arguments.get("preroll_bars", 0)
-            send_stop = arguments.get("send_stop", True)
-
-            # Detect parameter automation format and validate
-            # Format 1: {'param_name': [[beat, value], ...]} - global automation
-            # Format 2: {track_num: {'param_name': [[beat, value], ...]}} - per-track automation
+    # NRPN MSB=3, LSB=1 for trig velocity
+    send_messages(nrpn_messages(channel, 3, 1, velocity))
+
+    return _text(f"Set trig velocity to {velocity} on channel {channel+1}")
+
+async def _handle_set_trig_length(arguments: dict) -> list[TextContent]:
+    """Handle the set_trig_length tool"""
+    length = arguments["length"]
+    channel = arguments.get("channel", 1) - 1
+
+    # NRPN MSB=3, LSB=2 for trig length
+    send_messages(nrpn_messages(channel, 3, 2, length))
+
+    return _text(f"Set trig length to {length} on channel {channel+1}")
+
+async def _handle_reset_velocities(arguments: dict) -> list[TextContent]:
+    """Handle the reset_velocities tool"""
+    velocity = arguments.get("velocity", 120)
+
+    # Set trig velocity on all 16 tracks using NRPN
+    messages = []
+    for track in range(1, 17):
+        channel = track - 1  # Track 1 = channel 0, etc.
+
+        # NRPN MSB=3, LSB=1 for trig velocity
+        messages += nrpn_messages(channel, 3, 1, velocity)
+    send_messages(messages)
+
+    return _text(f"Reset velocity to {velocity} on all 16 tracks")
+
+async def _handle_send_midi_start(arguments: dict) -> list[TextContent]:
+    """Handle the send_midi_start tool"""
+    # Send MIDI Start message (0xFA)
+    send_bytes(MIDI_START)
+
+    return _text("Sent MIDI Start - sequencer should start from beginning")
+
+async def _handle_send_midi_stop(arguments: dict) -> list[TextContent]:
+    """Handle the send_midi_stop tool"""
+    # Send MIDI Stop message (0xFC)
+    send_bytes(MIDI_STOP)
+
+    return _text("Sent MIDI Stop - sequencer should stop")
+
+async def _handle_send_midi_continue(arguments: dict) -> list[TextContent]:
+    """Handle the send_midi_continue tool"""
+    # Send MIDI Continue message (0xFB)
+    send_bytes(MIDI_CONTINUE)
+
+    return _text("Sent MIDI Continue - sequencer should resume from current position")
+
+async def _handle_send_song_position(arguments: dict) -> list[TextContent]:
+    """Handle the send_song_position tool"""
+    position = arguments["position"]
+
+    # Send MIDI Song Position Pointer (0xF2)
+    # Position is in MIDI beats (16th notes)
+    send_bytes(song_position_message(position))
+
+    return _text(f"Sent Song Position Pointer to position {position} (16th note: {position}, bar: {position/16:.2f})")
+
+async def _handle_play_with_clock(arguments: dict) -> list[TextContent]:
+    """Handle the play_with_clock tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    send_stop = arguments.get("send_stop", True)
+
+    # Calculate timing
+    # MIDI clock: 24 pulses per quarter note
+    # At 4/4 time: 96 pulses per bar
+    # Time between pulses = 60 / (bpm * 24)
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)  # 96 pulses per bar in 4/4
+
+    # Every pulse gets a fixed deadline up front; the sender thread
+    # spins onto each one, so the clock neither drifts nor jitters with
+    # event loop load
+    events, _ = clock_schedule(clock_interval, total_pulses, send_stop)
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    status = "and stopped" if send_stop else "(still running)"
+
+    return _text(f"Played {bars} bars at {bpm} BPM {status}")
+
+async def _handle_play_pattern_with_tracks(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_tracks tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    triggers = arguments["triggers"]
+    send_stop = arguments.get("send_stop", True)
+    check_note_count(len(triggers), "triggers")
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)
+    beat_duration = 60.0 / bpm  # Duration of one quarter note
+
+    # Prepare trigger schedule: convert beats to pulse indices
+    trigger_schedule = []
+    for trigger in triggers:
+        beat = trigger[0]
+        track = trigger[1]
+        velocity = trigger[2] if len(trigger) > 2 else 100
+        pulse_index = int(beat * 24)  # 24 pulses per quarter note
+        trigger_schedule.append((pulse_index, track, velocity))
+
+    # Clock and triggers all go to the sender thread up front; each
+    # trigger follows the clock pulse it lands on
+    events, pulse_time = clock_schedule(clock_interval, total_pulses, send_stop)
+    for pulse, track, velocity in trigger_schedule:
+        if 0 <= pulse < total_pulses:
+            t = pulse_time(pulse)
+            note = track - 1  # Track 1-16 = note 0-15
+            events.append((t, channel_message(NOTE_ON, 0, note, velocity)))
+            events.append((t + TRIGGER_LENGTH_NS, channel_message(NOTE_OFF, 0, note, 0)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    status = "and stopped" if send_stop else "(still running)"
+
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(triggers)} track triggers {status}")
+
+async def _handle_play_pattern_with_melody(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_melody tool"""
+    global last_melody
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    notes = arguments["notes"]
+    channel = arguments.get("channel", 1) - 1
+    send_stop = arguments.get("send_stop", True)
+    check_note_count(len(notes))
+
+    # Save to history for later export
+    last_melody = {
+        "bpm": bpm,
+        "notes": notes,
+        "channel": channel + 1  # Store as 1-based
+    }
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)
+
+    # Prepare note schedule: convert beats to pulse indices
+    note_schedule = []
+    for note_data in notes:
+        beat = note_data[0]
+        note = note_data[1]
+        velocity = note_data[2] if len(note_data) > 2 else 100
+        duration = note_data[3] if len(note_data) > 3 else 0.1
+        pulse_index = int(beat * 24)
+        note_schedule.append((pulse_index, note, velocity, duration))
+
+    # Sort by pulse index
+    note_schedule.sort(key=lambda x: x[0])
+
+    # Clock and notes all go to the sender thread up front; each note
+    # follows the clock pulse it lands on
+    events, pulse_time = clock_schedule(clock_interval, total_pulses, send_stop)
+    for pulse, note, velocity, duration in note_schedule:
+        if 0 <= pulse < total_pulses:
+            t = pulse_time(pulse)
+            events.append((t, channel_message(NOTE_ON, channel, note, velocity)))
+            events.append((t + max(0, int(duration * 1e9)), channel_message(NOTE_OFF, channel, note, 0)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    status = "and stopped" if send_stop else "(still running)"
+
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(notes)} melody notes {status}")
+
+async def _handle_play_pattern_with_loop(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_loop tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    loop_notes = arguments["loop_notes"]
+    loop_length = arguments.get("loop_length", 1)
+    channel = arguments.get("channel", 1) - 1
+    send_stop = arguments.get("send_stop", True)
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)
+    loop_pulses = int(loop_length * 96)
+
+    # Every repeat of the loop counts
+    check_note_count(len(loop_notes) * -(-total_pulses // max(loop_pulses, 1)), "looped notes")
+
+    # Prepare loop schedule
+    loop_schedule = []
+    for note_data in loop_notes:
+        beat_offset = note_data[0]
+        note = note_data[1]
+        velocity = note_data[2] if len(note_data) > 2 else 100
+        pulse_offset = int(beat_offset * 24)
+        loop_schedule.append((pulse_offset, note, velocity))
+
+    # Sort by pulse offset
+    loop_schedule.sort(key=lambda x: x[0])
+
+    # Clock and every repeat of the loop go to the sender thread up front;
+    # each note follows the clock pulse it lands on
+    events, pulse_time = clock_schedule(clock_interval, total_pulses, send_stop)
+    for loop_start in range(0, total_pulses, loop_pulses):
+        for pulse_offset, note, velocity in loop_schedule:
+            pulse = loop_start + pulse_offset
+            if 0 <= pulse_offset < loop_pulses and pulse < total_pulses:
+                t = pulse_time(pulse)
+                events.append((t, channel_message(NOTE_ON, channel, note, velocity)))
+                events.append((t + TRIGGER_LENGTH_NS, channel_message(NOTE_OFF, channel, note, 0)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    status = "and stopped" if send_stop else "(still running)"
+
+    num_loops = bars / loop_length
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(loop_notes)} notes looping every {loop_length} bar(s) ({num_loops:.1f} loops) {status}")
+
+async def _handle_play_pattern_with_tracks_and_melody(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_tracks_and_melody tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    track_triggers = arguments.get("track_triggers", [])
+    melody_notes = arguments.get("melody_notes", [])
+    channel = arguments.get("channel", 1) - 1
+    midi_start_at_beat = arguments.get("midi_start_at_beat", 0)
+    preroll_bars = arguments.get("preroll_bars", 0)
+    send_stop = arguments.get("send_stop", True)
+    check_note_count(len(track_triggers) + len(melody_notes), "notes and triggers")
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    beat_duration = 60.0 / bpm
+    total_pulses = int(bars * 96)
+    start_pulse = int(midi_start_at_beat * 24)  # Pulse index for MIDI Start
+    preroll_beats = preroll_bars * 4  # Convert bars to beats (4/4 time)
+
+    # Prepare combined event schedule with all notes
+    event_schedule = []
+
+    # Add track triggers to schedule
+    # Track triggers are NOT affected by preroll
+    for trigger_data in track_triggers:
+        beat = trigger_data[0]
+        track = trigger_data[1]
+        velocity = trigger_data[2] if len(trigger_data) > 2 else 100
+        # Check if chromatic note is specified (4th parameter)
+        if len(trigger_data) > 3:
+            note = trigger_data[3]  # Use chromatic note
+        else:
+            note = track - 1  # Standard: Track 1-16 = note 0-15
+        pulse_index = int(beat * 24)
+        # Track triggers use per-track MIDI channel (Track 1 = Channel 1, etc.)
+        # This allows simultaneous triggering of multiple tracks
+        track_channel = track - 1  # Track 1-16 → Channel 0-15 (MIDI channels 1-16)
+        event_schedule.append(("track", pulse_index, note, velocity, 0.05, track_channel))
+
+    # Add melody notes to schedule
+    # Melody notes ARE delayed by preroll
+    for note_data in melody_notes:
+        beat = note_data[0] + preroll_beats  # Add preroll offset
+        note = note_data[1]
+        velocity = note_data[2] if len(note_data) > 2 else 100
+        duration = note_data[3] if len(note_data) > 3 else 0.1
+        pulse_index = int(beat * 24)
+        # Melody notes use specified channel
+        event_schedule.append(("melody", pulse_index, note, velocity, duration, channel))
+
+    # Sort all events by pulse index
+    event_schedule.sort(key=lambda x: x[1])
+
+    # MIDI Start (and the clock) only go out if start_pulse is within the
+    # pattern; notes before it play without clock
+    midi_started = 0 <= start_pulse < total_pulses
+    # Send Song Position Pointer if starting mid-sequence
+    # SPP is in "MIDI beats" (16th notes), so 1 quarter note = 4 MIDI beats
+    spp_position = int(midi_start_at_beat * 4) if midi_start_at_beat > 0 else None
+
+    # Everything goes to the sender thread up front; each note follows
+    # the clock pulse it lands on
+    events, pulse_time = clock_schedule(
+        clock_interval, total_pulses, send_stop,
+        start_pulse=start_pulse if midi_started else None,
+        song_position=spp_position
+    )
+    for event_type, pulse, note, velocity, duration, ch in event_schedule:
+        if 0 <= pulse < total_pulses:
+            t = pulse_time(pulse)
+            events.append((t, channel_message(NOTE_ON, ch, note, velocity)))
+            events.append((t + max(0, int(duration * 1e9)), channel_message(NOTE_OFF, ch, note, 0)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    # Stop was sent only if we actually started
+    if send_stop and midi_started:
+        status = "and stopped"
+    elif midi_started:
+        status = "(still running)"
+    else:
+        status = "(no MIDI Start sent - all notes before midi_start_at_beat)"
+
+    count_in_info = f" (MIDI Start at beat {midi_start_at_beat})" if midi_start_at_beat > 0 else ""
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {len(melody_notes)} melody notes{count_in_info} {status}")
+
+async def _handle_play_pattern_with_multi_channel_midi(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_multi_channel_midi tool"""
+    global last_multi_channel_pattern
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    track_triggers = arguments.get("track_triggers", [])
+    midi_channels = arguments.get("midi_channels", {})
+    parameter_automation = arguments.get("parameter_automation", {})
+    automation_loop_bars = arguments.get("automation_loop_bars", 0)
+    send_clock = arguments.get("send_clock", True)
+    midi_start_at_beat = arguments.get("midi_start_at_beat", 0)
+    preroll_bars = arguments.get("preroll_bars", 0)
+    send_stop = arguments.get("send_stop", True)
+
+    # Detect parameter automation format and validate
+    # Format 1: {'param_name': [[beat, value], ...]} - global automation
+    # Format 2: {track_num: {'param_name': [[beat, value], ...]}} - per-track automation
+    per_track_automation = False
+    if parameter_automation:
+        # Check if first key is numeric (track number) or parameter name
+        first_key = next(iter(parameter_automation.keys()))
+        # Try to convert to int - if it works, it's per-track format
+        try:
+            int(first_key)
+            per_track_automation = True
+        except (ValueError, TypeError):
             per_track_automation = False
-            if parameter_automation:
-                # Check if first key is numeric (track number) or parameter name
-                first_key = next(iter(parameter_automation.keys()))
-                # Try to convert to int - if it works, it's per-track format
-                try:
-                    int(first_key)
-                    per_track_automation = True
-                except (ValueError, TypeError):
-                    per_track_automation = False
-
-                if per_track_automation:
-                    # Validate per-track format
-                    for track_key, track_params in parameter_automation.items():
-                        track_num = int(track_key)  # Convert string key to int
-                        if not isinstance(track_params, dict):
-                            return [TextContent(type="text", text=f"Error: Track {track_num} automation must be a dict of parameters")]
-                        for param_name, events in track_params.items():
-                            param_info = get_parameter_info(param_name)
-                            if not param_info:
-                                return [TextContent(type="text", text=f"Error: Unknown parameter '{param_name}' for track {track_num}")]
-                            for beat, value in events:
-                                is_valid, error_msg = validate_parameter(param_name, value)
-                                if not is_valid:
-                                    return [TextContent(type="text", text=f"Error: Track {track_num}: {error_msg}")]
-                else:
-                    # Validate global format
-                    for param_name, events in parameter_automation.items():
-                        param_info = get_parameter_info(param_name)
-                        if not param_info:
-                            return [TextContent(type="text", text=f"Error: Unknown parameter '{param_name}'")]
-                        for beat, value in events:
-                            is_valid, error_msg = validate_parameter(param_name, value)
-                            if not is_valid:
-                                return [TextContent(type="text", text=f"Error: {error_msg}")]
-
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            beat_duration = 60.0 / bpm
-            total_pulses = int(bars * 96)
-            start_pulse = int(midi_start_at_beat * 24)  # Pulse index for MIDI Start
-            preroll_beats = preroll_bars * 4  # Convert bars to beats (4/4 time)
-
-            # Prepare combined event schedule with all notes and parameter changes
-            event_schedule = []
-
-            # Add track triggers to schedule
-            # Track triggers are NOT affected by preroll
-            for trigger_data in track_triggers:
-                beat = trigger_data[0]
-                track = trigger_data[1]
-                velocity = trigger_data[2] if len(trigger_data) > 2 else 100
-                # Check if chromatic note is specified (4th parameter)
-                if len(trigger_data) > 3:
-                    note = trigger_data[3]  # Use chromatic note
-                else:
-                    note = track - 1  # Standard: Track 1-16 = note 0-15
-                pulse_index = int(beat * 24)
-                # Track triggers use per-track MIDI channel (Track 1 = Channel 1, etc.)
-                # This allows simultaneous triggering of multiple tracks
-                track_channel = track - 1  # Track 1-16 → Channel 0-15 (MIDI channels 1-16)
-                event_schedule.append(("track", pulse_index, note, velocity, 0.05, track_channel))
-
-            # Add MIDI notes from each channel
-            # MIDI notes ARE delayed by preroll
-            total_midi_notes = 0
-            for channel_str, notes in midi_channels.items():
-                channel = int(channel_str) - 1  # Convert to 0-based MIDI channel
-                if channel < 0 or channel > 15:
-                    continue  # Skip invalid channels
-
-                for note_data in notes:
-                    beat = note_data[0] + preroll_beats  # Add preroll offset
-                    note = note_data[1]
-                    velocity = note_data[2] if len(note_data) > 2 else 100
-                    duration = note_data[3] if len(note_data) > 3 else 0.1
-                    pulse_index = int(beat * 24)
-                    event_schedule.append(("midi", pulse_index, note, velocity, duration, channel))
-                    total_midi_notes += 1
-
-            # Add parameter automation events
-            # Parameter automation is NOT affected by preroll
-            total_param_events = 0
-            if per_track_automation:
-                # Per-track format: {track_num: {'param': [[beat, val], ...]}}
-                for track_key, track_params in parameter_automation.items():
-                    track_num = int(track_key)  # Convert string key to int
-                    for param_name, param_events in track_params.items():
-                        for beat, value in param_events:
-                            pulse_index = int(beat * 24)
-                            # Store track number in the event
-                            event_schedule.append(("param", pulse_index, param_name, value, track_num, 0))
-                            total_param_events += 1
-            else:
-                # Global format: {'param': [[beat, val], ...]}
-                for param_name, param_events in parameter_automation.items():
-                    for beat, value in param_events:
-                        pulse_index = int(beat * 24)
-                        # No track selection (track_num = 0 means global/active track)
-                        event_schedule.append(("param", pulse_index, param_name, value, 0, 0))
-                        total_param_events += 1
-
-            # Duplicate automation events if looping is enabled
-            if automation_loop_bars > 0 and total_param_events > 0:
-                # Collect only param events from the first loop cycle
-                loop_beats = automation_loop_bars * 4  # Convert bars to beats
-                loop_pulses = int(loop_beats * 24)
-                total_beats = bars * 4
-
-                # Get param events that occur within the loop period
-                original_param_events = [e for e in event_schedule if e[0] == "param" and e[1] < loop_pulses]
-
-                # Calculate how many times to repeat
-                num_loops = int(total_beats / loop_beats)
-
-                # Duplicate events for each loop cycle (skip first, it's already there)
-                for loop_num in range(1, num_loops):
-                    offset_pulses = loop_num * loop_pulses
-                    for event in original_param_events:
-                        event_type, pulse, param_name, value, track_num, _ = event
-                        new_pulse = pulse + offset_pulses
-                        if new_pulse < total_pulses:  # Don't exceed total duration
-                            event_schedule.append((event_type, new_pulse, param_name, value, track_num, 0))
-                            total_param_events += 1
-
-            # Sort all events by pulse index
-            event_schedule.sort(key=lambda x: x[1])
-
-            import time
-            start_time = time.time()
-            event_idx = 0
-            midi_started = False
-
-            # Process all pulses/beats
-            for i in range(total_pulses):
-                # Check if we should send MIDI Start at this pulse
-                if i == start_pulse and not midi_started:
-                    # Send Song Position Pointer if starting mid-sequence
-                    if midi_start_at_beat > 0:
-                        # SPP is in "MIDI beats" (16th notes), so 1 quarter note = 4 MIDI beats
-                        spp_position = int(midi_start_at_beat * 4)
-                        output_port.send(mido.Message('songpos', pos=spp_position))
-                    output_port.send(mido.Message('start'))
-                    midi_started = True
-
-                # Send MIDI Clock only if we've started and send_clock is True
-                if midi_started and send_clock:
-                    output_port.send(mido.Message('clock'))
-
-                # Check if we need to send any events at this pulse
-                while event_idx < len(event_schedule) and event_schedule[event_idx][1] == i:
-                    event_type, pulse, data1, data2, data3, data4 = event_schedule[event_idx]
-
-                    if event_type == "param":
-                        # Parameter change event: data1=param_name, data2=value, data3=track_num
-                        param_name = data1
-                        value = data2
-                        track_num = data3
-
-                        # If track_num is specified (per-track automation), send track selection
-                        if track_num > 0:
-                            # Select track using Program Change (pattern 0-127 maps to tracks)
-                            # Actually, Digitakt uses auto-channel mode where each track listens on its own channel
-                            # Track 1 = Channel 0, Track 2 = Channel 1, etc.
-                            track_channel = track_num - 1
-                            send_parameter_change(param_name, value, channel=track_channel)
-                        else:
-                            # Global automation - use channel 0 (Track 1 / Auto channel)
-                            send_parameter_change(param_name, value, channel=0)
-                    else:
-                        # Note event (track or midi): data1=note, data2=velocity, data3=duration, data4=channel
-                        note = data1
-                        velocity = data2
-                        duration = data3
-                        ch = data4
-                        output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=ch))
-                        # Schedule note off after duration
-                        asyncio.create_task(_delayed_note_off(note, duration, ch))
-
-                    event_idx += 1
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Optionally send Stop (only if we actually started)
-            if send_stop and midi_started:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            elif midi_started:
-                status = "(still running)"
-            else:
-                status = "(no MIDI Start sent - all notes before midi_start_at_beat)"
-
-            # Store pattern for later saving
-            global last_multi_channel_pattern
-            last_multi_channel_pattern = {
-                "bars": bars,
-                "bpm": bpm,
-                "track_triggers": track_triggers,
-                "midi_channels": midi_channels,
-                "parameter_automation": parameter_automation
-            }
-
-            num_channels = len(midi_channels)
-            count_in_info = f" (MIDI Start at beat {midi_start_at_beat})" if midi_start_at_beat > 0 else ""
-            param_info = f" and {total_param_events} parameter changes" if total_param_events > 0 else ""
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers, {total_midi_notes} MIDI notes across {num_channels} channels{param_info}{count_in_info} {status}"
-            )]
-
-        elif name == "save_last_melody":
-            filename = arguments["filename"]
-
-            if not last_melody:
-                return [TextContent(
-                    type="text",
-                    text="Error: No melody to save. Use play_pattern_with_melody first."
-                )]
-
-            # Create a MIDI file
-            mid = mido.MidiFile(ticks_per_beat=480)
-            track = mido.MidiTrack()
-            mid.tracks.append(track)
-
-            # Set tempo
-            bpm = last_melody["bpm"]
-            tempo = mido.bpm2tempo(bpm)
-            track.append(mido.MetaMessage('set_tempo', tempo=tempo, time=0))
-
-            # Add notes
-            notes = last_melody["notes"]
-            channel = last_melody["channel"] - 1  # Convert back to 0-based
-
-            # Convert notes to MIDI messages with delta times
-            # Notes format: [beat, note, velocity, duration]
-            events = []
-            for note_data in notes:
-                beat = note_data[0]
-                note = note_data[1]
-                velocity = note_data[2] if len(note_data) > 2 else 100
-                duration = note_data[3] if len(note_data) > 3 else 0.1
-
-                # Convert beat to ticks (480 ticks per quarter note)
-                tick_start = int(beat * 480)
-                tick_duration = int((duration / (60.0 / bpm)) * 480)  # Convert seconds to ticks
-
-                events.append(("on", tick_start, note, velocity, channel))
-                events.append(("off", tick_start + tick_duration, note, 0, channel))
-
-            # Sort events by time
-            events.sort(key=lambda x: x[1])
-
-            # Convert absolute times to delta times
-            current_time = 0
-            for event_type, tick_time, note, velocity, ch in events:
-                delta_time = tick_time - current_time
-
-                if event_type == "on":
-                    track.append(mido.Message('note_on', note=note, velocity=velocity, channel=ch, time=delta_time))
-                else:
-                    track.append(mido.Message('note_off', note=note, velocity=velocity, channel=ch, time=delta_time))
-
-                current_time = tick_time
-
-            # Add end of track
-            track.append(mido.MetaMessage('end_of_track', time=0))
-
-            # Save to file
-            try:
-                mid.save(filename)
-                return [TextContent(
-                    type="text",
-                    text=f"Saved melody to {filename} ({len(notes)} notes at {bpm} BPM)"
-                )]
-            except Exception as e:
-                return [TextContent(
-                    type="text",
-                    text=f"Error saving MIDI file: {str(e)}"
-                )]
-
-        elif name == "send_filter_sweep":
-            import math
-
-            start_value = arguments["start_value"]
-            end_value = arguments["end_value"]
-            duration_sec = arguments["duration_sec"]
-            curve = arguments.get("curve", "linear")
-            steps = arguments.get("steps", 50)
-            channel = arguments.get("channel", 1) - 1
-
-            # Calculate step interval
-            interval = duration_sec / steps
-
-            # Generate sweep values based on curve type
-            values = []
-            for i in range(steps + 1):
-                # Normalized position (0.0 to 1.0)
-                t = i / steps
-
-                if curve == "linear":
-                    # Linear interpolation
-                    value = start_value + (end_value - start_value) * t
-                elif curve == "exponential":
-                    # Exponential curve (fast start, slow end)
-                    value = start_value + (end_value - start_value) * (1 - math.exp(-3 * t))
-                elif curve == "logarithmic":
-                    # Logarithmic curve (slow start, fast end)
-                    value = start_value + (end_value - start_value) * math.exp(3 * (t - 1))
-
-                values.append(int(round(value)))
-
-            # Send CC messages with timing
-            import time
-            start_time = time.time()
-
-            for i, value in enumerate(values):
-                # Send CC 74 (filter cutoff)
-                msg = mido.Message('control_change', control=74, value=value, channel=channel)
-                output_port.send(msg)
-
-                # Calculate when next message should be sent
-                if i < len(values) - 1:
-                    next_time = start_time + (i + 1) * interval
-                    sleep_duration = next_time - time.time()
-                    if sleep_duration > 0:
-                        await asyncio.sleep(sleep_duration)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent filter sweep from {start_value} to {end_value} over {duration_sec}s ({curve} curve, {steps} steps) on channel {channel+1}"
-            )]
-
-        elif name == "send_filter_envelope":
-            attack_sec = arguments["attack_sec"]
-            decay_sec = arguments["decay_sec"]
-            sustain_level = arguments["sustain_level"]
-            release_sec = arguments["release_sec"]
-            steps_per_stage = arguments.get("steps_per_stage", 20)
-            channel = arguments.get("channel", 1) - 1
-
-            # Build envelope stages
-            stages = []
-
-            # Attack: 0 -> 127
-            attack_interval = attack_sec / steps_per_stage
-            for i in range(steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(127 * t))
-                stages.append((attack_interval, value))
-
-            # Decay: 127 -> sustain_level
-            decay_interval = decay_sec / steps_per_stage
-            for i in range(1, steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(127 + (sustain_level - 127) * t))
-                stages.append((decay_interval, value))
-
-            # Sustain: hold at sustain_level (no delay, just one message)
-            stages.append((0, sustain_level))
-
-            # Release: sustain_level -> 0
-            release_interval = release_sec / steps_per_stage
-            for i in range(1, steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(sustain_level * (1 - t)))
-                stages.append((release_interval, value))
-
-            # Send CC messages with timing
-            import time
-            start_time = time.time()
-            current_time = 0
-
-            for i, (interval, value) in enumerate(stages):
-                # Send CC 74 (filter cutoff)
-                msg = mido.Message('control_change', control=74, value=value, channel=channel)
-                output_port.send(msg)
-
-                # Wait for interval
-                if interval > 0 and i < len(stages) - 1:
-                    current_time += interval
-                    next_time = start_time + current_time
-                    sleep_duration = next_time - time.time()
-                    if sleep_duration > 0:
-                        await asyncio.sleep(sleep_duration)
-
-            total_time = attack_sec + decay_sec + release_sec
-            return [TextContent(
-                type="text",
-                text=f"Sent filter ADSR envelope: A={attack_sec}s D={decay_sec}s S={sustain_level} R={release_sec}s (total {total_time:.2f}s) on channel {channel+1}"
-            )]
-
-        elif name == "play_with_filter_automation":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            track_triggers = arguments.get("track_triggers", [])
-            filter_events = arguments["filter_events"]
-            send_clock = arguments.get("send_clock", True)
-            send_stop = arguments.get("send_stop", True)
-            channel = arguments.get("channel", 1) - 1
-
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)
-
-            # Prepare track trigger schedule
-            trigger_schedule = []
-            for trigger in track_triggers:
-                beat = trigger[0]
-                track = trigger[1]
-                velocity = trigger[2] if len(trigger) > 2 else 100
-                pulse_index = int(beat * 24)
-                note = track - 1  # Track 1-16 = note 0-15
-                trigger_schedule.append((pulse_index, note, velocity))
-            trigger_schedule.sort(key=lambda x: x[0])
-
-            # Prepare filter event schedule
-            filter_schedule = []
-            for event in filter_events:
-                beat = event[0]
-                cutoff = event[1]
-                pulse_index = int(beat * 24)
-                filter_schedule.append((pulse_index, cutoff))
-            filter_schedule.sort(key=lambda x: x[0])
-
-            # Send Start if requested
-            if send_clock:
-                output_port.send(mido.Message('start'))
-
-            import time
-            start_time = time.time()
-            trigger_idx = 0
-            filter_idx = 0
-
-            # Send clock pulses, triggers, and filter automation
-            for i in range(total_pulses):
-                # Send clock if requested
-                if send_clock:
-                    output_port.send(mido.Message('clock'))
-
-                # Check for track triggers at this pulse
-                while trigger_idx < len(trigger_schedule) and trigger_schedule[trigger_idx][0] == i:
-                    pulse, note, velocity = trigger_schedule[trigger_idx]
-                    output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=0))
-                    asyncio.create_task(_delayed_note_off(note, 0.05, 0))
-                    trigger_idx += 1
-
-                # Check for filter events at this pulse
-                while filter_idx < len(filter_schedule) and filter_schedule[filter_idx][0] == i:
-                    pulse, cutoff = filter_schedule[filter_idx]
-                    output_port.send(mido.Message('control_change', control=74, value=cutoff, channel=channel))
-                    filter_idx += 1
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Send Stop if requested
-            if send_clock and send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            elif send_clock:
-                status = "(still running)"
-            else:
-                status = "(no transport control)"
-
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {len(filter_events)} filter events {status}"
-            )]
-
-        elif name == "set_parameter":
-            parameter = arguments["parameter"]
-            value = arguments["value"]
-            channel = arguments.get("channel", 1) - 1
-
-            # Validate parameter
-            is_valid, error_msg = validate_parameter(parameter, value)
-            if not is_valid:
-                return [TextContent(type="text", text=f"Error: {error_msg}")]
-
-            # Send parameter change
-            send_parameter_change(parameter, value, channel)
-
-            return [TextContent(
-                type="text",
-                text=f"Set {parameter} to {value} on channel {channel + 1}"
-            )]
-
-        elif name == "send_parameter_sweep":
-            import math
 
-            parameter = arguments["parameter"]
-            start_value = arguments["start_value"]
-            end_value = arguments["end_value"]
-            duration_sec = arguments["duration_sec"]
-            curve = arguments.get("curve", "linear")
-            steps = arguments.get("steps", 50)
-            channel = arguments.get("channel", 1) - 1
-
-            # Validate parameter
-            is_valid, error_msg = validate_parameter(parameter, start_value)
-            if not is_valid:
-                return [TextContent(type="text", text=f"Error: {error_msg}")]
-            is_valid, error_msg = validate_parameter(parameter, end_value)
-            if not is_valid:
-                return [TextContent(type="text", text=f"Error: {error_msg}")]
-
-            # Calculate step interval
-            interval = duration_sec / steps
-
-            # Generate sweep values based on curve type
-            values = []
-            for i in range(steps + 1):
-                t = i / steps
-
-                if curve == "linear":
-                    value = start_value + (end_value - start_value) * t
-                elif curve == "exponential":
-                    value = start_value + (end_value - start_value) * (1 - math.exp(-3 * t))
-                elif curve == "logarithmic":
-                    value = start_value + (end_value - start_value) * math.exp(3 * (t - 1))
-
-                values.append(int(round(value)))
-
-            # Send parameter changes with timing
-            import time
-            start_time = time.time()
-
-            for i, value in enumerate(values):
-                send_parameter_change(parameter, value, channel)
-
-                if i < len(values) - 1:
-                    next_time = start_time + (i + 1) * interval
-                    sleep_duration = next_time - time.time()
-                    if sleep_duration > 0:
-                        await asyncio.sleep(sleep_duration)
-
-            return [TextContent(
-                type="text",
-                text=f"Sent {parameter} sweep from {start_value} to {end_value} over {duration_sec}s ({curve} curve, {steps} steps) on channel {channel+1}"
-            )]
-
-        elif name == "send_parameter_envelope":
-            parameter = arguments["parameter"]
-            attack_sec = arguments["attack_sec"]
-            decay_sec = arguments["decay_sec"]
-            sustain_level = arguments["sustain_level"]
-            release_sec = arguments["release_sec"]
-            steps_per_stage = arguments.get("steps_per_stage", 20)
-            channel = arguments.get("channel", 1) - 1
-
-            # Validate parameter
-            is_valid, error_msg = validate_parameter(parameter, sustain_level)
-            if not is_valid:
-                return [TextContent(type="text", text=f"Error: {error_msg}")]
-
-            # Build envelope stages
-            stages = []
-
-            # Attack: 0 -> 127
-            attack_interval = attack_sec / steps_per_stage
-            for i in range(steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(127 * t))
-                stages.append((attack_interval, value))
-
-            # Decay: 127 -> sustain_level
-            decay_interval = decay_sec / steps_per_stage
-            for i in range(1, steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(127 + (sustain_level - 127) * t))
-                stages.append((decay_interval, value))
-
-            # Sustain: hold at sustain_level
-            stages.append((0, sustain_level))
-
-            # Release: sustain_level -> 0
-            release_interval = release_sec / steps_per_stage
-            for i in range(1, steps_per_stage + 1):
-                t = i / steps_per_stage
-                value = int(round(sustain_level * (1 - t)))
-                stages.append((release_interval, value))
-
-            # Send parameter changes with timing
-            import time
-            start_time = time.time()
-            current_time = 0
-
-            for i, (interval, value) in enumerate(stages):
-                send_parameter_change(parameter, value, channel)
-
-                if interval > 0 and i < len(stages) - 1:
-                    current_time += interval
-                    next_time = start_time + current_time
-                    sleep_duration = next_time - time.time()
-                    if sleep_duration > 0:
-                        await asyncio.sleep(sleep_duration)
-
-            total_time = attack_sec + decay_sec + release_sec
-            return [TextContent(
-                type="text",
-                text=f"Sent {parameter} ADSR envelope: A={attack_sec}s D={decay_sec}s S={sustain_level} R={release_sec}s (total {total_time:.2f}s) on channel {channel+1}"
-            )]
-
-        elif name == "play_pattern_with_parameter_automation":
-            bars = arguments.get("bars", 4)
-            bpm = arguments.get("bpm", 120)
-            track_triggers = arguments.get("track_triggers", [])
-            parameter_automation = arguments["parameter_automation"]
-            send_clock = arguments.get("send_clock", True)
-            send_stop = arguments.get("send_stop", True)
-            channel = arguments.get("channel", 1) - 1
-
-            # Validate all parameters
+        if per_track_automation:
+            # Validate per-track format
+            for track_key, track_params in parameter_automation.items():
+                track_num = int(track_key)  # Convert string key to int
+                if not isinstance(track_params, dict):
+                    return _text(f"Error: Track {track_num} automation must be a dict of parameters")
+                for param_name, events in track_params.items():
+                    param_info = get_parameter_info(param_name)
+                    if not param_info:
+                        return _text(f"Error: Unknown parameter '{param_name}' for track {track_num}")
+                    for beat, value in events:
+                        is_valid, error_msg = validate_parameter(param_name, value)
+                        if not is_valid:
+                            return _text(f"Error: Track {track_num}: {error_msg}")
+        else:
+            # Validate global format
             for param_name, events in parameter_automation.items():
                 param_info = get_parameter_info(param_name)
                 if not param_info:
-                    return [TextContent(type="text", text=f"Error: Unknown parameter '{param_name}'")]
+                    return _text(f"Error: Unknown parameter '{param_name}'")
                 for beat, value in events:
                     is_valid, error_msg = validate_parameter(param_name, value)
                     if not is_valid:
-                        return [TextContent(type="text", text=f"Error: {error_msg}")]
+                        return _text(f"Error: {error_msg}")
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    beat_duration = 60.0 / bpm
+    total_pulses = int(bars * 96)
+    start_pulse = int(midi_start_at_beat * 24)  # Pulse index for MIDI Start
+    preroll_beats = preroll_bars * 4  # Convert bars to beats (4/4 time)
+
+    # Prepare combined event schedule with all notes and parameter changes
+    event_schedule = []
+
+    # Add track triggers to schedule
+    # Track triggers are NOT affected by preroll
+    for trigger_data in track_triggers:
+        beat = trigger_data[0]
+        track = trigger_data[1]
+        velocity = trigger_data[2] if len(trigger_data) > 2 else 100
+        # Check if chromatic note is specified (4th parameter)
+        if len(trigger_data) > 3:
+            note = trigger_data[3]  # Use chromatic note
+        else:
+            note = track - 1  # Standard: Track 1-16 = note 0-15
+        pulse_index = int(beat * 24)
+        # Track triggers use per-track MIDI channel (Track 1 = Channel 1, etc.)
+        # This allows simultaneous triggering of multiple tracks
+        track_channel = track - 1  # Track 1-16 → Channel 0-15 (MIDI channels 1-16)
+        event_schedule.append(("track", pulse_index, note, velocity, 0.05, track_channel))
+
+    # Add MIDI notes from each channel
+    # MIDI notes ARE delayed by preroll
+    total_midi_notes = 0
+    for channel_str, notes in midi_channels.items():
+        channel = int(channel_str) - 1  # Convert to 0-based MIDI channel
+        if channel < 0 or channel > 15:
+            continue  # Skip invalid channels
+
+        for note_data in notes:
+            beat = note_data[0] + preroll_beats  # Add preroll offset
+            note = note_data[1]
+            velocity = note_data[2] if len(note_data) > 2 else 100
+            duration = note_data[3] if len(note_data) > 3 else 0.1
+            pulse_index = int(beat * 24)
+            event_schedule.append(("midi", pulse_index, note, velocity, duration, channel))
+            total_midi_notes += 1
+
+    # Add parameter automation events
+    # Parameter automation is NOT affected by preroll
+    total_param_events = 0
+    if per_track_automation:
+        # Per-track format: {track_num: {'param': [[beat, val], ...]}}
+        for track_key, track_params in parameter_automation.items():
+            track_num = int(track_key)  # Convert string key to int
+            for param_name, param_events in track_params.items():
+                for beat, value in param_events:
+                    pulse_index = int(beat * 24)
+                    # Store track number in the event
+                    event_schedule.append(("param", pulse_index, param_name, value, track_num, 0))
+                    total_param_events += 1
+    else:
+        # Global format: {'param': [[beat, val], ...]}
+        for param_name, param_events in parameter_automation.items():
+            for beat, value in param_events:
+                pulse_index = int(beat * 24)
+                # No track selection (track_num = 0 means global/active track)
+                event_schedule.append(("param", pulse_index, param_name, value, 0, 0))
+                total_param_events += 1
+
+    # Duplicate automation events if looping is enabled
+    if automation_loop_bars > 0 and total_param_events > 0:
+        # Collect only param events from the first loop cycle
+        loop_beats = automation_loop_bars * 4  # Convert bars to beats
+        loop_pulses = int(loop_beats * 24)
+        total_beats = bars * 4
+
+        # Get param events that occur within the loop period
+        original_param_events = [e for e in event_schedule if e[0] == "param" and e[1] < loop_pulses]
+
+        # Calculate how many times to repeat
+        num_loops = int(total_beats / loop_beats)
+
+        # Duplicate events for each loop cycle (skip first, it's already there)
+        for loop_num in range(1, num_loops):
+            offset_pulses = loop_num * loop_pulses
+            for event in original_param_events:
+                event_type, pulse, param_name, value, track_num, _ = event
+                new_pulse = pulse + offset_pulses
+                if new_pulse < total_pulses:  # Don't exceed total duration
+                    event_schedule.append((event_type, new_pulse, param_name, value, track_num, 0))
+                    total_param_events += 1
+
+    # Count everything that will be scheduled, automation repeats included
+    check_note_count(len(event_schedule), "notes, triggers and parameter changes")
+
+    # Sort all events by pulse index
+    event_schedule.sort(key=lambda x: x[1])
+
+    # MIDI Start only goes out if start_pulse is within the pattern (the
+    # clock too, if send_clock); events before it play without clock
+    midi_started = 0 <= start_pulse < total_pulses
+    # Send Song Position Pointer if starting mid-sequence
+    # SPP is in "MIDI beats" (16th notes), so 1 quarter note = 4 MIDI beats
+    spp_position = int(midi_start_at_beat * 4) if midi_start_at_beat > 0 else None
+
+    # Everything goes to the sender thread up front; each event follows
+    # the clock pulse it lands on
+    events, pulse_time = clock_schedule(
+        clock_interval, total_pulses, send_stop,
+        start_pulse=start_pulse if midi_started else None,
+        send_clock=send_clock,
+        song_position=spp_position
+    )
+    for event_type, pulse, data1, data2, data3, data4 in event_schedule:
+        if not 0 <= pulse < total_pulses:
+            continue
+        t = pulse_time(pulse)
+
+        if event_type == "param":
+            # Parameter change event: data1=param_name, data2=value, data3=track_num
+            param_name = data1
+            value = data2
+            track_num = data3
+
+            # If track_num is specified (per-track automation), send on that track's channel
+            if track_num > 0:
+                # Digitakt uses auto-channel mode where each track listens on its own channel
+                # Track 1 = Channel 0, Track 2 = Channel 1, etc.
+                track_channel = track_num - 1
+            else:
+                # Global automation - use channel 0 (Track 1 / Auto channel)
+                track_channel = 0
+            events += [(t, message) for message in parameter_messages(param_name, value, track_channel)]
+        else:
+            # Note event (track or midi): data1=note, data2=velocity, data3=duration, data4=channel
+            note = data1
+            velocity = data2
+            duration = data3
+            ch = data4
+            events.append((t, channel_message(NOTE_ON, ch, note, velocity)))
+            events.append((t + max(0, int(duration * 1e9)), channel_message(NOTE_OFF, ch, note, 0)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    # Stop was sent only if we actually started
+    if send_stop and midi_started:
+        status = "and stopped"
+    elif midi_started:
+        status = "(still running)"
+    else:
+        status = "(no MIDI Start sent - all notes before midi_start_at_beat)"
+
+    # Store pattern for later saving
+    last_multi_channel_pattern = {
+        "bars": bars,
+        "bpm": bpm,
+        "track_triggers": track_triggers,
+        "midi_channels": midi_channels,
+        "parameter_automation": parameter_automation
+    }
+
+    num_channels = len(midi_channels)
+    count_in_info = f" (MIDI Start at beat {midi_start_at_beat})" if midi_start_at_beat > 0 else ""
+    param_info = f" and {total_param_events} parameter changes" if total_param_events > 0 else ""
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers, {total_midi_notes} MIDI notes across {num_channels} channels{param_info}{count_in_info} {status}")
+
+async def _handle_save_last_melody(arguments: dict) -> list[TextContent]:
+    """Handle the save_last_melody tool"""
+    filename = arguments["filename"]
+
+    if not last_melody:
+        return _text("Error: No melody to save. Use play_pattern_with_melody first.")
+
+    # Create a MIDI file
+    mid = mido.MidiFile(ticks_per_beat=480)
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+
+    # Set tempo
+    bpm = last_melody["bpm"]
+    tempo = mido.bpm2tempo(bpm)
+    track.append(mido.MetaMessage('set_tempo', tempo=tempo, time=0))
+
+    # Add notes
+    notes = last_melody["notes"]
+    channel = last_melody["channel"] - 1  # Convert back to 0-based
+
+    # Convert notes to MIDI messages with delta times
+    # Notes format: [beat, note, velocity, duration]
+    events = []
+    for note_data in notes:
+        beat = note_data[0]
+        note = note_data[1]
+        velocity = note_data[2] if len(note_data) > 2 else 100
+        duration = note_data[3] if len(note_data) > 3 else 0.1
+
+        # Convert beat to ticks (480 ticks per quarter note)
+        tick_start = int(beat * 480)
+        tick_duration = int((duration / (60.0 / bpm)) * 480)  # Convert seconds to ticks
+
+        events.append(("on", tick_start, note, velocity, channel))
+        events.append(("off", tick_start + tick_duration, note, 0, channel))
+
+    # Sort events by time
+    events.sort(key=lambda x: x[1])
+
+    # Convert absolute times to delta times
+    current_time = 0
+    for event_type, tick_time, note, velocity, ch in events:
+        delta_time = tick_time - current_time
+
+        if event_type == "on":
+            track.append(mido.Message('note_on', note=note, velocity=velocity, channel=ch, time=delta_time))
+        else:
+            track.append(mido.Message('note_off', note=note, velocity=velocity, channel=ch, time=delta_time))
 
-            # Calculate timing
-            clock_interval = 60.0 / (bpm * 24)
-            total_pulses = int(bars * 96)
+        current_time = tick_time
 
-            # Prepare track trigger schedule
-            trigger_schedule = []
-            for trigger in track_triggers:
-                beat = trigger[0]
-                track = trigger[1]
-                velocity = trigger[2] if len(trigger) > 2 else 100
-                pulse_index = int(beat * 24)
-                note = track - 1
-                trigger_schedule.append((pulse_index, note, velocity))
-            trigger_schedule.sort(key=lambda x: x[0])
+    # Add end of track
+    track.append(mido.MetaMessage('end_of_track', time=0))
 
-            # Prepare parameter automation schedules (one per parameter)
-            param_schedules = {}
-            for param_name, events in parameter_automation.items():
-                schedule = []
-                for beat, value in events:
-                    pulse_index = int(beat * 24)
-                    schedule.append((pulse_index, value))
-                schedule.sort(key=lambda x: x[0])
-                param_schedules[param_name] = schedule
-
-            # Send Start if requested
-            if send_clock:
-                output_port.send(mido.Message('start'))
-
-            import time
-            start_time = time.time()
-            trigger_idx = 0
-            param_indices = {param_name: 0 for param_name in param_schedules.keys()}
-
-            # Send clock pulses, triggers, and parameter automation
-            for i in range(total_pulses):
-                # Send clock if requested
-                if send_clock:
-                    output_port.send(mido.Message('clock'))
-
-                # Check for track triggers at this pulse
-                while trigger_idx < len(trigger_schedule) and trigger_schedule[trigger_idx][0] == i:
-                    pulse, note, velocity = trigger_schedule[trigger_idx]
-                    output_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=0))
-                    asyncio.create_task(_delayed_note_off(note, 0.05, 0))
-                    trigger_idx += 1
-
-                # Check for parameter events at this pulse
-                for param_name, schedule in param_schedules.items():
-                    param_idx = param_indices[param_name]
-                    while param_idx < len(schedule) and schedule[param_idx][0] == i:
-                        pulse, value = schedule[param_idx]
-                        send_parameter_change(param_name, value, channel)
-                        param_idx += 1
-                    param_indices[param_name] = param_idx
-
-                # Calculate when next pulse should occur
-                next_pulse_time = start_time + (i + 1) * clock_interval
-                sleep_duration = next_pulse_time - time.time()
-
-                if sleep_duration > 0:
-                    await asyncio.sleep(sleep_duration)
-
-            # Send Stop if requested
-            if send_clock and send_stop:
-                output_port.send(mido.Message('stop'))
-                status = "and stopped"
-            elif send_clock:
-                status = "(still running)"
+    # Save to file
+    try:
+        mid.save(filename)
+        return _text(f"Saved melody to {filename} ({len(notes)} notes at {bpm} BPM)")
+    except Exception as e:
+        return _text(f"Error saving MIDI file: {str(e)}")
+
+async def _handle_send_filter_sweep(arguments: dict) -> list[TextContent]:
+    """Handle the send_filter_sweep tool"""
+    start_value = arguments["start_value"]
+    end_value = arguments["end_value"]
+    duration_sec = arguments["duration_sec"]
+    curve = arguments.get("curve", "linear")
+    steps = arguments.get("steps", 50)
+    channel = arguments.get("channel", 1) - 1
+    # One CC per step, plus the end value
+    check_note_count(steps + 1, "sweep steps")
+
+    # Calculate step interval
+    interval = duration_sec / steps
+
+    # Generate sweep values based on curve type
+    values = []
+    for i in range(steps + 1):
+        # Normalized position (0.0 to 1.0)
+        t = i / steps
+
+        if curve == "linear":
+            # Linear interpolation
+            value = start_value + (end_value - start_value) * t
+        elif curve == "exponential":
+            # Exponential curve (fast start, slow end)
+            value = start_value + (end_value - start_value) * (1 - math.exp(-3 * t))
+        elif curve == "logarithmic":
+            # Logarithmic curve (slow start, fast end)
+            value = start_value + (end_value - start_value) * math.exp(3 * (t - 1))
+
+        values.append(int(round(value)))
+
+    # Send CC 74 (filter cutoff) messages, timed by the sender thread
+    interval_ns = max(0, interval * 1e9)
+    await sender.play([
+        (int(i * interval_ns), channel_message(CONTROL_CHANGE, channel, 74, value))
+        for i, value in enumerate(values)
+    ])
+
+    return _text(f"Sent filter sweep from {start_value} to {end_value} over {duration_sec}s ({curve} curve, {steps} steps) on channel {channel+1}")
+
+async def _handle_send_filter_envelope(arguments: dict) -> list[TextContent]:
+    """Handle the send_filter_envelope tool"""
+    attack_sec = arguments["attack_sec"]
+    decay_sec = arguments["decay_sec"]
+    sustain_level = arguments["sustain_level"]
+    release_sec = arguments["release_sec"]
+    steps_per_stage = arguments.get("steps_per_stage", 20)
+    channel = arguments.get("channel", 1) - 1
+    # One CC per step of attack, decay and release, plus the sustain
+    # level and the attack's starting value
+    check_note_count(3 * steps_per_stage + 2, "envelope steps")
+
+    # Build envelope stages
+    stages = []
+
+    # Attack: 0 -> 127
+    attack_interval = attack_sec / steps_per_stage
+    for i in range(steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(127 * t))
+        stages.append((attack_interval, value))
+
+    # Decay: 127 -> sustain_level
+    decay_interval = decay_sec / steps_per_stage
+    for i in range(1, steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(127 + (sustain_level - 127) * t))
+        stages.append((decay_interval, value))
+
+    # Sustain: hold at sustain_level (no delay, just one message)
+    stages.append((0, sustain_level))
+
+    # Release: sustain_level -> 0
+    release_interval = release_sec / steps_per_stage
+    for i in range(1, steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(sustain_level * (1 - t)))
+        stages.append((release_interval, value))
+
+    # Send CC 74 (filter cutoff) messages, timed by the sender thread;
+    # each stage waits its interval before the next one
+    events = []
+    current_time = 0
+    for interval, value in stages:
+        events.append((int(current_time * 1e9), channel_message(CONTROL_CHANGE, channel, 74, value)))
+        current_time += max(0, interval)
+    await sender.play(events)
+
+    total_time = attack_sec + decay_sec + release_sec
+    return _text(f"Sent filter ADSR envelope: A={attack_sec}s D={decay_sec}s S={sustain_level} R={release_sec}s (total {total_time:.2f}s) on channel {channel+1}")
+
+async def _handle_play_with_filter_automation(arguments: dict) -> list[TextContent]:
+    """Handle the play_with_filter_automation tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    track_triggers = arguments.get("track_triggers", [])
+    filter_events = arguments["filter_events"]
+    send_clock = arguments.get("send_clock", True)
+    send_stop = arguments.get("send_stop", True)
+    channel = arguments.get("channel", 1) - 1
+    check_note_count(len(track_triggers) + len(filter_events), "triggers and filter events")
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)
+
+    # Prepare track trigger schedule
+    trigger_schedule = []
+    for trigger in track_triggers:
+        beat = trigger[0]
+        track = trigger[1]
+        velocity = trigger[2] if len(trigger) > 2 else 100
+        pulse_index = int(beat * 24)
+        note = track - 1  # Track 1-16 = note 0-15
+        trigger_schedule.append((pulse_index, note, velocity))
+    trigger_schedule.sort(key=lambda x: x[0])
+
+    # Prepare filter event schedule
+    filter_schedule = []
+    for event in filter_events:
+        beat = event[0]
+        cutoff = event[1]
+        pulse_index = int(beat * 24)
+        filter_schedule.append((pulse_index, cutoff))
+    filter_schedule.sort(key=lambda x: x[0])
+
+    # Clock (if requested), triggers and filter automation all go to the
+    # sender thread up front; each event follows the clock pulse it lands on
+    events, pulse_time = clock_schedule(
+        clock_interval, total_pulses, send_stop,
+        start_pulse=0 if send_clock else None
+    )
+    for pulse, note, velocity in trigger_schedule:
+        if 0 <= pulse < total_pulses:
+            t = pulse_time(pulse)
+            events.append((t, channel_message(NOTE_ON, 0, note, velocity)))
+            events.append((t + TRIGGER_LENGTH_NS, channel_message(NOTE_OFF, 0, note, 0)))
+    for pulse, cutoff in filter_schedule:
+        if 0 <= pulse < total_pulses:
+            events.append((pulse_time(pulse), channel_message(CONTROL_CHANGE, channel, 74, cutoff)))
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    # Stop is only sent along with the clock
+    if send_clock and send_stop:
+        status = "and stopped"
+    elif send_clock:
+        status = "(still running)"
+    else:
+        status = "(no transport control)"
+
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {len(filter_events)} filter events {status}")
+
+async def _handle_set_parameter(arguments: dict) -> list[TextContent]:
+    """Handle the set_parameter tool"""
+    parameter = arguments["parameter"]
+    value = arguments["value"]
+    channel = arguments.get("channel", 1) - 1
+
+    # Validate parameter
+    is_valid, error_msg = validate_parameter(parameter, value)
+    if not is_valid:
+        return _text(f"Error: {error_msg}")
+
+    # Send parameter change
+    send_parameter_change(parameter, value, channel)
+
+    return _text(f"Set {parameter} to {value} on channel {channel + 1}")
+
+async def _handle_send_parameter_sweep(arguments: dict) -> list[TextContent]:
+    """Handle the send_parameter_sweep tool"""
+    parameter = arguments["parameter"]
+    start_value = arguments["start_value"]
+    end_value = arguments["end_value"]
+    duration_sec = arguments["duration_sec"]
+    curve = arguments.get("curve", "linear")
+    steps = arguments.get("steps", 50)
+    channel = arguments.get("channel", 1) - 1
+
+    # Validate parameter
+    is_valid, error_msg = validate_parameter(parameter, start_value)
+    if not is_valid:
+        return _text(f"Error: {error_msg}")
+    is_valid, error_msg = validate_parameter(parameter, end_value)
+    if not is_valid:
+        return _text(f"Error: {error_msg}")
+
+    # Each step is one CC or a four-message NRPN
+    per_step = len(parameter_messages(parameter, start_value, channel))
+    check_note_count((steps + 1) * per_step, "sweep messages")
+
+    # Calculate step interval
+    interval = duration_sec / steps
+
+    # Generate sweep values based on curve type
+    values = []
+    for i in range(steps + 1):
+        t = i / steps
+
+        if curve == "linear":
+            value = start_value + (end_value - start_value) * t
+        elif curve == "exponential":
+            value = start_value + (end_value - start_value) * (1 - math.exp(-3 * t))
+        elif curve == "logarithmic":
+            value = start_value + (end_value - start_value) * math.exp(3 * (t - 1))
+
+        values.append(int(round(value)))
+
+    # Send parameter changes, timed by the sender thread
+    interval_ns = max(0, interval * 1e9)
+    events = []
+    for i, value in enumerate(values):
+        t = int(i * interval_ns)
+        events += [(t, message) for message in parameter_messages(parameter, value, channel)]
+    await sender.play(events)
+
+    return _text(f"Sent {parameter} sweep from {start_value} to {end_value} over {duration_sec}s ({curve} curve, {steps} steps) on channel {channel+1}")
+
+async def _handle_send_parameter_envelope(arguments: dict) -> list[TextContent]:
+    """Handle the send_parameter_envelope tool"""
+    parameter = arguments["parameter"]
+    attack_sec = arguments["attack_sec"]
+    decay_sec = arguments["decay_sec"]
+    sustain_level = arguments["sustain_level"]
+    release_sec = arguments["release_sec"]
+    steps_per_stage = arguments.get("steps_per_stage", 20)
+    channel = arguments.get("channel", 1) - 1
+
+    # Validate parameter
+    is_valid, error_msg = validate_parameter(parameter, sustain_level)
+    if not is_valid:
+        return _text(f"Error: {error_msg}")
+
+    # Each step is one CC or a four-message NRPN
+    per_step = len(parameter_messages(parameter, sustain_level, channel))
+    check_note_count((3 * steps_per_stage + 2) * per_step, "envelope messages")
+
+    # Build envelope stages
+    stages = []
+
+    # Attack: 0 -> 127
+    attack_interval = attack_sec / steps_per_stage
+    for i in range(steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(127 * t))
+        stages.append((attack_interval, value))
+
+    # Decay: 127 -> sustain_level
+    decay_interval = decay_sec / steps_per_stage
+    for i in range(1, steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(127 + (sustain_level - 127) * t))
+        stages.append((decay_interval, value))
+
+    # Sustain: hold at sustain_level
+    stages.append((0, sustain_level))
+
+    # Release: sustain_level -> 0
+    release_interval = release_sec / steps_per_stage
+    for i in range(1, steps_per_stage + 1):
+        t = i / steps_per_stage
+        value = int(round(sustain_level * (1 - t)))
+        stages.append((release_interval, value))
+
+    # Send parameter changes, timed by the sender thread; each stage
+    # waits its interval before the next one
+    events = []
+    current_time = 0
+    for interval, value in stages:
+        t = int(current_time * 1e9)
+        events += [(t, message) for message in parameter_messages(parameter, value, channel)]
+        current_time += max(0, interval)
+    await sender.play(events)
+
+    total_time = attack_sec + decay_sec + release_sec
+    return _text(f"Sent {parameter} ADSR envelope: A={attack_sec}s D={decay_sec}s S={sustain_level} R={release_sec}s (total {total_time:.2f}s) on channel {channel+1}")
+
+async def _handle_play_pattern_with_parameter_automation(arguments: dict) -> list[TextContent]:
+    """Handle the play_pattern_with_parameter_automation tool"""
+    bars = arguments.get("bars", 4)
+    bpm = arguments.get("bpm", 120)
+    track_triggers = arguments.get("track_triggers", [])
+    parameter_automation = arguments["parameter_automation"]
+    send_clock = arguments.get("send_clock", True)
+    send_stop = arguments.get("send_stop", True)
+    channel = arguments.get("channel", 1) - 1
+    check_note_count(
+        len(track_triggers) + sum(len(events) for events in parameter_automation.values()),
+        "triggers and parameter changes"
+    )
+
+    # Validate all parameters
+    for param_name, events in parameter_automation.items():
+        param_info = get_parameter_info(param_name)
+        if not param_info:
+            return _text(f"Error: Unknown parameter '{param_name}'")
+        for beat, value in events:
+            is_valid, error_msg = validate_parameter(param_name, value)
+            if not is_valid:
+                return _text(f"Error: {error_msg}")
+
+    # Calculate timing
+    clock_interval = 60.0 / (bpm * 24)
+    total_pulses = int(bars * 96)
+
+    # Prepare track trigger schedule
+    trigger_schedule = []
+    for trigger in track_triggers:
+        beat = trigger[0]
+        track = trigger[1]
+        velocity = trigger[2] if len(trigger) > 2 else 100
+        pulse_index = int(beat * 24)
+        note = track - 1
+        trigger_schedule.append((pulse_index, note, velocity))
+    trigger_schedule.sort(key=lambda x: x[0])
+
+    # Prepare parameter automation schedules (one per parameter)
+    param_schedules = {}
+    for param_name, events in parameter_automation.items():
+        schedule = []
+        for beat, value in events:
+            pulse_index = int(beat * 24)
+            schedule.append((pulse_index, value))
+        schedule.sort(key=lambda x: x[0])
+        param_schedules[param_name] = schedule
+
+    # Clock (if requested), triggers and parameter automation all go to
+    # the sender thread up front; each event follows the clock pulse it
+    # lands on
+    events, pulse_time = clock_schedule(
+        clock_interval, total_pulses, send_stop,
+        start_pulse=0 if send_clock else None
+    )
+    for pulse, note, velocity in trigger_schedule:
+        if 0 <= pulse < total_pulses:
+            t = pulse_time(pulse)
+            events.append((t, channel_message(NOTE_ON, 0, note, velocity)))
+            events.append((t + TRIGGER_LENGTH_NS, channel_message(NOTE_OFF, 0, note, 0)))
+    for param_name, schedule in param_schedules.items():
+        for pulse, value in schedule:
+            if 0 <= pulse < total_pulses:
+                t = pulse_time(pulse)
+                events += [(t, message) for message in parameter_messages(param_name, value, channel)]
+    await sender.play(events, CLOCK_LEAD_NS)
+
+    # Stop is only sent along with the clock
+    if send_clock and send_stop:
+        status = "and stopped"
+    elif send_clock:
+        status = "(still running)"
+    else:
+        status = "(no transport control)"
+
+    total_events = sum(len(events) for events in parameter_automation.values())
+    param_list = ", ".join(parameter_automation.keys())
+    return _text(f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {total_events} parameter events ({param_list}) {status}")
+
+async def _handle_save_automation_preset(arguments: dict) -> list[TextContent]:
+    """Handle the save_automation_preset tool"""
+    preset_name = arguments["preset_name"]
+    automation = arguments["automation"]
+    description = arguments.get("description", "")
+
+    # Ensure preset name doesn't have .json extension
+    if preset_name.endswith('.json'):
+        preset_name = preset_name[:-5]
+
+    preset_file = PRESET_DIR / f"{preset_name}.json"
+
+    preset_data = {
+        "name": preset_name,
+        "description": description,
+        "automation": automation
+    }
+
+    with open(preset_file, 'w') as f:
+        json.dump(preset_data, f, indent=2)
+
+    return _text(f"Saved automation preset '{preset_name}' to {preset_file}")
+
+async def _handle_load_automation_preset(arguments: dict) -> list[TextContent]:
+    """Handle the load_automation_preset tool"""
+    preset_name = arguments["preset_name"]
+    play = arguments.get("play", False)
+
+    # Ensure preset name doesn't have .json extension
+    if preset_name.endswith('.json'):
+        preset_name = preset_name[:-5]
+
+    preset_file = PRESET_DIR / f"{preset_name}.json"
+
+    if not preset_file.exists():
+        return _text(f"Error: Preset '{preset_name}' not found at {preset_file}")
+
+    with open(preset_file, 'r') as f:
+        preset_data = json.load(f)
+
+    automation = preset_data.get("automation", {})
+
+    if play:
+        # Play the loaded preset
+        result_text = f"Loaded and playing preset '{preset_name}'\n"
+        result_text += f"Description: {preset_data.get('description', 'N/A')}\n"
+
+        # Call play_pattern_with_parameter_automation recursively
+        play_result = await call_tool("play_pattern_with_parameter_automation", automation)
+        result_text += play_result[0].text
+
+        return _text(result_text)
+    else:
+        return _text(f"Loaded preset '{preset_name}'\nDescription: {preset_data.get('description', 'N/A')}\nAutomation data: {json.dumps(automation, indent=2)}")
+
+async def _handle_list_automation_presets(arguments: dict) -> list[TextContent]:
+    """Handle the list_automation_presets tool"""
+    preset_files = list(PRESET_DIR.glob("*.json"))
+
+    if not preset_files:
+        return _text(f"No presets found in {PRESET_DIR}")
+
+    result = f"Available automation presets ({len(preset_files)}):\n\n"
+
+    for preset_file in sorted(preset_files):
+        try:
+            with open(preset_file, 'r') as f:
+                preset_data = json.load(f)
+            name = preset_data.get("name", preset_file.stem)
+            description = preset_data.get("description", "No description")
+            result += f"- {name}: {description}\n"
+        except Exception as e:
+            result += f"- {preset_file.stem}: (Error loading: {e})\n"
+
+    result += f"\nPresets stored in: {PRESET_DIR}"
+
+    return _text(result)
+
+# Pattern save/load handlers
+async def _handle_save_pattern(arguments: dict) -> list[TextContent]:
+    """Handle the save_pattern tool"""
+    pattern_name = arguments["pattern_name"]
+    bpm = arguments["bpm"]
+    bars = arguments["bars"]
+    track_triggers = arguments["track_triggers"]
+    midi_channels = arguments["midi_channels"]
+    parameter_automation = arguments.get("parameter_automation", {})
+    automation_loop_bars = arguments.get("automation_loop_bars", 0)
+    description = arguments.get("description", "")
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    pattern_data = {
+        "name": pattern_name,
+        "description": description,
+        "bpm": bpm,
+        "bars": bars,
+        "track_triggers": track_triggers,
+        "midi_channels": midi_channels,
+        "parameter_automation": parameter_automation,
+        "automation_loop_bars": automation_loop_bars
+    }
+
+    with open(pattern_file, 'w') as f:
+        json.dump(pattern_data, f, indent=2)
+
+    return _text(f"Saved pattern '{pattern_name}' to {pattern_file}\n" +
+                 f"  BPM: {bpm}, Bars: {bars}\n" +
+                 f"  Track triggers: {len(track_triggers)}\n" +
+                 f"  MIDI channels: {list(midi_channels.keys())}")
+
+async def _handle_load_pattern(arguments: dict) -> list[TextContent]:
+    """Handle the load_pattern tool"""
+    global last_multi_channel_pattern
+    pattern_name = arguments["pattern_name"]
+    play = arguments.get("play", False)
+    repeat = arguments.get("repeat", 1)
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    if not pattern_file.exists():
+        return _text(f"Error: Pattern '{pattern_name}' not found at {pattern_file}")
+
+    with open(pattern_file, 'r') as f:
+        pattern_data = json.load(f)
+
+    if play:
+        # Play the pattern using play_pattern_with_multi_channel_midi logic
+        bpm = pattern_data.get("bpm", 120)
+        bars = pattern_data.get("bars", 4) * repeat
+        track_triggers = pattern_data.get("track_triggers", [])
+        midi_channels = pattern_data.get("midi_channels", {})
+        parameter_automation = pattern_data.get("parameter_automation", {})
+        automation_loop_bars = pattern_data.get("automation_loop_bars", 0)
+
+        # If repeating, duplicate the triggers and notes
+        if repeat > 1:
+            original_bars = pattern_data.get("bars", 4)
+            beats_per_bar = 4
+            expanded_triggers = list(track_triggers)
+            expanded_channels = {k: list(v) for k, v in midi_channels.items()}
+
+            for rep in range(1, repeat):
+                offset = rep * original_bars * beats_per_bar
+                # Duplicate track triggers
+                for trigger in track_triggers:
+                    new_trigger = list(trigger)
+                    new_trigger[0] = trigger[0] + offset
+                    expanded_triggers.append(new_trigger)
+                # Duplicate MIDI channel notes
+                for ch, notes in midi_channels.items():
+                    for note in notes:
+                        new_note = list(note)
+                        new_note[0] = note[0] + offset
+                        expanded_channels[ch].append(new_note)
+
+            track_triggers = expanded_triggers
+            midi_channels = expanded_channels
+
+        # Store as last pattern for potential MIDI export
+        last_multi_channel_pattern = {
+            "bpm": bpm,
+            "bars": bars,
+            "track_triggers": track_triggers,
+            "midi_channels": midi_channels
+        }
+
+        # Build play arguments and call the play handler
+        play_args = {
+            "bpm": bpm,
+            "bars": bars,
+            "track_triggers": track_triggers,
+            "midi_channels": midi_channels,
+            "parameter_automation": parameter_automation,
+            "automation_loop_bars": automation_loop_bars,
+            "send_clock": True,
+            "send_stop": True
+        }
+
+        # Call play_pattern_with_multi_channel_midi handler directly
+        result = await call_tool("play_pattern_with_multi_channel_midi", play_args)
+        return _text(f"Loaded and played pattern '{pattern_name}' ({repeat}x)\n" +
+                     f"Description: {pattern_data.get('description', 'N/A')}\n" +
+                     result[0].text)
+    else:
+        # Just return the pattern data
+        return _text(f"Loaded pattern '{pattern_name}':\n" +
+                     f"  Description: {pattern_data.get('description', 'N/A')}\n" +
+                     f"  BPM: {pattern_data.get('bpm')}, Bars: {pattern_data.get('bars')}\n" +
+                     f"  Track triggers: {len(pattern_data.get('track_triggers', []))}\n" +
+                     f"  MIDI channels: {list(pattern_data.get('midi_channels', {}).keys())}\n\n" +
+                     f"Pattern data:\n{json.dumps(pattern_data, indent=2)}")
+
+async def _handle_list_patterns(arguments: dict) -> list[TextContent]:
+    """Handle the list_patterns tool"""
+    pattern_files = list(PATTERN_DIR.glob("*.json"))
+
+    if not pattern_files:
+        return _text(f"No patterns found in {PATTERN_DIR}")
+
+    result = f"Available patterns ({len(pattern_files)}):\n\n"
+
+    for pattern_file in sorted(pattern_files):
+        try:
+            with open(pattern_file, 'r') as f:
+                pattern_data = json.load(f)
+            pname = pattern_data.get("name", pattern_file.stem)
+            desc = pattern_data.get("description", "No description")
+            bpm = pattern_data.get("bpm", "?")
+            bars = pattern_data.get("bars", "?")
+            num_triggers = len(pattern_data.get("track_triggers", []))
+            channels = list(pattern_data.get("midi_channels", {}).keys())
+            result += f"- {pname}: {desc}\n"
+            result += f"    BPM: {bpm}, Bars: {bars}, Triggers: {num_triggers}, Channels: {channels}\n"
+        except Exception as e:
+            result += f"- {pattern_file.stem}: (Error loading: {e})\n"
+
+    result += f"\nPatterns stored in: {PATTERN_DIR}"
+    return _text(result)
+
+async def _handle_delete_pattern(arguments: dict) -> list[TextContent]:
+    """Handle the delete_pattern tool"""
+    pattern_name = arguments["pattern_name"]
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    if not pattern_file.exists():
+        return _text(f"Error: Pattern '{pattern_name}' not found at {pattern_file}")
+
+    pattern_file.unlink()
+    return _text(f"Deleted pattern '{pattern_name}'")
+
+async def _handle_update_pattern(arguments: dict) -> list[TextContent]:
+    """Handle the update_pattern tool"""
+    pattern_name = arguments["pattern_name"]
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    if not pattern_file.exists():
+        return _text(f"Error: Pattern '{pattern_name}' not found at {pattern_file}")
+
+    # Load existing pattern
+    with open(pattern_file, 'r') as f:
+        pattern_data = json.load(f)
+
+    # Update only provided fields
+    updated_fields = []
+    for field in ["bpm", "bars", "track_triggers", "midi_channels",
+                  "parameter_automation", "automation_loop_bars", "description"]:
+        if field in arguments:
+            pattern_data[field] = arguments[field]
+            updated_fields.append(field)
+
+    # Save back
+    with open(pattern_file, 'w') as f:
+        json.dump(pattern_data, f, indent=2)
+
+    return _text(f"Updated pattern '{pattern_name}':\n  Modified fields: {', '.join(updated_fields)}")
+
+async def _handle_edit_pattern_chords(arguments: dict) -> list[TextContent]:
+    """Handle the edit_pattern_chords tool"""
+    pattern_name = arguments["pattern_name"]
+    bar = arguments["bar"]
+    chord_notes = arguments["chord_notes"]
+    channels = arguments.get("channels", [9, 10, 11, 12])
+    velocity = arguments.get("velocity", 75)
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    if not pattern_file.exists():
+        return _text(f"Error: Pattern '{pattern_name}' not found at {pattern_file}")
+
+    # Load existing pattern
+    with open(pattern_file, 'r') as f:
+        pattern_data = json.load(f)
+
+    midi_channels = pattern_data.get("midi_channels", {})
+    total_bars = pattern_data.get("bars", 4)
+    beat_position = bar * 4  # Convert bar to beat (4 beats per bar)
+
+    # Find the next chord change position (for duration calculation)
+    # Look for notes in the same channels that start after this position
+    next_chord_beat = total_bars * 4  # Default to end of pattern
+    for ch_str in [str(ch) for ch in channels]:
+        if ch_str in midi_channels:
+            for note_data in midi_channels[ch_str]:
+                note_beat = note_data[0]
+                if note_beat > beat_position:
+                    next_chord_beat = min(next_chord_beat, note_beat)
+
+    duration = next_chord_beat - beat_position - 0.1  # Slightly less than full duration
+    if duration < 0.1:
+        duration = 0.1
+
+    # Remove existing notes at this beat position for these channels
+    for ch in channels:
+        ch_str = str(ch)
+        if ch_str in midi_channels:
+            midi_channels[ch_str] = [
+                n for n in midi_channels[ch_str]
+                if abs(n[0] - beat_position) > 0.01  # Keep notes not at this position
+            ]
+        else:
+            midi_channels[ch_str] = []
+
+    # Add new chord notes - distribute across channels
+    for i, note in enumerate(chord_notes):
+        if i < len(channels):
+            ch_str = str(channels[i])
+            # Small offset for slight strum effect
+            offset = i * 0.01
+            midi_channels[ch_str].append([beat_position + offset, note, velocity, duration])
+
+    # Sort notes in each channel by beat
+    for ch_str in midi_channels:
+        midi_channels[ch_str].sort(key=lambda x: x[0])
+
+    pattern_data["midi_channels"] = midi_channels
+
+    # Save back
+    with open(pattern_file, 'w') as f:
+        json.dump(pattern_data, f, indent=2)
+
+    return _text(f"Updated chord at bar {bar} in pattern '{pattern_name}':\n" +
+                 f"  Notes: {chord_notes}\n" +
+                 f"  Channels: {channels}\n" +
+                 f"  Duration: {duration:.2f} beats")
+
+async def _handle_edit_pattern_triggers(arguments: dict) -> list[TextContent]:
+    """Handle the edit_pattern_triggers tool"""
+    pattern_name = arguments["pattern_name"]
+    track = arguments["track"]
+    beats = arguments["beats"]
+    velocity = arguments.get("velocity", 100)
+    note = arguments.get("note")  # Optional chromatic note
+    mode = arguments.get("mode", "add")
+
+    # Ensure pattern name doesn't have extension
+    if pattern_name.endswith('.json'):
+        pattern_name = pattern_name[:-5]
+
+    pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+
+    if not pattern_file.exists():
+        return _text(f"Error: Pattern '{pattern_name}' not found at {pattern_file}")
+
+    # Load existing pattern
+    with open(pattern_file, 'r') as f:
+        pattern_data = json.load(f)
+
+    track_triggers = pattern_data.get("track_triggers", [])
+
+    if mode == "replace":
+        # Remove all triggers for this track
+        track_triggers = [t for t in track_triggers if t[1] != track]
+        # Add new triggers
+        for beat in beats:
+            if note is not None:
+                track_triggers.append([beat, track, velocity, note])
             else:
-                status = "(no transport control)"
-
-            total_events = sum(len(events) for events in parameter_automation.values())
-            param_list = ", ".join(parameter_automation.keys())
-            return [TextContent(
-                type="text",
-                text=f"Played {bars} bars at {bpm} BPM with {len(track_triggers)} track triggers and {total_events} parameter events ({param_list}) {status}"
-            )]
-
-        elif name == "save_automation_preset":
-            preset_name = arguments["preset_name"]
-            automation = arguments["automation"]
-            description = arguments.get("description", "")
-
-            # Ensure preset name doesn't have .json extension
-            if preset_name.endswith('.json'):
-                preset_name = preset_name[:-5]
-
-            preset_file = PRESET_DIR / f"{preset_name}.json"
-
-            preset_data = {
-                "name": preset_name,
-                "description": description,
-                "automation": automation
-            }
+                track_triggers.append([beat, track, velocity])
+        action = f"Replaced track {track} triggers"
+
+    elif mode == "remove":
+        # Remove triggers at specified beats for this track
+        beats_set = set(beats)
+        original_count = len([t for t in track_triggers if t[1] == track])
+        track_triggers = [
+            t for t in track_triggers
+            if not (t[1] == track and t[0] in beats_set)
+        ]
+        removed_count = original_count - len([t for t in track_triggers if t[1] == track])
+        action = f"Removed {removed_count} triggers from track {track}"
+
+    else:  # mode == "add"
+        # Add new triggers (avoiding duplicates)
+        existing_beats = set(t[0] for t in track_triggers if t[1] == track)
+        added = 0
+        for beat in beats:
+            if beat not in existing_beats:
+                if note is not None:
+                    track_triggers.append([beat, track, velocity, note])
+                else:
+                    track_triggers.append([beat, track, velocity])
+                added += 1
+        action = f"Added {added} triggers to track {track}"
+
+    # Sort by beat
+    track_triggers.sort(key=lambda x: x[0])
+    pattern_data["track_triggers"] = track_triggers
+
+    # Save back
+    with open(pattern_file, 'w') as f:
+        json.dump(pattern_data, f, indent=2)
+
+    track_count = len([t for t in track_triggers if t[1] == track])
+    return _text(f"{action} in pattern '{pattern_name}'\n" +
+                 f"  Track {track} now has {track_count} triggers")
+
+async def _handle_export_automation_to_midi(arguments: dict) -> list[TextContent]:
+    """Handle the export_automation_to_midi tool"""
+    filename = arguments["filename"]
+    automation = arguments["automation"]
+    channel = arguments.get("channel", 1) - 1
+
+    # Ensure filename has .mid extension
+    if not filename.endswith('.mid'):
+        filename += '.mid'
+
+    # Save to appropriate output directory
+    # Always try /mnt/user-data/outputs/ first (Claude Desktop)
+    # Fall back to ~/Downloads/ if /mnt/user-data doesn't exist (local testing)
+    if os.path.exists("/mnt/user-data"):
+        output_dir = "/mnt/user-data/outputs"
+    else:
+        output_dir = os.path.expanduser("~/Downloads")
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, filename)
+
+    parameter_automation = automation.get("parameter_automation", {})
+    bars = automation.get("bars", 4)
+    bpm = automation.get("bpm", 120)
+
+    # Create MIDI file
+    mid = mido.MidiFile()
+    track = mido.MidiTrack()
+    mid.tracks.append(track)
+
+    # Set tempo
+    tempo = mido.bpm2tempo(bpm)
+    track.append(mido.MetaMessage('set_tempo', tempo=tempo))
+
+    # Convert parameter automation to MIDI messages
+    # Collect all events with their timing
+    events = []
+
+    for param_name, param_events in parameter_automation.items():
+        param_info = get_parameter_info(param_name)
+        if not param_info:
+            continue
+
+        for beat, value in param_events:
+            # Convert beat to ticks (480 ticks per beat is standard)
+            ticks = int(beat * 480)
+
+            if param_info.type == "cc":
+                events.append((ticks, 'cc', param_info.cc, value))
+            elif param_info.type == "nrpn":
+                events.append((ticks, 'nrpn', param_info.msb, param_info.lsb, value))
+
+    # Sort events by time
+    events.sort(key=lambda x: x[0])
+
+    # Add events to track with delta times
+    last_ticks = 0
+    for event in events:
+        if event[1] == 'cc':
+            ticks, _, cc, value = event
+            delta = ticks - last_ticks
+            track.append(mido.Message('control_change', control=cc, value=value, channel=channel, time=delta))
+            last_ticks = ticks
+        elif event[1] == 'nrpn':
+            ticks, _, msb, lsb, value = event
+            delta = ticks - last_ticks
+            # NRPN requires 4 CC messages
+            track.append(mido.Message('control_change', control=99, value=msb, channel=channel, time=delta))
+            track.append(mido.Message('control_change', control=98, value=lsb, channel=channel, time=0))
+            track.append(mido.Message('control_change', control=6, value=value, channel=channel, time=0))
+            track.append(mido.Message('control_change', control=38, value=0, channel=channel, time=0))
+            last_ticks = ticks
+
+    # Save MIDI file
+    mid.save(output_path)
+
+    return _text(f"Exported automation to MIDI file: {output_path}\nBars: {bars}, BPM: {bpm}, Parameters: {', '.join(parameter_automation.keys())}")
+
+async def _handle_save_last_pattern(arguments: dict) -> list[TextContent]:
+    """Handle the save_last_pattern tool"""
+    filename = arguments.get("filename")
+
+    if not last_multi_channel_pattern:
+        return _text("Error: No pattern to save. Use play_pattern_with_multi_channel_midi first.")
+
+    # Add .mid extension if needed
+    if not filename.endswith('.mid'):
+        filename += '.mid'
+
+    # Save to appropriate output directory
+    # Always try /mnt/user-data/outputs/ first (Claude Desktop)
+    # Fall back to ~/Downloads/ if /mnt/user-data doesn't exist (local testing)
+    if os.path.exists("/mnt/user-data"):
+        output_dir = "/mnt/user-data/outputs"
+    else:
+        output_dir = os.path.expanduser("~/Downloads")
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, filename)
 
-            with open(preset_file, 'w') as f:
-                json.dump(preset_data, f, indent=2)
+    try:
+        pattern = last_multi_channel_pattern
+        bpm = pattern['bpm']
+        bars = pattern['bars']
+        track_triggers = pattern['track_triggers']
+        midi_channels = pattern['midi_channels']
+        ticks_per_beat = 480
+
+        def beats_to_ticks(beat):
+            return int(beat * ticks_per_beat)
+
+        # Create MIDI file
+        mid = mido.MidiFile(ticks_per_beat=ticks_per_beat)
+
+        # Tempo track
+        tempo_track = mido.MidiTrack()
+        mid.tracks.append(tempo_track)
+        tempo = mido.bpm2tempo(bpm)
+        tempo_track.append(mido.MetaMessage('set_tempo', tempo=tempo, time=0))
+        tempo_track.append(mido.MetaMessage('end_of_track', time=0))
+
+        # Organize events by channel
+        track_events = {}  # channel -> list of events
+
+        # Process track triggers (Digitakt tracks 1-16)
+        for trigger in track_triggers:
+            if len(trigger) >= 3:
+                beat = trigger[0]
+                track = trigger[1]
+                velocity = trigger[2]
 
-            return [TextContent(
-                type="text",
-                text=f"Saved automation preset '{preset_name}' to {preset_file}"
-            )]
+                # Check if chromatic (4th parameter is note)
+                if len(trigger) == 4:
+                    note = trigger[3]  # Use provided note for chromatic
+                else:
+                    note = track - 1  # Track triggers: Track 1 = note 0, etc.
+
+                # Use track number as channel (Track 1 → Ch 0, Track 2 → Ch 1, etc)
+                channel = track - 1
+                duration = 0.1  # 100ms duration for triggers
+
+                if channel not in track_events:
+                    track_events[channel] = []
+
+                track_events[channel].append({
+                    'type': 'note_on',
+                    'beat': beat,
+                    'note': note,
+                    'velocity': velocity,
+                    'channel': channel
+                })
+                track_events[channel].append({
+                    'type': 'note_off',
+                    'beat': beat + duration,
+                    'note': note,
+                    'velocity': 0,
+                    'channel': channel
+                })
+
+        # Process MIDI channel notes (external synths)
+        for channel_str, notes in midi_channels.items():
+            channel = int(channel_str) - 1  # Convert to 0-based
+
+            if channel not in track_events:
+                track_events[channel] = []
 
-        elif name == "load_automation_preset":
-            preset_name = arguments["preset_name"]
-            play = arguments.get("play", False)
+            for note_data in notes:
+                if len(note_data) >= 4:
+                    beat, note, velocity, duration = note_data[:4]
+                elif len(note_data) == 3:
+                    beat, note, velocity = note_data
+                    duration = 0.5
+                else:
+                    continue
 
-            # Ensure preset name doesn't have .json extension
-            if preset_name.endswith('.json'):
-                preset_name = preset_name[:-5]
+                track_events[channel].append({
+                    'type': 'note_on',
+                    'beat': beat,
+                    'note': note,
+                    'velocity': velocity,
+                    'channel': channel
+                })
+                track_events[channel].append({
+                    'type': 'note_off',
+                    'beat': beat + duration,
+                    'note': note,
+                    'velocity': 0,
+                    'channel': channel
+                })
+
+        # Process parameter automation
+        parameter_automation = pattern.get('parameter_automation', {})
+        if parameter_automation:
+            # Detect format: global vs per-track
+            first_key = next(iter(parameter_automation.keys()))
+            # Try to convert to int - if it works, it's per-track format
+            try:
+                int(first_key)
+                is_per_track = True
+            except (ValueError, TypeError):
+                is_per_track = False
 
-            preset_file = PRESET_DIR / f"{preset_name}.json"
+            if is_per_track:
+                # Per-track format: {track_num: {'param': [[beat, val], ...]}}
+                for track_key, track_params in parameter_automation.items():
+                    track_num = int(track_key)  # Convert string key to int
+                    # Use track-specific channel (Track 1 = Channel 0, etc.)
+                    param_channel = track_num - 1
+                    if param_channel not in track_events:
+                        track_events[param_channel] = []
 
-            if not preset_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Preset '{preset_name}' not found at {preset_file}"
-                )]
+                    for param_name, param_events in track_params.items():
+                        param_info = get_parameter_info(param_name)
+                        if not param_info:
+                            continue
 
-            with open(preset_file, 'r') as f:
-                preset_data = json.load(f)
+                        for beat, value in param_events:
+                            if param_info.type == "cc":
+                                track_events[param_channel].append({
+                                    'type': 'cc',
+                                    'beat': beat,
+                                    'cc': param_info.cc,
+                                    'value': value,
+                                    'channel': param_channel
+                                })
+                            elif param_info.type == "nrpn":
+                                track_events[param_channel].append({
+                                    'type': 'nrpn',
+                                    'beat': beat,
+                                    'msb': param_info.msb,
+                                    'lsb': param_info.lsb,
+                                    'value': value,
+                                    'channel': param_channel
+                                })
+            else:
+                # Global format: {'param': [[beat, val], ...]}
+                # Use channel 0 for parameter automation
+                param_channel = 0
+                if param_channel not in track_events:
+                    track_events[param_channel] = []
 
-            automation = preset_data.get("automation", {})
+                for param_name, param_events in parameter_automation.items():
+                    param_info = get_parameter_info(param_name)
+                    if not param_info:
+                        continue
 
-            if play:
-                # Play the loaded preset
-                result_text = f"Loaded and playing preset '{preset_name}'\n"
-                result_text += f"Description: {preset_data.get('description', 'N/A')}\n"
+                    for beat, value in param_events:
+                        if param_info.type == "cc":
+                            track_events[param_channel].append({
+                                'type': 'cc',
+                                'beat': beat,
+                                'cc': param_info.cc,
+                                'value': value,
+                                'channel': param_channel
+                            })
+                        elif param_info.type == "nrpn":
+                            track_events[param_channel].append({
+                                'type': 'nrpn',
+                                'beat': beat,
+                                'msb': param_info.msb,
+                                'lsb': param_info.lsb,
+                                'value': value,
+                                'channel': param_channel
+                            })
+
+        # Create MIDI tracks for each channel
+        track_names = {
+            0: 'Track 1 (Kick)',
+            1: 'Track 2 (Snare)',
+            2: 'Track 3 (Hats)',
+            8: 'Track 9',
+            11: 'Track 12',
+            12: 'Track 13'
+        }
 
-                # Call play_pattern_with_parameter_automation recursively
-                play_result = await call_tool("play_pattern_with_parameter_automation", automation)
-                result_text += play_result[0].text
+        total_notes = 0
+        for channel in sorted(track_events.keys()):
+            track = mido.MidiTrack()
+            mid.tracks.append(track)
 
-                return [TextContent(type="text", text=result_text)]
-            else:
-                return [TextContent(
-                    type="text",
-                    text=f"Loaded preset '{preset_name}'\nDescription: {preset_data.get('description', 'N/A')}\nAutomation data: {json.dumps(automation, indent=2)}"
-                )]
+            # Add track name
+            track_name = track_names.get(channel, f'Channel {channel + 1}')
+            track.append(mido.MetaMessage('track_name', name=track_name, time=0))
 
-        elif name == "list_automation_presets":
-            preset_files = list(PRESET_DIR.glob("*.json"))
+            # Sort events by beat
+            events = sorted(track_events[channel], key=lambda x: x['beat'])
 
-            if not preset_files:
-                return [TextContent(
-                    type="text",
-                    text=f"No presets found in {PRESET_DIR}"
-                )]
+            # Write events with delta times
+            current_tick = 0
+            for event in events:
+                event_tick = beats_to_ticks(event['beat'])
+                delta = event_tick - current_tick
+
+                if event['type'] == 'note_on':
+                    track.append(mido.Message('note_on',
+                                            note=event['note'],
+                                            velocity=event['velocity'],
+                                            time=delta,
+                                            channel=event['channel']))
+                    total_notes += 1
+                elif event['type'] == 'note_off':
+                    track.append(mido.Message('note_off',
+                                            note=event['note'],
+                                            velocity=0,
+                                            time=delta,
+                                            channel=event['channel']))
+                elif event['type'] == 'cc':
+                    track.append(mido.Message('control_change',
+                                            control=event['cc'],
+                                            value=event['value'],
+                                            time=delta,
+                                            channel=event['channel']))
+                elif event['type'] == 'nrpn':
+                    # NRPN requires 4 CC messages
+                    track.append(mido.Message('control_change', control=99, value=event['msb'], time=delta, channel=event['channel']))
+                    track.append(mido.Message('control_change', control=98, value=event['lsb'], time=0, channel=event['channel']))
+                    track.append(mido.Message('control_change', control=6, value=event['value'], time=0, channel=event['channel']))
+                    track.append(mido.Message('control_change', control=38, value=0, time=0, channel=event['channel']))
 
-            result = f"Available automation presets ({len(preset_files)}):\n\n"
+                current_tick = event_tick
 
-            for preset_file in sorted(preset_files):
-                try:
-                    with open(preset_file, 'r') as f:
-                        preset_data = json.load(f)
-                    name = preset_data.get("name", preset_file.stem)
-                    description = preset_data.get("description", "No description")
-                    result += f"- {name}: {description}\n"
-                except Exception as e:
-                    result += f"- {preset_file.stem}: (Error loading: {e})\n"
-
-            result += f"\nPresets stored in: {PRESET_DIR}"
-
-            return [TextContent(type="text", text=result)]
-
-        # Pattern save/load handlers
-        elif name == "save_pattern":
-            pattern_name = arguments["pattern_name"]
-            bpm = arguments["bpm"]
-            bars = arguments["bars"]
-            track_triggers = arguments["track_triggers"]
-            midi_channels = arguments["midi_channels"]
-            parameter_automation = arguments.get("parameter_automation", {})
-            automation_loop_bars = arguments.get("automation_loop_bars", 0)
-            description = arguments.get("description", "")
-
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
-
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
-
-            pattern_data = {
-                "name": pattern_name,
-                "description": description,
-                "bpm": bpm,
-                "bars": bars,
-                "track_triggers": track_triggers,
-                "midi_channels": midi_channels,
-                "parameter_automation": parameter_automation,
-                "automation_loop_bars": automation_loop_bars
-            }
+            # End track
+            track.append(mido.MetaMessage('end_of_track', time=0))
 
-            with open(pattern_file, 'w') as f:
-                json.dump(pattern_data, f, indent=2)
+        # Save file
+        mid.save(filepath)
 
-            return [TextContent(
-                type="text",
-                text=f"Saved pattern '{pattern_name}' to {pattern_file}\n" +
-                     f"  BPM: {bpm}, Bars: {bars}\n" +
-                     f"  Track triggers: {len(track_triggers)}\n" +
-                     f"  MIDI channels: {list(midi_channels.keys())}"
-            )]
+        param_count = sum(len(events) for events in parameter_automation.values()) if parameter_automation else 0
+        param_info = f", {param_count} parameter automation events" if param_count > 0 else ""
+        return _text(f"Saved pattern to {filepath}\n{bars} bars at {bpm} BPM\n{len(track_events)} tracks, {total_notes} notes{param_info}")
 
-        elif name == "load_pattern":
-            pattern_name = arguments["pattern_name"]
-            play = arguments.get("play", False)
-            repeat = arguments.get("repeat", 1)
+    except Exception as e:
+        return _text(f"Error saving pattern: {str(e)}")
 
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
+async def _handle_export_pattern_to_midi(arguments: dict) -> list[TextContent]:
+    """Handle the export_pattern_to_midi tool"""
+    filename = arguments.get("filename")
+    bpm = arguments.get("bpm", 120)
+    bars = arguments.get("bars", 4)
+    track_triggers = arguments.get("track_triggers", [])
+    melody_notes = arguments.get("melody_notes", [])
+    melody_channel = arguments.get("melody_channel", 1)
 
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
+    try:
+        if not filename.endswith('.mid'):
+            filename += '.mid'
 
-            if not pattern_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Pattern '{pattern_name}' not found at {pattern_file}"
-                )]
+        # Create MIDI file
+        mid = mido.MidiFile()
 
-            with open(pattern_file, 'r') as f:
-                pattern_data = json.load(f)
+        # Tempo track
+        tempo_track = mido.MidiTrack()
+        mid.tracks.append(tempo_track)
+        tempo_track.append(mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(bpm)))
+        tempo_track.append(mido.MetaMessage('time_signature', numerator=4, denominator=4))
 
-            if play:
-                # Play the pattern using play_pattern_with_multi_channel_midi logic
-                bpm = pattern_data.get("bpm", 120)
-                bars = pattern_data.get("bars", 4) * repeat
-                track_triggers = pattern_data.get("track_triggers", [])
-                midi_channels = pattern_data.get("midi_channels", {})
-                parameter_automation = pattern_data.get("parameter_automation", {})
-                automation_loop_bars = pattern_data.get("automation_loop_bars", 0)
-
-                # If repeating, duplicate the triggers and notes
-                if repeat > 1:
-                    original_bars = pattern_data.get("bars", 4)
-                    beats_per_bar = 4
-                    expanded_triggers = list(track_triggers)
-                    expanded_channels = {k: list(v) for k, v in midi_channels.items()}
-
-                    for rep in range(1, repeat):
-                        offset = rep * original_bars * beats_per_bar
-                        # Duplicate track triggers
-                        for trigger in track_triggers:
-                            new_trigger = list(trigger)
-                            new_trigger[0] = trigger[0] + offset
-                            expanded_triggers.append(new_trigger)
-                        # Duplicate MIDI channel notes
-                        for ch, notes in midi_channels.items():
-                            for note in notes:
-                                new_note = list(note)
-                                new_note[0] = note[0] + offset
-                                expanded_channels[ch].append(new_note)
-
-                    track_triggers = expanded_triggers
-                    midi_channels = expanded_channels
-
-                # Store as last pattern for potential MIDI export
-                # (uses global declared earlier in call_tool)
-                last_multi_channel_pattern = {
-                    "bpm": bpm,
-                    "bars": bars,
-                    "track_triggers": track_triggers,
-                    "midi_channels": midi_channels
-                }
+        # Convert beat duration to ticks (480 ticks per beat is standard)
+        ticks_per_beat = mid.ticks_per_beat
 
-                # Build play arguments and call the play handler
-                play_args = {
-                    "bpm": bpm,
-                    "bars": bars,
-                    "track_triggers": track_triggers,
-                    "midi_channels": midi_channels,
-                    "parameter_automation": parameter_automation,
-                    "automation_loop_bars": automation_loop_bars,
-                    "send_clock": True,
-                    "send_stop": True
-                }
+        # Track 1: Drum triggers (on channel 1)
+        if track_triggers:
+            drum_track = mido.MidiTrack()
+            mid.tracks.append(drum_track)
+            drum_track.append(mido.MetaMessage('track_name', name='Digitakt Drums'))
 
-                # Call play_pattern_with_multi_channel_midi handler directly
-                result = await call_tool("play_pattern_with_multi_channel_midi", play_args)
-                return [TextContent(
-                    type="text",
-                    text=f"Loaded and played pattern '{pattern_name}' ({repeat}x)\n" +
-                         f"Description: {pattern_data.get('description', 'N/A')}\n" +
-                         result[0].text
-                )]
-            else:
-                # Just return the pattern data
-                return [TextContent(
-                    type="text",
-                    text=f"Loaded pattern '{pattern_name}':\n" +
-                         f"  Description: {pattern_data.get('description', 'N/A')}\n" +
-                         f"  BPM: {pattern_data.get('bpm')}, Bars: {pattern_data.get('bars')}\n" +
-                         f"  Track triggers: {len(pattern_data.get('track_triggers', []))}\n" +
-                         f"  MIDI channels: {list(pattern_data.get('midi_channels', {}).keys())}\n\n" +
-                         f"Pattern data:\n{json.dumps(pattern_data, indent=2)}"
-                )]
-
-        elif name == "list_patterns":
-            pattern_files = list(PATTERN_DIR.glob("*.json"))
-
-            if not pattern_files:
-                return [TextContent(
-                    type="text",
-                    text=f"No patterns found in {PATTERN_DIR}"
-                )]
-
-            result = f"Available patterns ({len(pattern_files)}):\n\n"
-
-            for pattern_file in sorted(pattern_files):
-                try:
-                    with open(pattern_file, 'r') as f:
-                        pattern_data = json.load(f)
-                    pname = pattern_data.get("name", pattern_file.stem)
-                    desc = pattern_data.get("description", "No description")
-                    bpm = pattern_data.get("bpm", "?")
-                    bars = pattern_data.get("bars", "?")
-                    num_triggers = len(pattern_data.get("track_triggers", []))
-                    channels = list(pattern_data.get("midi_channels", {}).keys())
-                    result += f"- {pname}: {desc}\n"
-                    result += f"    BPM: {bpm}, Bars: {bars}, Triggers: {num_triggers}, Channels: {channels}\n"
-                except Exception as e:
-                    result += f"- {pattern_file.stem}: (Error loading: {e})\n"
-
-            result += f"\nPatterns stored in: {PATTERN_DIR}"
-            return [TextContent(type="text", text=result)]
-
-        elif name == "delete_pattern":
-            pattern_name = arguments["pattern_name"]
-
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
-
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
-
-            if not pattern_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Pattern '{pattern_name}' not found at {pattern_file}"
-                )]
-
-            pattern_file.unlink()
-            return [TextContent(
-                type="text",
-                text=f"Deleted pattern '{pattern_name}'"
-            )]
-
-        elif name == "update_pattern":
-            pattern_name = arguments["pattern_name"]
-
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
-
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
-
-            if not pattern_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Pattern '{pattern_name}' not found at {pattern_file}"
-                )]
-
-            # Load existing pattern
-            with open(pattern_file, 'r') as f:
-                pattern_data = json.load(f)
+            # Sort by beat time
+            sorted_triggers = sorted(track_triggers, key=lambda x: x[0])
 
-            # Update only provided fields
-            updated_fields = []
-            for field in ["bpm", "bars", "track_triggers", "midi_channels",
-                          "parameter_automation", "automation_loop_bars", "description"]:
-                if field in arguments:
-                    pattern_data[field] = arguments[field]
-                    updated_fields.append(field)
-
-            # Save back
-            with open(pattern_file, 'w') as f:
-                json.dump(pattern_data, f, indent=2)
-
-            return [TextContent(
-                type="text",
-                text=f"Updated pattern '{pattern_name}':\n  Modified fields: {', '.join(updated_fields)}"
-            )]
-
-        elif name == "edit_pattern_chords":
-            pattern_name = arguments["pattern_name"]
-            bar = arguments["bar"]
-            chord_notes = arguments["chord_notes"]
-            channels = arguments.get("channels", [9, 10, 11, 12])
-            velocity = arguments.get("velocity", 75)
-
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
-
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
-
-            if not pattern_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Pattern '{pattern_name}' not found at {pattern_file}"
-                )]
-
-            # Load existing pattern
-            with open(pattern_file, 'r') as f:
-                pattern_data = json.load(f)
+            current_tick = 0
+            for trigger in sorted_triggers:
+                beat = trigger[0]
+                track_num = trigger[1]
+                velocity = trigger[2]
 
-            midi_channels = pattern_data.get("midi_channels", {})
-            total_bars = pattern_data.get("bars", 4)
-            beat_position = bar * 4  # Convert bar to beat (4 beats per bar)
-
-            # Find the next chord change position (for duration calculation)
-            # Look for notes in the same channels that start after this position
-            next_chord_beat = total_bars * 4  # Default to end of pattern
-            for ch_str in [str(ch) for ch in channels]:
-                if ch_str in midi_channels:
-                    for note_data in midi_channels[ch_str]:
-                        note_beat = note_data[0]
-                        if note_beat > beat_position:
-                            next_chord_beat = min(next_chord_beat, note_beat)
-
-            duration = next_chord_beat - beat_position - 0.1  # Slightly less than full duration
-            if duration < 0.1:
-                duration = 0.1
-
-            # Remove existing notes at this beat position for these channels
-            for ch in channels:
-                ch_str = str(ch)
-                if ch_str in midi_channels:
-                    midi_channels[ch_str] = [
-                        n for n in midi_channels[ch_str]
-                        if abs(n[0] - beat_position) > 0.01  # Keep notes not at this position
-                    ]
+                # Check if chromatic (4th parameter is note)
+                if len(trigger) == 4:
+                    note = trigger[3]  # Use provided note for chromatic
                 else:
-                    midi_channels[ch_str] = []
-
-            # Add new chord notes - distribute across channels
-            for i, note in enumerate(chord_notes):
-                if i < len(channels):
-                    ch_str = str(channels[i])
-                    # Small offset for slight strum effect
-                    offset = i * 0.01
-                    midi_channels[ch_str].append([beat_position + offset, note, velocity, duration])
-
-            # Sort notes in each channel by beat
-            for ch_str in midi_channels:
-                midi_channels[ch_str].sort(key=lambda x: x[0])
-
-            pattern_data["midi_channels"] = midi_channels
-
-            # Save back
-            with open(pattern_file, 'w') as f:
-                json.dump(pattern_data, f, indent=2)
-
-            return [TextContent(
-                type="text",
-                text=f"Updated chord at bar {bar} in pattern '{pattern_name}':\n" +
-                     f"  Notes: {chord_notes}\n" +
-                     f"  Channels: {channels}\n" +
-                     f"  Duration: {duration:.2f} beats"
-            )]
-
-        elif name == "edit_pattern_triggers":
-            pattern_name = arguments["pattern_name"]
-            track = arguments["track"]
-            beats = arguments["beats"]
-            velocity = arguments.get("velocity", 100)
-            note = arguments.get("note")  # Optional chromatic note
-            mode = arguments.get("mode", "add")
-
-            # Ensure pattern name doesn't have extension
-            if pattern_name.endswith('.json'):
-                pattern_name = pattern_name[:-5]
-
-            pattern_file = PATTERN_DIR / f"{pattern_name}.json"
-
-            if not pattern_file.exists():
-                return [TextContent(
-                    type="text",
-                    text=f"Error: Pattern '{pattern_name}' not found at {pattern_file}"
-                )]
-
-            # Load existing pattern
-            with open(pattern_file, 'r') as f:
-                pattern_data = json.load(f)
+                    note = track_num - 1  # Track triggers: Track 1 = note 0, etc.
 
-            track_triggers = pattern_data.get("track_triggers", [])
-
-            if mode == "replace":
-                # Remove all triggers for this track
-                track_triggers = [t for t in track_triggers if t[1] != track]
-                # Add new triggers
-                for beat in beats:
-                    if note is not None:
-                        track_triggers.append([beat, track, velocity, note])
-                    else:
-                        track_triggers.append([beat, track, velocity])
-                action = f"Replaced track {track} triggers"
-
-            elif mode == "remove":
-                # Remove triggers at specified beats for this track
-                beats_set = set(beats)
-                original_count = len([t for t in track_triggers if t[1] == track])
-                track_triggers = [
-                    t for t in track_triggers
-                    if not (t[1] == track and t[0] in beats_set)
-                ]
-                removed_count = original_count - len([t for t in track_triggers if t[1] == track])
-                action = f"Removed {removed_count} triggers from track {track}"
-
-            else:  # mode == "add"
-                # Add new triggers (avoiding duplicates)
-                existing_beats = set(t[0] for t in track_triggers if t[1] == track)
-                added = 0
-                for beat in beats:
-                    if beat not in existing_beats:
-                        if note is not None:
-                            track_triggers.append([beat, track, velocity, note])
-                        else:
-                            track_triggers.append([beat, track, velocity])
-                        added += 1
-                action = f"Added {added} triggers to track {track}"
-
-            # Sort by beat
-            track_triggers.sort(key=lambda x: x[0])
-            pattern_data["track_triggers"] = track_triggers
-
-            # Save back
-            with open(pattern_file, 'w') as f:
-                json.dump(pattern_data, f, indent=2)
-
-            track_count = len([t for t in track_triggers if t[1] == track])
-            return [TextContent(
-                type="text",
-                text=f"{action} in pattern '{pattern_name}'\n" +
-                     f"  Track {track} now has {track_count} triggers"
-            )]
-
-        elif name == "export_automation_to_midi":
-            filename = arguments["filename"]
-            automation = arguments["automation"]
-            channel = arguments.get("channel", 1) - 1
-
-            # Ensure filename has .mid extension
-            if not filename.endswith('.mid'):
-                filename += '.mid'
-
-            # Save to appropriate output directory
-            import os
-            # Always try /mnt/user-data/outputs/ first (Claude Desktop)
-            # Fall back to ~/Downloads/ if /mnt/user-data doesn't exist (local testing)
-            if os.path.exists("/mnt/user-data"):
-                output_dir = "/mnt/user-data/outputs"
-            else:
-                output_dir = os.path.expanduser("~/Downloads")
-            os.makedirs(output_dir, exist_ok=True)
-            output_path = os.path.join(output_dir, filename)
+                # Calculate tick position
+                tick = int(beat * ticks_per_beat)
+                delta_time = tick - current_tick
 
-            parameter_automation = automation.get("parameter_automation", {})
-            bars = automation.get("bars", 4)
-            bpm = automation.get("bpm", 120)
+                # Note on
+                drum_track.append(mido.Message('note_on', channel=0, note=note, velocity=velocity, time=delta_time))
+                # Note off (100ms later)
+                note_off_ticks = int(0.1 * ticks_per_beat * bpm / 60)
+                drum_track.append(mido.Message('note_off', channel=0, note=note, velocity=0, time=note_off_ticks))
 
-            # Create MIDI file
-            mid = mido.MidiFile()
-            track = mido.MidiTrack()
-            mid.tracks.append(track)
+                current_tick = tick + note_off_ticks
 
-            # Set tempo
-            tempo = mido.bpm2tempo(bpm)
-            track.append(mido.MetaMessage('set_tempo', tempo=tempo))
+            # End of track
+            drum_track.append(mido.MetaMessage('end_of_track', time=0))
 
-            # Convert parameter automation to MIDI messages
-            # Collect all events with their timing
-            events = []
+        # Track 2: Melody/chords
+        if melody_notes:
+            melody_track = mido.MidiTrack()
+            mid.tracks.append(melody_track)
+            melody_track.append(mido.MetaMessage('track_name', name=f'Melody Ch{melody_channel}'))
 
-            for param_name, param_events in parameter_automation.items():
-                param_info = get_parameter_info(param_name)
-                if not param_info:
-                    continue
+            # Sort by beat time
+            sorted_notes = sorted(melody_notes, key=lambda x: x[0])
 
-                for beat, value in param_events:
-                    # Convert beat to ticks (480 ticks per beat is standard)
-                    ticks = int(beat * 480)
+            current_tick = 0
+            for note_data in sorted_notes:
+                beat = note_data[0]
+                note = note_data[1]
+                velocity = note_data[2]
+                duration = note_data[3] if len(note_data) > 3 else 0.5
 
-                    if param_info["type"] == "cc":
-                        events.append((ticks, 'cc', param_info["cc"], value))
-                    elif param_info["type"] == "nrpn":
-                        events.append((ticks, 'nrpn', param_info["msb"], param_info["lsb"], value))
+                # Calculate tick positions
+                tick = int(beat * ticks_per_beat)
+                delta_time = tick - current_tick
+                duration_ticks = int(duration * ticks_per_beat * bpm / 60)
 
-            # Sort events by time
-            events.sort(key=lambda x: x[0])
+                # Note on
+                melody_track.append(mido.Message('note_on', channel=melody_channel-1, note=note, velocity=velocity, time=delta_time))
+                # Note off
+                melody_track.append(mido.Message('note_off', channel=melody_channel-1, note=note, velocity=0, time=duration_ticks))
 
-            # Add events to track with delta times
-            last_ticks = 0
-            for event in events:
-                if event[1] == 'cc':
-                    ticks, _, cc, value = event
-                    delta = ticks - last_ticks
-                    track.append(mido.Message('control_change', control=cc, value=value, channel=channel, time=delta))
-                    last_ticks = ticks
-                elif event[1] == 'nrpn':
-                    ticks, _, msb, lsb, value = event
-                    delta = ticks - last_ticks
-                    # NRPN requires 4 CC messages
-                    track.append(mido.Message('control_change', control=99, value=msb, channel=channel, time=delta))
-                    track.append(mido.Message('control_change', control=98, value=lsb, channel=channel, time=0))
-                    track.append(mido.Message('control_change', control=6, value=value, channel=channel, time=0))
-                    track.append(mido.Message('control_change', control=38, value=0, channel=channel, time=0))
-                    last_ticks = ticks
-
-            # Save MIDI file
-            mid.save(output_path)
-
-            return [TextContent(
-                type="text",
-                text=f"Exported automation to MIDI file: {output_path}\nBars: {bars}, BPM: {bpm}, Parameters: {', '.join(parameter_automation.keys())}"
-            )]
-
-        elif name == "save_last_pattern":
-            filename = arguments.get("filename")
-
-            if not last_multi_channel_pattern:
-                return [TextContent(
-                    type="text",
-                    text="Error: No pattern to save. Use play_pattern_with_multi_channel_midi first."
-                )]
-
-            # Add .mid extension if needed
-            if not filename.endswith('.mid'):
-                filename += '.mid'
-
-            # Save to appropriate output directory
-            import os
-            # Always try /mnt/user-data/outputs/ first (Claude Desktop)
-            # Fall back to ~/Downloads/ if /mnt/user-data doesn't exist (local testing)
-            if os.path.exists("/mnt/user-data"):
-                output_dir = "/mnt/user-data/outputs"
-            else:
-                output_dir = os.path.expanduser("~/Downloads")
-            os.makedirs(output_dir, exist_ok=True)
-            filepath = os.path.join(output_dir, filename)
+                current_tick = tick + duration_ticks
 
-            try:
-                pattern = last_multi_channel_pattern
-                bpm = pattern['bpm']
-                bars = pattern['bars']
-                track_triggers = pattern['track_triggers']
-                midi_channels = pattern['midi_channels']
-                ticks_per_beat = 480
-
-                def beats_to_ticks(beat):
-                    return int(beat * ticks_per_beat)
-
-                # Create MIDI file
-                mid = mido.MidiFile(ticks_per_beat=ticks_per_beat)
-
-                # Tempo track
-                tempo_track = mido.MidiTrack()
-                mid.tracks.append(tempo_track)
-                tempo = mido.bpm2tempo(bpm)
-                tempo_track.append(mido.MetaMessage('set_tempo', tempo=tempo, time=0))
-                tempo_track.append(mido.MetaMessage('end_of_track', time=0))
-
-                # Organize events by channel
-                track_events = {}  # channel -> list of events
-
-                # Process track triggers (Digitakt tracks 1-16)
-                for trigger in track_triggers:
-                    if len(trigger) >= 3:
-                        beat = trigger[0]
-                        track = trigger[1]
-                        velocity = trigger[2]
-
-                        # Check if chromatic (4th parameter is note)
-                        if len(trigger) == 4:
-                            note = trigger[3]  # Use provided note for chromatic
-                        else:
-                            note = track - 1  # Track triggers: Track 1 = note 0, etc.
-
-                        # Use track number as channel (Track 1 → Ch 0, Track 2 → Ch 1, etc)
-                        channel = track - 1
-                        duration = 0.1  # 100ms duration for triggers
-
-                        if channel not in track_events:
-                            track_events[channel] = []
-
-                        track_events[channel].append({
-                            'type': 'note_on',
-                            'beat': beat,
-                            'note': note,
-                            'velocity': velocity,
-                            'channel': channel
-                        })
-                        track_events[channel].append({
-                            'type': 'note_off',
-                            'beat': beat + duration,
-                            'note': note,
-                            'velocity': 0,
-                            'channel': channel
-                        })
-
-                # Process MIDI channel notes (external synths)
-                for channel_str, notes in midi_channels.items():
-                    channel = int(channel_str) - 1  # Convert to 0-based
-
-                    if channel not in track_events:
-                        track_events[channel] = []
-
-                    for note_data in notes:
-                        if len(note_data) >= 4:
-                            beat, note, velocity, duration = note_data[:4]
-                        elif len(note_data) == 3:
-                            beat, note, velocity = note_data
-                            duration = 0.5
-                        else:
-                            continue
+            # End of track
+            melody_track.append(mido.MetaMessage('end_of_track', time=0))
 
-                        track_events[channel].append({
-                            'type': 'note_on',
-                            'beat': beat,
-                            'note': note,
-                            'velocity': velocity,
-                            'channel': channel
-                        })
-                        track_events[channel].append({
-                            'type': 'note_off',
-                            'beat': beat + duration,
-                            'note': note,
-                            'velocity': 0,
-                            'channel': channel
-                        })
-
-                # Process parameter automation
-                parameter_automation = pattern.get('parameter_automation', {})
-                if parameter_automation:
-                    # Detect format: global vs per-track
-                    first_key = next(iter(parameter_automation.keys()))
-                    # Try to convert to int - if it works, it's per-track format
-                    try:
-                        int(first_key)
-                        is_per_track = True
-                    except (ValueError, TypeError):
-                        is_per_track = False
-
-                    if is_per_track:
-                        # Per-track format: {track_num: {'param': [[beat, val], ...]}}
-                        for track_key, track_params in parameter_automation.items():
-                            track_num = int(track_key)  # Convert string key to int
-                            # Use track-specific channel (Track 1 = Channel 0, etc.)
-                            param_channel = track_num - 1
-                            if param_channel not in track_events:
-                                track_events[param_channel] = []
-
-                            for param_name, param_events in track_params.items():
-                                param_info = get_parameter_info(param_name)
-                                if not param_info:
-                                    continue
-
-                                for beat, value in param_events:
-                                    if param_info["type"] == "cc":
-                                        track_events[param_channel].append({
-                                            'type': 'cc',
-                                            'beat': beat,
-                                            'cc': param_info["cc"],
-                                            'value': value,
-                                            'channel': param_channel
-                                        })
-                                    elif param_info["type"] == "nrpn":
-                                        track_events[param_channel].append({
-                                            'type': 'nrpn',
-                                            'beat': beat,
-                                            'msb': param_info["msb"],
-                                            'lsb': param_info["lsb"],
-                                            'value': value,
-                                            'channel': param_channel
-                                        })
-                    else:
-                        # Global format: {'param': [[beat, val], ...]}
-                        # Use channel 0 for parameter automation
-                        param_channel = 0
-                        if param_channel not in track_events:
-                            track_events[param_channel] = []
-
-                        for param_name, param_events in parameter_automation.items():
-                            param_info = get_parameter_info(param_name)
-                            if not param_info:
-                                continue
-
-                            for beat, value in param_events:
-                                if param_info["type"] == "cc":
-                                    track_events[param_channel].append({
-                                        'type': 'cc',
-                                        'beat': beat,
-                                        'cc': param_info["cc"],
-                                        'value': value,
-                                        'channel': param_channel
-                                    })
-                                elif param_info["type"] == "nrpn":
-                                    track_events[param_channel].append({
-                                        'type': 'nrpn',
-                                        'beat': beat,
-                                        'msb': param_info["msb"],
-                                        'lsb': param_info["lsb"],
-                                        'value': value,
-                                        'channel': param_channel
-                                    })
-
-                # Create MIDI tracks for each channel
-                track_names = {
-                    0: 'Track 1 (Kick)',
-                    1: 'Track 2 (Snare)',
-                    2: 'Track 3 (Hats)',
-                    8: 'Track 9',
-                    11: 'Track 12',
-                    12: 'Track 13'
-                }
+        # Save file
+        mid.save(filename)
 
-                total_notes = 0
-                for channel in sorted(track_events.keys()):
-                    track = mido.MidiTrack()
-                    mid.tracks.append(track)
-
-                    # Add track name
-                    track_name = track_names.get(channel, f'Channel {channel + 1}')
-                    track.append(mido.MetaMessage('track_name', name=track_name, time=0))
-
-                    # Sort events by beat
-                    events = sorted(track_events[channel], key=lambda x: x['beat'])
-
-                    # Write events with delta times
-                    current_tick = 0
-                    for event in events:
-                        event_tick = beats_to_ticks(event['beat'])
-                        delta = event_tick - current_tick
-
-                        if event['type'] == 'note_on':
-                            track.append(mido.Message('note_on',
-                                                    note=event['note'],
-                                                    velocity=event['velocity'],
-                                                    time=delta,
-                                                    channel=event['channel']))
-                            total_notes += 1
-                        elif event['type'] == 'note_off':
-                            track.append(mido.Message('note_off',
-                                                    note=event['note'],
-                                                    velocity=0,
-                                                    time=delta,
-                                                    channel=event['channel']))
-                        elif event['type'] == 'cc':
-                            track.append(mido.Message('control_change',
-                                                    control=event['cc'],
-                                                    value=event['value'],
-                                                    time=delta,
-                                                    channel=event['channel']))
-                        elif event['type'] == 'nrpn':
-                            # NRPN requires 4 CC messages
-                            track.append(mido.Message('control_change', control=99, value=event['msb'], time=delta, channel=event['channel']))
-                            track.append(mido.Message('control_change', control=98, value=event['lsb'], time=0, channel=event['channel']))
-                            track.append(mido.Message('control_change', control=6, value=event['value'], time=0, channel=event['channel']))
-                            track.append(mido.Message('control_change', control=38, value=0, time=0, channel=event['channel']))
-
-                        current_tick = event_tick
-
-                    # End track
-                    track.append(mido.MetaMessage('end_of_track', time=0))
-
-                # Save file
-                mid.save(filepath)
-
-                param_count = sum(len(events) for events in parameter_automation.values()) if parameter_automation else 0
-                param_info = f", {param_count} parameter automation events" if param_count > 0 else ""
-                return [TextContent(
-                    type="text",
-                    text=f"Saved pattern to {filepath}\n{bars} bars at {bpm} BPM\n{len(track_events)} tracks, {total_notes} notes{param_info}"
-                )]
-
-            except Exception as e:
-                return [TextContent(
-                    type="text",
-                    text=f"Error saving pattern: {str(e)}"
-                )]
-
-        elif name == "export_pattern_to_midi":
-            filename = arguments.get("filename")
-            bpm = arguments.get("bpm", 120)
-            bars = arguments.get("bars", 4)
-            track_triggers = arguments.get("track_triggers", [])
-            melody_notes = arguments.get("melody_notes", [])
-            melody_channel = arguments.get("melody_channel", 1)
+        track_count = (1 if track_triggers else 0) + (1 if melody_notes else 0)
+        return _text(f"Exported pattern to {filename}\n{bars} bars at {bpm} BPM\n{len(track_triggers)} drum triggers, {len(melody_notes)} melody notes\n{track_count} MIDI tracks created")
 
-            try:
-                if not filename.endswith('.mid'):
-                    filename += '.mid'
-
-                # Create MIDI file
-                mid = mido.MidiFile()
-
-                # Tempo track
-                tempo_track = mido.MidiTrack()
-                mid.tracks.append(tempo_track)
-                tempo_track.append(mido.MetaMessage('set_tempo', tempo=mido.bpm2tempo(bpm)))
-                tempo_track.append(mido.MetaMessage('time_signature', numerator=4, denominator=4))
-
-                # Convert beat duration to ticks (480 ticks per beat is standard)
-                ticks_per_beat = mid.ticks_per_beat
-
-                # Track 1: Drum triggers (on channel 1)
-                if track_triggers:
-                    drum_track = mido.MidiTrack()
-                    mid.tracks.append(drum_track)
-                    drum_track.append(mido.MetaMessage('track_name', name='Digitakt Drums'))
-
-                    # Sort by beat time
-                    sorted_triggers = sorted(track_triggers, key=lambda x: x[0])
-
-                    current_tick = 0
-                    for trigger in sorted_triggers:
-                        beat = trigger[0]
-                        track_num = trigger[1]
-                        velocity = trigger[2]
-
-                        # Check if chromatic (4th parameter is note)
-                        if len(trigger) == 4:
-                            note = trigger[3]  # Use provided note for chromatic
-                        else:
-                            note = track_num - 1  # Track triggers: Track 1 = note 0, etc.
-
-                        # Calculate tick position
-                        tick = int(beat * ticks_per_beat)
-                        delta_time = tick - current_tick
-
-                        # Note on
-                        drum_track.append(mido.Message('note_on', channel=0, note=note, velocity=velocity, time=delta_time))
-                        # Note off (100ms later)
-                        note_off_ticks = int(0.1 * ticks_per_beat * bpm / 60)
-                        drum_track.append(mido.Message('note_off', channel=0, note=note, velocity=0, time=note_off_ticks))
-
-                        current_tick = tick + note_off_ticks
-
-                    # End of track
-                    drum_track.append(mido.MetaMessage('end_of_track', time=0))
-
-                # Track 2: Melody/chords
-                if melody_notes:
-                    melody_track = mido.MidiTrack()
-                    mid.tracks.append(melody_track)
-                    melody_track.append(mido.MetaMessage('track_name', name=f'Melody Ch{melody_channel}'))
-
-                    # Sort by beat time
-                    sorted_notes = sorted(melody_notes, key=lambda x: x[0])
-
-                    current_tick = 0
-                    for note_data in sorted_notes:
-                        beat = note_data[0]
-                        note = note_data[1]
-                        velocity = note_data[2]
-                        duration = note_data[3] if len(note_data) > 3 else 0.5
-
-                        # Calculate tick positions
-                        tick = int(beat * ticks_per_beat)
-                        delta_time = tick - current_tick
-                        duration_ticks = int(duration * ticks_per_beat * bpm / 60)
-
-                        # Note on
-                        melody_track.append(mido.Message('note_on', channel=melody_channel-1, note=note, velocity=velocity, time=delta_time))
-                        # Note off
-                        melody_track.append(mido.Message('note_off', channel=melody_channel-1, note=note, velocity=0, time=duration_ticks))
-
-                        current_tick = tick + duration_ticks
-
-                    # End of track
-                    melody_track.append(mido.MetaMessage('end_of_track', time=0))
-
-                # Save file
-                mid.save(filename)
-
-                track_count = (1 if track_triggers else 0) + (1 if melody_notes else 0)
-                return [TextContent(
-                    type="text",
-                    text=f"Exported pattern to {filename}\n{bars} bars at {bpm} BPM\n{len(track_triggers)} drum triggers, {len(melody_notes)} melody notes\n{track_count} MIDI tracks created"
-                )]
-
-            except Exception as e:
-                return [TextContent(
-                    type="text",
-                    text=f"Error exporting MIDI: {str(e)}"
-                )]
-
-        elif name == "list_parameters":
-            category_filter = arguments.get("category")
-
-            categories = get_parameters_by_category()
-
-            if category_filter:
-                if category_filter in categories:
-                    params = categories[category_filter]
-                    result = f"Parameters in category '{category_filter}' ({len(params)}):\n\n"
-                    for param in params:
-                        result += f"- {param}\n"
-                else:
-                    result = f"Error: Unknown category '{category_filter}'\n"
-                    result += f"Available categories: {', '.join(categories.keys())}"
-            else:
-                result = "Available parameters by category:\n\n"
-                for cat_name, params in categories.items():
-                    result += f"{cat_name} ({len(params)}):\n"
-                    for param in params:
-                        result += f"  - {param}\n"
-                    result += "\n"
+    except Exception as e:
+        return _text(f"Error exporting MIDI: {str(e)}")
 
-                result += f"Total: {len(get_all_parameters())} parameters\n"
-                result += f"\nUse 'category' parameter to filter by category."
+async def _handle_list_parameters(arguments: dict) -> list[TextContent]:
+    """Handle the list_parameters tool"""
+    category_filter = arguments.get("category")
 
-            return [TextContent(type="text", text=result)]
+    categories = get_parameters_by_category()
 
+    if category_filter:
+        if category_filter in categories:
+            params = categories[category_filter]
+            result = f"Parameters in category '{category_filter}' ({len(params)}):\n\n"
+            for param in params:
+                result += f"- {param}\n"
         else:
-            return [TextContent(
-                type="text",
-                text=f"Unknown tool: {name}"
-            )]
+            result = f"Error: Unknown category '{category_filter}'\n"
+            result += f"Available categories: {', '.join(categories.keys())}"
+    else:
+        result = "Available parameters by category:\n\n"
+        for cat_name, params in categories.items():
+            result += f"{cat_name} ({len(params)}):\n"
+            for param in params:
+                result += f"  - {param}\n"
+            result += "\n"
+
+        result += f"Total: {len(get_all_parameters())} parameters\n"
+        result += f"\nUse 'category' parameter to filter by category."
+
+    return _text(result)
+
+# Tool name -> handler coroutine
+TOOL_HANDLERS = {
+    "send_note": _handle_send_note,
+    "trigger_track": _handle_trigger_track,
+    "send_cc": _handle_send_cc,
+    "send_program_change": _handle_send_program_change,
+    "send_note_sequence": _handle_send_note_sequence,
+    "send_sysex": _handle_send_sysex,
+    "request_sysex_dump": _handle_request_sysex_dump,
+    "send_nrpn": _handle_send_nrpn,
+    "set_trig_note": _handle_set_trig_note,
+    "set_trig_velocity": _handle_set_trig_velocity,
+    "set_trig_length": _handle_set_trig_length,
+    "reset_velocities": _handle_reset_velocities,
+    "send_midi_start": _handle_send_midi_start,
+    "send_midi_stop": _handle_send_midi_stop,
+    "send_midi_continue": _handle_send_midi_continue,
+    "send_song_position": _handle_send_song_position,
+    "play_with_clock": _handle_play_with_clock,
+    "play_pattern_with_tracks": _handle_play_pattern_with_tracks,
+    "play_pattern_with_melody": _handle_play_pattern_with_melody,
+    "play_pattern_with_loop": _handle_play_pattern_with_loop,
+    "play_pattern_with_tracks_and_melody": _handle_play_pattern_with_tracks_and_melody,
+    "play_pattern_with_multi_channel_midi": _handle_play_pattern_with_multi_channel_midi,
+    "save_last_melody": _handle_save_last_melody,
+    "send_filter_sweep": _handle_send_filter_sweep,
+    "send_filter_envelope": _handle_send_filter_envelope,
+    "play_with_filter_automation": _handle_play_with_filter_automation,
+    "set_parameter": _handle_set_parameter,
+    "send_parameter_sweep": _handle_send_parameter_sweep,
+    "send_parameter_envelope": _handle_send_parameter_envelope,
+    "play_pattern_with_parameter_automation": _handle_play_pattern_with_parameter_automation,
+    "save_automation_preset": _handle_save_automation_preset,
+    "load_automation_preset": _handle_load_automation_preset,
+    "list_automation_presets": _handle_list_automation_presets,
+    "save_pattern": _handle_save_pattern,
+    "load_pattern": _handle_load_pattern,
+    "list_patterns": _handle_list_patterns,
+    "delete_pattern": _handle_delete_pattern,
+    "update_pattern": _handle_update_pattern,
+    "edit_pattern_chords": _handle_edit_pattern_chords,
+    "edit_pattern_triggers": _handle_edit_pattern_triggers,
+    "export_automation_to_midi": _handle_export_automation_to_midi,
+    "save_last_pattern": _handle_save_last_pattern,
+    "export_pattern_to_midi": _handle_export_pattern_to_midi,
+    "list_parameters": _handle_list_parameters,
+}
 
+@server.call_tool()
+async def call_tool(name: str, arguments: dict) -> list[TextContent]:
+    """Execute a MIDI tool"""
+    if not output_port:
+        return _text("Error: Not connected to Digitakt MIDI output port")
+
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return _text(f"Unknown tool: {name}")
+
+    try:
+        return await handler(arguments)
     except Exception as e:
-        logger.error(f"Error executing tool {name}: {e}")
-        return [TextContent(
-            type="text",
-            text=f"Error: {str(e)}"
-        )]
+        logger.error("Error executing tool %s: %s", name, e)
+        return _text(f"Error: {str(e)}")
+
+RESOURCES = [
+    Resource(
+        uri="midi://ports",
+        name="MIDI Ports",
+        mimeType="application/json",
+        description="List all available MIDI input and output ports"
+    ),
+    Resource(
+        uri="midi://digitakt/status",
+        name="Digitakt Connection Status",
+        mimeType="text/plain",
+        description="Current connection status to Digitakt MIDI ports"
+    )
+]
 
 @server.list_resources()
 async def list_resources() -> list[Resource]:
     """List available resources"""
-    return [
-        Resource(
-            uri="midi://ports",
-            name="MIDI Ports",
-            mimeType="application/json",
-            description="List all available MIDI input and output ports"
-        ),
-        Resource(
-            uri="midi://digitakt/status",
-            name="Digitakt Connection Status",
-            mimeType="text/plain",
-            description="Current connection status to Digitakt MIDI ports"
-        )
-    ]
+    return RESOURCES
 
 @server.read_resource()
 async def read_resource(uri: str) -> str:
     """Read a resource"""
     if uri == "midi://ports":
-        import json
-        ports = {
-            "inputs": mido.get_input_names(),
-            "outputs": mido.get_output_names()
-        }
-        return json.dumps(ports, indent=2)
+        return json.dumps(get_port_names(), indent=2)
 
     elif uri == "midi://digitakt/status":
         status = []